@@ -0,0 +1,126 @@
+"""Measure the size of each output format (json, min, compact) per tool.
+
+Every outline tool is called in-process with each format, and the size of
+the answer is reported in characters and tokens:
+
+    python packaging/bench_output.py ~/src/App              # a real project (needs SourceKitten)
+    python packaging/bench_output.py ~/src/App --file ~/src/App/Sources/Store.swift
+    python packaging/bench_output.py --sample 40            # offline: 40 copies of the test fixture
+    python packaging/bench_output.py --sample 40 --json     # machine-readable
+
+Tokens are counted with tiktoken's cl100k_base encoding when it is installed
+and its vocabulary can be loaded, otherwise estimated as output.approx_tokens
+does (about four characters per token); the report names the one used.
+--sample writes the fixture from tests/test_analyzer.py into a temporary
+project and serves its canned SourceKitten structure, so it runs without
+SourceKitten; run it from the repository root.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+from pathlib import Path
+from typing import Callable
+
+_REPO = Path(__file__).resolve().parent.parent
+_FORMATS = ("json", "min", "compact")
+
+
+def tokenizer() -> tuple[str, Callable[[str], int]]:
+    """The token counter to use, and its name."""
+    try:
+        import tiktoken
+
+        encoding = tiktoken.get_encoding("cl100k_base")
+    except Exception:  # noqa: BLE001 - not installed, or no vocabulary offline
+        from swift_project_assistant.output import approx_tokens
+
+        return "approx (chars / 4)", approx_tokens
+    return "tiktoken cl100k_base", lambda text: len(encoding.encode(text))
+
+
+def calls(project: str, file: str) -> dict[str, Callable[[str], str]]:
+    """Each measured tool, as a function of the output format."""
+    from swift_project_assistant import mcp_server
+
+    return {
+        "get_file_outline": lambda fmt: mcp_server.get_file_outline(file, format=fmt),
+        "get_public_interface": lambda fmt: mcp_server.get_public_interface(file, format=fmt),
+        "get_project_map": lambda fmt: mcp_server.get_project_map(project, format=fmt),
+        "find_types": lambda fmt: mcp_server.find_types(project, format=fmt),
+        "search_declarations": lambda fmt: mcp_server.search_declarations(project, r"\w", format=fmt),
+    }
+
+
+def measure(project: str, file: str, count: Callable[[str], int]) -> dict[str, dict[str, dict[str, int]]]:
+    """{tool: {format: {"chars": n, "tokens": n}}}"""
+    results = {}
+    for tool, call in calls(project, file).items():
+        results[tool] = {}
+        for fmt in _FORMATS:
+            text = call(fmt)
+            results[tool][fmt] = {"chars": len(text), "tokens": count(text)}
+    return results
+
+
+def sample_project(root: Path, copies: int) -> str:
+    """Write `copies` copies of the test fixture under `root` and serve its canned structure."""
+    os.environ["SWIFT_ASSISTANT_CACHE"] = str(root / "cache")
+    os.environ["SWIFT_ASSISTANT_PREFETCH"] = "off"
+    sys.path.insert(0, str(_REPO))
+    from swift_project_assistant import cache
+    from tests.test_analyzer import SOURCE, STRUCTURE
+
+    cache.run_sourcekitten = lambda path: STRUCTURE
+    project = root / "Sample"
+    for i in range(copies):
+        folder = project / f"Feature{i // 10}"
+        folder.mkdir(parents=True, exist_ok=True)
+        (folder / f"Movies{i}.swift").write_text(SOURCE, encoding="utf-8")
+    return str(project)
+
+
+def _saved(json_size: int, size: int) -> str:
+    return f"{100 * (size - json_size) / json_size:+.0f}%" if json_size else "n/a"
+
+
+def report(results: dict, counter: str) -> None:
+    print(f"tokens: {counter}")
+    print(f"{'tool':22} {'json tok':>9} {'min':>6} {'compact':>8}   chars json -> min -> compact")
+    for tool, sizes in results.items():
+        tokens = {fmt: sizes[fmt]["tokens"] for fmt in _FORMATS}
+        chars = {fmt: sizes[fmt]["chars"] for fmt in _FORMATS}
+        print(f"{tool:22} {tokens['json']:9} {_saved(tokens['json'], tokens['min']):>6} "
+              f"{_saved(tokens['json'], tokens['compact']):>8}   "
+              f"{chars['json']} -> {chars['min']} -> {chars['compact']}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("project", nargs="?", help="a Swift project to measure")
+    parser.add_argument("--file", help="the file for the per-file tools (default: the project's largest)")
+    parser.add_argument("--sample", type=int, metavar="N", help="measure N copies of the test fixture instead")
+    parser.add_argument("--json", action="store_true", help="print results as JSON")
+    args = parser.parse_args()
+    if (args.project is None) == (args.sample is None):
+        parser.error("give a project or --sample N")
+
+    with tempfile.TemporaryDirectory() as scratch:
+        project = sample_project(Path(scratch), args.sample) if args.sample else os.path.abspath(args.project)
+        from swift_project_assistant.files import swift_files
+
+        file = args.file or str(max(swift_files(project), key=lambda p: p.stat().st_size))
+        counter, count = tokenizer()
+        results = measure(project, os.path.abspath(file), count)
+    if args.json:
+        print(json.dumps({"tokenizer": counter, "tools": results}, indent=1))
+        return
+    report(results, counter)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,157 @@
+"""Measure swift-project-mcp cold start: time to the first MCP responses.
+
+Agents launch the server over stdio once per session, so what they wait for
+is process start + imports + the `initialize` round trip, then `tools/list`.
+This script spawns the server several times and reports both timings for each
+command given:
+
+    python packaging/bench_startup.py                       # installed wheel / console script
+    python packaging/bench_startup.py --binary dist/swift-project-mcp/swift-project-mcp
+    python packaging/bench_startup.py --runs 20 --json      # machine-readable
+    python packaging/bench_startup.py --imports             # where import time goes
+
+Without --binary (or with --wheel) it times the `swift-project-mcp` on PATH,
+falling back to `python -m swift_project_assistant.mcp_server`. --imports
+instead imports the server module under `python -X importtime` and reports
+the time spent in each top-level package's own code (median over the runs);
+the server module itself is listed apart, as most of its time is tool
+registration.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import time
+from collections import Counter
+
+_SERVER_MODULE = "swift_project_assistant.mcp_server"
+
+_INITIALIZE = {
+    "jsonrpc": "2.0", "id": 1, "method": "initialize",
+    "params": {"protocolVersion": "2025-06-18", "capabilities": {},
+               "clientInfo": {"name": "bench_startup", "version": "0"}},
+}
+_INITIALIZED = {"jsonrpc": "2.0", "method": "notifications/initialized"}
+_LIST_TOOLS = {"jsonrpc": "2.0", "id": 2, "method": "tools/list"}
+
+
+def _send(proc: subprocess.Popen, message: dict) -> None:
+    proc.stdin.write(json.dumps(message).encode() + b"\n")
+    proc.stdin.flush()
+
+
+def _await_id(proc: subprocess.Popen, request_id: int) -> dict:
+    while True:
+        line = proc.stdout.readline()
+        if not line:
+            raise RuntimeError(f"server exited before answering request {request_id}")
+        message = json.loads(line)
+        if message.get("id") == request_id:
+            return message
+
+
+def measure(command: list[str]) -> tuple[float, float]:
+    """Seconds from spawn to the initialize response, and to the tools/list response."""
+    env = dict(os.environ, SUMMARY_LLM="none")
+    start = time.perf_counter()
+    proc = subprocess.Popen(command, stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+                            stderr=subprocess.DEVNULL, env=env)
+    try:
+        _send(proc, _INITIALIZE)
+        _await_id(proc, 1)
+        first = time.perf_counter() - start
+        _send(proc, _INITIALIZED)
+        _send(proc, _LIST_TOOLS)
+        _await_id(proc, 2)
+        tools = time.perf_counter() - start
+    finally:
+        proc.stdin.close()
+        try:
+            proc.wait(timeout=5)
+        except subprocess.TimeoutExpired:
+            proc.kill()
+    return first, tools
+
+
+def import_times() -> Counter[str]:
+    """Microseconds of import time spent in each top-level package's own modules."""
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {_SERVER_MODULE}"],
+                          capture_output=True, text=True, check=True)
+    totals: Counter[str] = Counter()
+    for line in proc.stderr.splitlines():
+        fields = line.removeprefix("import time:").split("|")
+        if len(fields) != 3 or not fields[0].strip().isdigit():
+            continue  # the header line
+        module = fields[2].strip()
+        totals[module if module == _SERVER_MODULE else module.split(".")[0]] += int(fields[0])
+    return totals
+
+
+def report_imports(runs: int, as_json: bool) -> None:
+    samples = [import_times() for _ in range(runs)]
+    packages = {name for sample in samples for name in sample}
+    medians = {name: statistics.median(sample[name] for sample in samples) / 1000 for name in packages}
+    total = statistics.median(sum(sample.values()) for sample in samples) / 1000
+    ranked = sorted(medians.items(), key=lambda kv: -kv[1])
+    if as_json:
+        print(json.dumps({"runs": runs, "total_ms": round(total, 1),
+                          "packages_ms": {name: round(ms, 1) for name, ms in ranked}}, indent=1))
+        return
+    print(f"import {_SERVER_MODULE}: {total:.1f} ms median over {runs} runs")
+    for name, ms in ranked[:12]:
+        print(f"  {ms:7.1f} ms  {name}")
+
+
+def wheel_command() -> list[str]:
+    launcher = shutil.which("swift-project-mcp")
+    return [launcher] if launcher else [sys.executable, "-m", "swift_project_assistant.mcp_server"]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--wheel", action="store_true", help="time the installed console script")
+    parser.add_argument("--binary", help="time a PyInstaller build at this path")
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--json", action="store_true", help="print results as JSON")
+    parser.add_argument("--imports", action="store_true", help="break down the server module's import time")
+    args = parser.parse_args()
+    if args.imports:
+        report_imports(args.runs, args.json)
+        return
+
+    targets: dict[str, list[str]] = {}
+    if args.wheel or not args.binary:
+        targets["wheel"] = wheel_command()
+    if args.binary:
+        targets["binary"] = [os.path.abspath(args.binary)]
+
+    results = {}
+    for name, command in targets.items():
+        measure(command)  # warm the OS file cache; agents rarely start truly cold
+        samples = [measure(command) for _ in range(args.runs)]
+        firsts, lists = zip(*samples)
+        results[name] = {
+            "command": command,
+            "runs": args.runs,
+            "initialize_ms": {"median": round(statistics.median(firsts) * 1000, 1),
+                              "min": round(min(firsts) * 1000, 1)},
+            "tools_list_ms": {"median": round(statistics.median(lists) * 1000, 1),
+                              "min": round(min(lists) * 1000, 1)},
+        }
+    if args.json:
+        print(json.dumps(results, indent=1))
+        return
+    for name, r in results.items():
+        print(f"{name:7} initialize {r['initialize_ms']['median']:7.1f} ms median "
+              f"({r['initialize_ms']['min']:.1f} min)   tools/list {r['tools_list_ms']['median']:7.1f} ms median"
+              f"   [{' '.join(r['command'])}]")
+
+
+if __name__ == "__main__":
+    main()
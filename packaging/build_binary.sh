@@ -1,24 +1,31 @@
 #!/usr/bin/env bash
-# Build a standalone single-file binary for the swift-project-assistant MCP
-# server using PyInstaller. The MCP server only needs mcp, python-dotenv and
-# httpx at runtime (SourceKitten and the optional `claude` CLI are external
-# binaries it shells out to), so the resulting executable is small.
+# Build a standalone binary for the swift-project-assistant MCP server using
+# PyInstaller. The MCP server only needs mcp, python-dotenv and httpx at
+# runtime (SourceKitten and the optional `claude` CLI are external binaries it
+# shells out to).
+#
+# The build is a one-folder bundle rather than --onefile: a one-file binary
+# unpacks its whole archive into a temp directory on every launch, which
+# tripled time-to-first-response (see packaging/bench_startup.py). Only the
+# server side of mcp is collected; mcp.cli needs typer and is never imported.
 #
 # Usage:  poetry run packaging/build_binary.sh
-# Output: dist/swift-project-mcp
+# Output: dist/swift-project-mcp/swift-project-mcp (keep the folder together)
 set -euo pipefail
 
 ROOT="$(cd "$(dirname "${BASH_SOURCE[0]}")/.." && pwd)"
 cd "$ROOT"
 
 pyinstaller \
-  --onefile \
+  --onedir \
   --name swift-project-mcp \
   --paths src \
-  --collect-submodules mcp \
+  --collect-submodules mcp.server \
+  --collect-submodules mcp.shared \
   --collect-submodules swift_project_assistant \
   --clean --noconfirm \
   packaging/entry.py
 
 echo
-echo "Built: $ROOT/dist/swift-project-mcp"
+echo "Built: $ROOT/dist/swift-project-mcp/swift-project-mcp"
+echo "Startup: python packaging/bench_startup.py --binary dist/swift-project-mcp/swift-project-mcp"
@@ -0,0 +1,224 @@
+"""Per-project logs of the files and symbols tools touched, to warm hot files first.
+
+Each new session otherwise starts cold, even though most sessions touch the
+same core files. For each project the server keeps a small log of the files
+(and symbols) tools were asked about, with frequency counts that decay with
+a one-week half-life, so yesterday's files outrank last month's. When the
+server warms a project at startup (see prewarm.py), the hottest files are
+analyzed, indexed and have stale standalone summaries regenerated before the
+rest of the project.
+
+Logs are kept per project root in the cache directory (access/<sha1>.json),
+hold at most a few thousand entries each, and are written at most every 30
+seconds and at exit. SWIFT_ASSISTANT_ACCESS_LOG sets how many of the hottest
+files are warmed first (default 200); "off" disables both logging and hot
+warming. Only files under a project the server has indexed or was asked to
+warm are logged.
+
+To see whether it pays off, the time each file's first analysis of the
+session took is recorded, split by whether the file was warmed from the log.
+get_server_stats reports both distributions.
+"""
+
+from __future__ import annotations
+
+import atexit
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Iterable
+
+from swift_project_assistant.cache import configured_cache_dir
+
+DEFAULT_HOT_FILES = 200
+HALF_LIFE = 7 * 24 * 3600.0  # seconds for a count to halve
+_MAX_ENTRIES = 2000  # per kind (files, symbols) and project
+_SAVE_INTERVAL = 30.0
+_LOG_VERSION = 1
+
+
+def configured_hot_files() -> int | None:
+    """SWIFT_ASSISTANT_ACCESS_LOG; None disables the access log."""
+    raw = os.getenv("SWIFT_ASSISTANT_ACCESS_LOG", "").strip()
+    if raw.lower() in ("off", "none", "0"):
+        return None
+    try:
+        count = int(raw) if raw else DEFAULT_HOT_FILES
+    except ValueError:
+        raise ValueError(f"SWIFT_ASSISTANT_ACCESS_LOG must be a whole number or off, got {raw!r}") from None
+    return count if count > 0 else None
+
+
+class AccessLog:
+    """Decayed access counts for one project, persisted to `path` (in memory only if None)."""
+
+    def __init__(self, path: Path | None, clock: Callable[[], float] = time.time) -> None:
+        self.path = path
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._counts: dict[str, dict[str, list[float]]] = {"files": {}, "symbols": {}}  # name -> [count, at]
+        self._dirty = False
+        self._saved = clock()
+        if path is not None:
+            try:
+                data = json.loads(path.read_text())
+                if data.get("version") == _LOG_VERSION:
+                    self._counts = {kind: dict(data.get(kind, {})) for kind in self._counts}
+            except (OSError, ValueError, AttributeError):
+                pass
+
+    def record(self, kind: str, name: str) -> None:
+        """Count one access to a file (project-relative) or symbol."""
+        now = self._clock()
+        with self._lock:
+            counts = self._counts[kind]
+            count, at = counts.get(name, (0.0, now))
+            counts[name] = [_decayed(count, at, now) + 1.0, now]
+            if len(counts) > _MAX_ENTRIES:
+                self._prune(counts, now)
+            self._dirty = True
+        if now - self._saved >= _SAVE_INTERVAL:
+            self.save()
+
+    def hottest(self, kind: str, n: int) -> list[str]:
+        """The `n` names with the highest decayed counts, hottest first."""
+        now = self._clock()
+        with self._lock:
+            ranked = sorted(self._counts[kind].items(), key=lambda item: -_decayed(*item[1], now))
+        return [name for name, _ in ranked[:n]]
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._counts["files"])
+
+    def save(self) -> None:
+        with self._lock:
+            if not self._dirty or self.path is None:
+                return
+            data = {"version": _LOG_VERSION, **{kind: dict(c) for kind, c in self._counts.items()}}
+            self._dirty = False
+            self._saved = self._clock()
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            fd, tmp = tempfile.mkstemp(dir=self.path.parent, suffix=".tmp")
+            with os.fdopen(fd, "w") as f:
+                json.dump(data, f)
+            os.replace(tmp, self.path)
+        except OSError:
+            pass
+
+    @staticmethod
+    def _prune(counts: dict[str, list[float]], now: float) -> None:
+        ranked = sorted(counts, key=lambda name: -_decayed(*counts[name], now))
+        for name in ranked[_MAX_ENTRIES * 3 // 4:]:
+            del counts[name]
+
+
+def _decayed(count: float, at: float, now: float) -> float:
+    return count * 0.5 ** (max(now - at, 0.0) / HALF_LIFE)
+
+
+def _log_path(root: Path) -> Path | None:
+    directory = configured_cache_dir()
+    if directory is None:
+        return None
+    return directory / "access" / f"{hashlib.sha1(str(root).encode()).hexdigest()}.json"
+
+
+def _percentiles(samples: list[float]) -> dict:
+    if not samples:
+        return {"count": 0}
+    ordered = sorted(samples)
+
+    def at(q: float) -> float:
+        return round(1000 * ordered[min(int(q * len(ordered)), len(ordered) - 1)], 1)
+
+    return {"count": len(ordered), "p50_ms": at(0.5), "p90_ms": at(0.9), "max_ms": at(1.0)}
+
+
+class AccessLogs:
+    """The access logs of the projects this server works on, and first-touch latencies."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._logs: dict[Path, AccessLog] = {}
+        self._roots: set[Path] = set()
+        self._warmed: set[Path] = set()
+        self._touched: set[Path] = set()
+        self._first_touch: dict[str, list[float]] = {"warmed": [], "cold": []}
+
+    def add_root(self, root: Path) -> None:
+        """Log accesses to files under `root` from now on."""
+        with self._lock:
+            self._roots.add(root)
+
+    def log(self, root: Path) -> AccessLog:
+        with self._lock:
+            log = self._logs.get(root)
+            if log is None:
+                log = self._logs[root] = AccessLog(_log_path(root))
+            return log
+
+    def root_of(self, path: Path) -> Path | None:
+        with self._lock:
+            roots = [r for r in self._roots if r in path.parents]
+        return max(roots, key=lambda r: len(r.parts)) if roots else None
+
+    def record_file(self, path: Path) -> None:
+        if configured_hot_files() is None or (root := self.root_of(path)) is None:
+            return
+        self.log(root).record("files", str(path.relative_to(root)))
+
+    def record_symbol(self, root: Path, symbol: str) -> None:
+        if configured_hot_files() is None:
+            return
+        self.add_root(root)
+        self.log(root).record("symbols", symbol)
+
+    def hot_files(self, root: Path, listed: Iterable[Path]) -> list[Path]:
+        """The hottest of `listed` (at most SWIFT_ASSISTANT_ACCESS_LOG), hottest first."""
+        count = configured_hot_files()
+        if count is None:
+            return []
+        listed = set(listed)
+        hot = (root / rel for rel in self.log(root).hottest("files", count))
+        return [path for path in hot if path in listed]
+
+    def mark_warmed(self, paths: Iterable[Path]) -> None:
+        with self._lock:
+            self._warmed.update(paths)
+
+    def first_touch(self, path: Path, seconds: float) -> None:
+        """Record how long the session's first analysis of `path` took."""
+        with self._lock:
+            if path in self._touched:
+                return
+            self._touched.add(path)
+            self._first_touch["warmed" if path in self._warmed else "cold"].append(seconds)
+
+    def save_all(self) -> None:
+        with self._lock:
+            logs = list(self._logs.values())
+        for log in logs:
+            log.save()
+
+    def stats(self) -> dict:
+        with self._lock:
+            logs = dict(self._logs)
+            samples = {kind: list(s) for kind, s in self._first_touch.items()}
+            warmed = len(self._warmed)
+        return {"enabled": configured_hot_files() is not None, "warmed_from_log": warmed,
+                "logged_files": {str(root): len(log) for root, log in logs.items()},
+                "first_touch": {kind: _percentiles(s) for kind, s in samples.items()}}
+
+
+_default = AccessLogs()
+atexit.register(_default.save_all)
+
+
+def default_access_logs() -> AccessLogs:
+    return _default
@@ -0,0 +1,89 @@
+"""Concurrency limits for tool calls, so one server can be shared by many clients.
+
+Over stdio each agent gets a server of its own. Over HTTP (`swift-project-mcp
+--transport http`) one long-lived server with warm indexes serves every
+agent and editor window on the machine, so calls from different clients
+compete for it. Each call runs on a worker thread (see
+mcp_server._tool) once it is admitted by two limits:
+
+    SWIFT_ASSISTANT_MAX_CALLS         tool calls running at once, from all
+                                      clients together (default 16)
+    SWIFT_ASSISTANT_CALLS_PER_CLIENT  tool calls running at once for one
+                                      client session (default 4)
+
+A client that sends more waits for its own calls to finish rather than
+taking every slot, so one agent scanning a large project can't starve the
+others. Calls from different sessions share only the caches; their
+cancellation and progress stay their own (see progress.py).
+get_server_stats reports running and waiting calls.
+"""
+
+from __future__ import annotations
+
+import os
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
+from weakref import WeakKeyDictionary
+
+import anyio
+
+DEFAULT_MAX_CALLS = 16
+DEFAULT_CALLS_PER_CLIENT = 4
+
+
+def _configured(name: str, default: int) -> int:
+    raw = os.getenv(name, "").strip()
+    if not raw:
+        return default
+    try:
+        return max(1, int(raw))
+    except ValueError:
+        raise ValueError(f"{name} must be a whole number, got {raw!r}") from None
+
+
+def configured_max_calls() -> int:
+    """SWIFT_ASSISTANT_MAX_CALLS, or 16."""
+    return _configured("SWIFT_ASSISTANT_MAX_CALLS", DEFAULT_MAX_CALLS)
+
+
+def configured_calls_per_client() -> int:
+    """SWIFT_ASSISTANT_CALLS_PER_CLIENT, or 4."""
+    return _configured("SWIFT_ASSISTANT_CALLS_PER_CLIENT", DEFAULT_CALLS_PER_CLIENT)
+
+
+class CallLimits:
+    """Admits tool calls within a server-wide and a per-client limit."""
+
+    def __init__(self, total: int | None = None, per_client: int | None = None) -> None:
+        self.total = total or configured_max_calls()
+        self.per_client = per_client or configured_calls_per_client()
+        self._limiter = anyio.CapacityLimiter(self.total)
+        self._clients: WeakKeyDictionary[object, anyio.CapacityLimiter] = WeakKeyDictionary()
+        self.admitted = 0
+
+    @asynccontextmanager
+    async def admit(self, client: object) -> AsyncIterator[None]:
+        """Hold a slot for one call from `client` (e.g. its MCP session) for the block."""
+        own = self._clients.get(client)
+        if own is None:
+            own = self._clients[client] = anyio.CapacityLimiter(self.per_client)
+        async with own, self._limiter:  # the client's own limit first, so its backlog holds no shared slot
+            self.admitted += 1
+            yield
+
+    def stats(self) -> dict:
+        shared = self._limiter.statistics()
+        waiting = shared.tasks_waiting + sum(c.statistics().tasks_waiting for c in list(self._clients.values()))
+        return {"max_calls": self.total, "per_client": self.per_client, "clients": len(self._clients),
+                "running": shared.borrowed_tokens, "waiting": waiting, "admitted": self.admitted}
+
+
+_default: CallLimits | None = None
+
+
+def default_limits() -> CallLimits:
+    """The process-wide limits, created on first use."""
+    global _default
+    if _default is None:
+        _default = CallLimits()
+    return _default
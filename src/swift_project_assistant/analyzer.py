@@ -10,13 +10,20 @@ slicing here happens on bytes, not str.
 
 from __future__ import annotations
 
+import atexit
 import json
+import os
 import re
 import shutil
+import signal
 import subprocess
 import textwrap
+import threading
 from dataclasses import dataclass, field
 
+from swift_project_assistant import progress
+from swift_project_assistant.scheduler import Priority, current_priority
+
 SUB = "key.substructure"
 KIND = "key.kind"
 NAME = "key.name"
@@ -82,6 +89,10 @@ class SourceKittenNotFoundError(RuntimeError):
     pass
 
 
+class SourceKittenTimeoutError(RuntimeError):
+    pass
+
+
 @dataclass
 class Member:
     kind: str  # "method" | "property" | "case" | "initializer" | "typealias" | ...
@@ -116,26 +127,114 @@ class FileAnalysis:
         return self.source.count(b"\n", 0, offset) + 1
 
     def slice(self, offset: int, length: int) -> str:
-        text = self.source[offset : offset + length].decode("utf-8", errors="replace")
-        return textwrap.dedent(text).strip("\n")
+        return source_text(self.source[offset : offset + length])
+
+
+def source_text(raw: bytes) -> str:
+    """A declaration's bytes as dedented text, as the source tools return it."""
+    return textwrap.dedent(raw.decode("utf-8", errors="replace")).strip("\n")
+
+
+DEFAULT_SOURCEKITTEN_TIMEOUT = 30.0
+BACKGROUND_NICENESS = 10
+
+_live: set[subprocess.Popen] = set()
+_live_lock = threading.Lock()
+
+
+def configured_sourcekitten_timeout() -> float | None:
+    """SWIFT_ASSISTANT_FILE_TIMEOUT in seconds; None (no limit) for "off" or 0."""
+    raw = os.getenv("SWIFT_ASSISTANT_FILE_TIMEOUT", "").strip()
+    if raw.lower() in ("off", "none"):
+        return None
+    try:
+        seconds = float(raw) if raw else DEFAULT_SOURCEKITTEN_TIMEOUT
+    except ValueError:
+        raise ValueError(f"SWIFT_ASSISTANT_FILE_TIMEOUT must be a number of seconds, got {raw!r}") from None
+    return seconds if seconds > 0 else None
 
 
-def run_sourcekitten(file_path: str) -> dict:
-    """Run `sourcekitten structure` on a file and return the parsed JSON."""
+def _command(file_path: str) -> list[str]:
+    """The SourceKitten command line; background runs start under `nice` where it exists."""
+    command = ["sourcekitten", "structure", "--file", file_path]
+    if current_priority() == Priority.BACKGROUND and shutil.which("nice") is not None:
+        command = ["nice", "-n", str(BACKGROUND_NICENESS), *command]
+    return command
+
+
+def kill_group(proc: subprocess.Popen) -> None:
+    """Kill `proc` and anything it spawned (it leads its own process group)."""
+    try:
+        if os.name == "posix":
+            os.killpg(proc.pid, signal.SIGKILL)
+        else:
+            proc.kill()
+    except (ProcessLookupError, PermissionError):
+        pass
+
+
+def _kill(proc: subprocess.Popen) -> None:
+    """Kill `proc`'s process group, then reap it."""
+    kill_group(proc)
+    try:
+        proc.communicate(timeout=5)
+    except subprocess.TimeoutExpired:
+        pass
+
+
+@atexit.register
+def _reap_live() -> None:
+    """Don't leave SourceKitten (or a SourceKit service it started) running after the server exits."""
+    with _live_lock:
+        procs = list(_live)
+    for proc in procs:
+        _kill(proc)
+
+
+def run_sourcekitten(file_path: str, timeout: float | None = None) -> dict:
+    """Run `sourcekitten structure` on a file and return the parsed JSON.
+
+    The run is killed, with its whole process group, after `timeout` seconds
+    (default: configured_sourcekitten_timeout()), raising
+    SourceKittenTimeoutError, so one pathological file can't hang a tool.
+    If the tool call it runs for is cancelled, it is killed at once and
+    progress.Cancelled raised. Runs in the scheduler's background class are
+    started at a lower CPU priority (niceness BACKGROUND_NICENESS).
+    """
     if shutil.which("sourcekitten") is None:
         raise SourceKittenNotFoundError(
             "SourceKitten is required but was not found on PATH. "
             "Install it with `brew install sourcekitten` (macOS) and make sure "
             "Xcode command line tools are available."
         )
-    result = subprocess.run(
-        ["sourcekitten", "structure", "--file", file_path],
-        capture_output=True,
+    if timeout is None:
+        timeout = configured_sourcekitten_timeout()
+    progress.check_cancelled()
+    proc = subprocess.Popen(
+        _command(file_path),
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
         text=True,
+        start_new_session=True,  # its own process group, so a kill reaches its children too
     )
-    if result.returncode != 0:
-        raise RuntimeError(f"SourceKitten failed for {file_path}: {result.stderr.strip()}")
-    return json.loads(result.stdout)
+    with _live_lock:
+        _live.add(proc)
+    try:
+        with progress.on_cancel(lambda: kill_group(proc)):
+            stdout, stderr = proc.communicate(timeout=timeout)
+        progress.check_cancelled()
+    except subprocess.TimeoutExpired:
+        _kill(proc)
+        raise SourceKittenTimeoutError(f"SourceKitten timed out after {timeout:g}s for {file_path}") from None
+    except BaseException:
+        _kill(proc)
+        raise
+    finally:
+        with _live_lock:
+            _live.discard(proc)
+    if proc.returncode != 0:
+        raise RuntimeError(f"SourceKitten failed for {file_path}: {stderr.strip()}")
+    return json.loads(stdout)
 
 
 def _base_name(name: str) -> str:
@@ -0,0 +1,144 @@
+"""Shareable index artifacts: a project's SourceKitten analyses in one file.
+
+SourceKitten only runs where the Swift toolchain does, typically macOS. A
+machine that has it (a CI runner, say) can analyze a project once and ship
+the result:
+
+    swift-project-mcp index ~/src/App --out App.spaindex
+
+and a server anywhere else can serve from it:
+
+    swift-project-mcp --index App.spaindex
+
+The artifact is a zip archive with a manifest (git commit, each file's blob
+id, analysis errors) and one compressed member per distinct structure, named
+by blob id. Loaded with `--index`, it becomes a read-only tier of the
+analysis cache (cache.add_readonly_tier). Lookups are by content, not by
+path or commit, so every file whose content is unchanged since the artifact
+was built is served without running SourceKitten. Only edited files need it.
+Members are read on demand, so a large artifact costs little memory.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import subprocess
+import tempfile
+import threading
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from pathlib import Path
+
+from swift_project_assistant.cache import CACHE_VERSION, cached_structure, content_keys, git_listing
+from swift_project_assistant.files import swift_files
+
+ARTIFACT_FORMAT = "swift-project-assistant-index"
+ARTIFACT_VERSION = 1
+
+_MANIFEST = "manifest.json"
+
+
+def _member(key: str) -> str:
+    return f"structures/{key}.json"
+
+
+def git_commit(root: Path) -> str | None:
+    """The commit checked out at `root`, or None outside a git repository."""
+    try:
+        proc = subprocess.run(["git", "-C", str(root), "rev-parse", "HEAD"], capture_output=True, text=True)
+    except OSError:
+        return None
+    return proc.stdout.strip() if proc.returncode == 0 else None
+
+
+def build_artifact(
+    root: Path,
+    out: Path,
+    exclude_folders: list[str] | None = None,
+    jobs: int | None = None,
+) -> dict:
+    """Analyze every Swift file under `root` with `jobs` workers and write an artifact to `out`.
+
+    Analyses also land in the local cache, so a rebuild only runs SourceKitten
+    for changed content. Returns the manifest.
+    """
+    root = root.expanduser().resolve()
+    files = swift_files(str(root), exclude_folders)
+    listing = git_listing(root)
+    keys = content_keys(root, files, listing)
+    errors: dict[str, str] = {}
+
+    def analyze(f: Path) -> tuple[Path, dict | None]:
+        try:
+            return f, cached_structure(f, f.read_bytes(), keys.get(f))
+        except (OSError, RuntimeError) as exc:
+            errors[str(f.relative_to(root))] = str(exc)
+            return f, None
+
+    manifest = {
+        "format": ARTIFACT_FORMAT,
+        "version": ARTIFACT_VERSION,
+        "cache_version": CACHE_VERSION,
+        "commit": git_commit(root),
+        "dirty": bool(listing and (listing.dirty or listing.untracked)),
+        "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "files": {},
+        "errors": errors,
+    }
+    out.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=out.parent, suffix=".tmp")
+    os.close(fd)
+    try:
+        with zipfile.ZipFile(tmp, "w", zipfile.ZIP_DEFLATED) as z, ThreadPoolExecutor(jobs or os.cpu_count()) as pool:
+            written: set[str] = set()
+            for f, structure in pool.map(analyze, files):
+                key = keys.get(f)
+                if structure is None or key is None:
+                    continue
+                manifest["files"][str(f.relative_to(root))] = key
+                if key not in written:
+                    written.add(key)
+                    z.writestr(_member(key), json.dumps(structure, separators=(",", ":")))
+            z.writestr(_MANIFEST, json.dumps(manifest, indent=1))
+        os.replace(tmp, out)
+    except BaseException:
+        Path(tmp).unlink(missing_ok=True)
+        raise
+    return manifest
+
+
+class IndexArtifact:
+    """An artifact opened for lookups by blob id; see the module docstring."""
+
+    def __init__(self, path: Path) -> None:
+        """Open `path`; raises ValueError if it is not a compatible artifact."""
+        self.path = path
+        try:
+            self._zip = zipfile.ZipFile(path)
+            manifest = json.loads(self._zip.read(_MANIFEST))
+        except (OSError, KeyError, ValueError, zipfile.BadZipFile) as exc:
+            raise ValueError(f"Not an index artifact: {path} ({exc})") from None
+        if manifest.get("format") != ARTIFACT_FORMAT or manifest.get("version") != ARTIFACT_VERSION:
+            raise ValueError(f"Unsupported index artifact format: {path}")
+        if manifest.get("cache_version") != CACHE_VERSION:
+            raise ValueError(f"Index artifact {path} was built by an incompatible version")
+        self.manifest = manifest
+        self.commit: str | None = manifest.get("commit")
+        self._keys = {name[len("structures/") : -len(".json")] for name in self._zip.namelist()
+                      if name.startswith("structures/")}
+        self._lock = threading.Lock()
+        self.hits = 0
+
+    def get(self, key: str) -> dict | None:
+        if key not in self._keys:
+            return None
+        with self._lock:  # members share one file handle
+            data = self._zip.read(_member(key))
+            self.hits += 1
+        return json.loads(data)
+
+    def stats(self) -> dict:
+        return {"path": str(self.path), "commit": self.commit, "files": len(self.manifest["files"]),
+                "structures": len(self._keys), "hits": self.hits}
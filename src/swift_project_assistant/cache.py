@@ -0,0 +1,374 @@
+"""Content-addressed cache of SourceKitten analyses, keyed by git blob id.
+
+A file's analysis depends only on its bytes, so it is stored under the file's
+git object id (the SHA-1 of `blob <size>\\0<content>`). Branch switches and
+separate worktrees that share content then share analyses, and mtimes never
+matter.
+
+Blob ids are obtained in bulk: one `git ls-files -s -m -o` lists every Swift
+file with its index blob id and flags the ones modified in the working tree
+(they appear twice) or untracked (no id). Only those are hashed, with a single
+`git hash-object --stdin-paths`, so validating the cache of a clean checkout
+costs one git call. Outside a git repository files are hashed in-process,
+memoized by (mtime, size).
+
+The on-disk store lives in SWIFT_ASSISTANT_CACHE:
+
+    SWIFT_ASSISTANT_CACHE=/path/to/dir   # store analyses here
+    SWIFT_ASSISTANT_CACHE=off            # in-memory only, nothing written
+    (unset)                              # $XDG_CACHE_HOME/swift-project-assistant
+                                         # (default ~/.cache/swift-project-assistant)
+
+Read-only tiers (e.g. an index artifact built on CI, see artifact.py) can be
+added behind the store with `add_readonly_tier`: a structure missing from
+memory and disk is looked up there, and never written back.
+
+A structure found in none of these is computed by SourceKitten, in a slot
+granted by the priority scheduler (see scheduler.py). Servers sharing the
+store coordinate through a lease on the blob id (see lease.py): while one
+process analyzes a file, another that needs it waits for the stored result
+instead of running SourceKitten on it too.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import re
+import subprocess
+import tempfile
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Iterable, Protocol
+
+from swift_project_assistant.analyzer import (
+    FileAnalysis,
+    SourceKittenTimeoutError,
+    analyze_structure,
+    run_sourcekitten,
+)
+from swift_project_assistant import lease, progress
+from swift_project_assistant.scheduler import Ticket, current_priority, default_scheduler
+
+# Bump when the stored structure format (or what SourceKitten is asked for)
+# changes, so stale entries are never read back.
+CACHE_VERSION = 1
+
+_LS_FILES_RE = re.compile(r"^(\d{6}) ([0-9a-f]{40,64}) (\d)\t(.*)$", re.DOTALL)
+_SUBMODULE_MODE = "160000"
+
+
+def blob_id(data: bytes) -> str:
+    """The git object id of a blob with this content."""
+    return hashlib.sha1(b"blob %d\0" % len(data) + data).hexdigest()
+
+
+def configured_cache_dir() -> Path | None:
+    """Parse SWIFT_ASSISTANT_CACHE; None means nothing is written to disk."""
+    raw = os.getenv("SWIFT_ASSISTANT_CACHE", "").strip()
+    if raw.lower() in ("off", "none", "disabled"):
+        return None
+    if raw:
+        return Path(raw).expanduser()
+    base = os.getenv("XDG_CACHE_HOME", "").strip() or "~/.cache"
+    return Path(base).expanduser() / "swift-project-assistant"
+
+
+@dataclass
+class GitListing:
+    """What one `git ls-files -s -m -o` says about a directory's Swift files."""
+
+    blob_ids: dict[str, str] = field(default_factory=dict)  # clean tracked files
+    dirty: list[str] = field(default_factory=list)  # tracked, modified or conflicted
+    untracked: list[str] = field(default_factory=list)  # not ignored
+
+    @property
+    def paths(self) -> list[str]:
+        return sorted({*self.blob_ids, *self.dirty, *self.untracked})
+
+
+def git_listing(root: Path, pathspec: str = "*.swift") -> GitListing | None:
+    """List `root`'s files with their blob ids, or None if it isn't in a git repo.
+
+    Paths are relative to `root`, which may be a subdirectory of the repo.
+    """
+    try:
+        proc = subprocess.run(
+            ["git", "-C", str(root), "ls-files", "-z", "-s", "-m", "-o", "--exclude-standard", "--", pathspec],
+            capture_output=True,
+        )
+    except OSError:
+        return None
+    if proc.returncode != 0:
+        return None
+    listing = GitListing()
+    dirty: set[str] = set()
+    for record in proc.stdout.decode("utf-8", errors="surrogateescape").split("\0"):
+        if not record:
+            continue
+        m = _LS_FILES_RE.match(record)
+        if m is None:
+            listing.untracked.append(record)
+            continue
+        mode, sha, stage, path = m.groups()
+        if mode == _SUBMODULE_MODE:
+            continue
+        # -m repeats modified (and deleted) entries; conflicts have stage != 0.
+        if path in listing.blob_ids or stage != "0":
+            dirty.add(path)
+        listing.blob_ids[path] = sha
+    for path in dirty:
+        listing.blob_ids.pop(path, None)
+    listing.dirty = sorted(dirty)
+    return listing
+
+
+def _git_hash_objects(root: Path, paths: list[Path]) -> dict[Path, str]:
+    if not paths:
+        return {}
+    proc = subprocess.run(
+        ["git", "-C", str(root), "hash-object", "--stdin-paths"],
+        input="\n".join(str(p) for p in paths).encode("utf-8", errors="surrogateescape"),
+        capture_output=True,
+    )
+    if proc.returncode != 0:
+        return {}
+    ids = proc.stdout.decode().split()
+    return dict(zip(paths, ids)) if len(ids) == len(paths) else {}
+
+
+_stat_memo: dict[Path, tuple[int, int, str]] = {}
+_stat_memo_lock = threading.Lock()
+
+
+def file_blob_id(path: Path) -> str:
+    """Blob id of one file, memoized by (mtime, size) so unchanged files aren't re-read."""
+    st = path.stat()
+    with _stat_memo_lock:
+        memo = _stat_memo.get(path)
+    if memo is not None and memo[:2] == (st.st_mtime_ns, st.st_size):
+        return memo[2]
+    key = blob_id(path.read_bytes())
+    with _stat_memo_lock:
+        _stat_memo[path] = (st.st_mtime_ns, st.st_size, key)
+    return key
+
+
+def content_keys(root: Path, files: Iterable[Path], listing: GitListing | None = None) -> dict[Path, str]:
+    """Blob id for each of `files` (absolute paths under `root`).
+
+    Uses the git index for clean files and one `git hash-object` for modified
+    or untracked ones; files git can't account for are hashed in-process.
+    Files that can't be read are left out.
+    """
+    files = list(files)
+    if listing is None:
+        listing = git_listing(root)
+    keys: dict[Path, str] = {}
+    if listing is not None:
+        to_hash: list[Path] = []
+        for f in files:
+            rel = f.relative_to(root).as_posix()
+            sha = listing.blob_ids.get(rel)
+            if sha is not None:
+                keys[f] = sha
+            elif f.is_file():
+                to_hash.append(f)
+        keys.update(_git_hash_objects(root, to_hash))
+    for f in files:
+        if f not in keys:
+            try:
+                keys[f] = file_blob_id(f)
+            except OSError:
+                continue
+    return keys
+
+
+class StructureSource(Protocol):
+    def get(self, key: str) -> dict | None: ...
+
+
+_readonly_tiers: list[StructureSource] = []
+
+
+def add_readonly_tier(source: StructureSource) -> None:
+    """Consult `source` for structures missing from every AnalysisCache."""
+    _readonly_tiers.append(source)
+
+
+def clear_readonly_tiers() -> None:
+    _readonly_tiers.clear()
+
+
+class AnalysisCache:
+    """SourceKitten structures by blob id: an in-memory LRU over an on-disk store.
+
+    Entries are written atomically (temp file + rename), so readers never see
+    a partial entry. With `directory=None` the cache is memory-only.
+    """
+
+    def __init__(self, directory: Path | None, memory_entries: int = 2048) -> None:
+        self.directory = directory / f"structures-v{CACHE_VERSION}" if directory else None
+        self.memory_entries = memory_entries
+        self._memory: OrderedDict[str, dict] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _path(self, key: str) -> Path:
+        assert self.directory is not None
+        return self.directory / key[:2] / f"{key}.json"
+
+    def _remember(self, key: str, structure: dict) -> None:
+        with self._lock:
+            self._memory[key] = structure
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.memory_entries:
+                self._memory.popitem(last=False)
+
+    def get(self, key: str) -> dict | None:
+        with self._lock:
+            structure = self._memory.get(key)
+            if structure is not None:
+                self._memory.move_to_end(key)
+                self.hits += 1
+                return structure
+        if self.directory is not None:
+            try:
+                structure = json.loads(self._path(key).read_bytes())
+            except (OSError, ValueError):
+                structure = None
+        for tier in _readonly_tiers:
+            if structure is not None:
+                break
+            structure = tier.get(key)
+        if structure is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._remember(key, structure)
+        return structure
+
+    def stored(self, key: str) -> bool:
+        """Whether `key` is in memory or on disk (without reading or counting it)."""
+        with self._lock:
+            if key in self._memory:
+                return True
+        return self.directory is not None and self._path(key).exists()
+
+    def put(self, key: str, structure: dict) -> None:
+        self._remember(key, structure)
+        if self.directory is None:
+            return
+        path = self._path(key)
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+            with os.fdopen(fd, "wb") as f:
+                f.write(json.dumps(structure, separators=(",", ":")).encode())
+            os.replace(tmp, path)
+        except OSError:
+            pass  # the disk store is an optimization; the memory copy still serves
+
+
+_default_cache: AnalysisCache | None = None
+_default_lock = threading.Lock()
+
+
+def default_cache() -> AnalysisCache:
+    """The process-wide cache for the currently configured directory."""
+    global _default_cache
+    directory = configured_cache_dir()
+    with _default_lock:
+        expected = directory / f"structures-v{CACHE_VERSION}" if directory else None
+        if _default_cache is None or _default_cache.directory != expected:
+            _default_cache = AnalysisCache(directory)
+        return _default_cache
+
+
+_inflight: dict[str, tuple[threading.Event, Ticket]] = {}
+_inflight_lock = threading.Lock()
+
+
+def cached_structure(
+    path: Path,
+    source: bytes,
+    key: str | None = None,
+    run: Callable[[str], dict] | None = None,
+    refresh: bool = False,
+) -> dict:
+    """SourceKitten structure for `path` (whose content is `source`), cached by blob id.
+
+    `refresh` skips the lookup but still stores the fresh result. Content
+    that has repeatedly timed out raises QuarantinedError without running
+    SourceKitten, unless refreshed (see quarantine.py).
+
+    A `key` looked up before the file was read (from the git index, say) may
+    belong to content the file has since left behind, so a fresh result is
+    stored under the id of `source` itself; and not at all if the file
+    changed again while SourceKitten read it.
+    """
+    from swift_project_assistant.quarantine import QuarantinedError, default_quarantine  # imports this module
+
+    cache = default_cache()
+    if key is None:
+        key = blob_id(source)
+    if not refresh and (structure := cache.get(key)) is not None:
+        return structure
+    quarantine = default_quarantine()
+    if not refresh and quarantine.is_quarantined(key):
+        raise QuarantinedError(f"Skipped {path}: quarantined after repeated SourceKitten timeouts")
+    # Single flight: a background warm-up and a tool call that reach the same
+    # content at once share one SourceKitten run, at the more urgent priority.
+    scheduler = default_scheduler()
+    while True:
+        with _inflight_lock:
+            claimed = _inflight.get(key)
+            if claimed is None:
+                done, ticket = _inflight[key] = threading.Event(), scheduler.ticket()
+                break
+        done, owner = claimed
+        owner.boost(current_priority())
+        progress.wait(done.wait)
+        if not refresh and (structure := cache.get(key)) is not None:
+            return structure
+    try:
+        # The previous owner may have finished between our lookup and claiming the slot.
+        structure = None if refresh else cache.get(key)
+        if structure is None:
+            # Another server sharing the store may be analyzing it; wait for its result.
+            with lease.held(cache.directory, key, lambda: not refresh and cache.stored(key)):
+                if not refresh and cache.stored(key):
+                    structure = cache.get(key)
+                if structure is None:
+                    try:
+                        with scheduler.slot(ticket):
+                            structure = (run or run_sourcekitten)(str(path))
+                    except SourceKittenTimeoutError:
+                        quarantine.record_timeout(key, path)
+                        raise
+                    if run is not None or _unchanged(path, source):
+                        cache.put(blob_id(source), structure)
+                    if refresh:
+                        quarantine.release(key)
+    finally:
+        with _inflight_lock:
+            del _inflight[key]
+        done.set()
+    return structure
+
+
+def _unchanged(path: Path, source: bytes) -> bool:
+    try:
+        return path.read_bytes() == source
+    except OSError:
+        return False
+
+
+def analyze_cached(path: Path, key: str | None = None) -> FileAnalysis:
+    """Like analyzer.analyze_file, but reuses any analysis of identical content."""
+    source = path.read_bytes()
+    return analyze_structure(source, cached_structure(path, source, key))
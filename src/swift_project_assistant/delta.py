@@ -0,0 +1,96 @@
+"""Delta answers for get_project_map and find_types: only what changed since a token.
+
+Agents re-request the project map and type queries to refresh their
+picture, and each time receive the whole answer again. Given `since`, these
+tools instead answer from the project index with what changed after that
+token, using the index's change journal (see index.ChangeJournal):
+
+    generation  the token for the state this answer reflects; pass it as
+                `since` next time
+    changed     get_project_map: the new entry of each added or changed
+                file; find_types: `changed_files`, whose matches (in
+                `matches`) replace any the caller had for them
+    removed     files that left the answer: deleted, no longer listed, or
+                no longer declaring anything it covers
+    full        present (true) when the token was empty, unknown (another
+                process, or an index evicted since) or too old: the answer
+                then lists everything, to replace the caller's copy, and
+                has no changed_files or removed
+
+On an unchanged project a refresh is a few dozen bytes.
+"""
+
+from __future__ import annotations
+
+from swift_project_assistant.index import IndexView
+from swift_project_assistant.rollup import file_entry, files_under
+
+
+def changes(index: IndexView, since: str, path: str = "") -> tuple[str, list[str], list[str], bool]:
+    """(token, listed files under `path` changed since, files under it no longer listed, full).
+
+    A file counts as changed if its entry or error changed, or if this
+    caller's listing gained it since the listing behind `since`; as gone if
+    that listing had it and this one doesn't. With `full`, every listed file
+    counts as changed.
+    """
+    token = index.token  # read first: a concurrent update then shows up again next time, never not at all
+    found = index.changed_since(since) if since else None
+    listed = files_under(index, path)
+    if found is None:
+        return token, listed, [], True
+    touched, before = found
+    prefix = f"{path}/" if path else ""
+    present = set(listed)
+    had = set(before)
+    changed = [rel for rel in listed if rel in touched or rel not in had]
+    gone = sorted(rel for rel in had if rel.startswith(prefix) and rel not in present)
+    return token, changed, gone, False
+
+
+def _answer(token: str, since: str, full: bool, body: dict) -> dict:
+    result = {"generation": token, "since": since or None, **body}
+    if full:
+        result["full"] = True
+    return result
+
+
+def map_delta(index: IndexView, since: str, path: str = "") -> dict:
+    """get_project_map's per-file entries for the files changed since `since`."""
+    token, files, removed, full = changes(index, since, path)
+    changed: dict[str, dict] = {}
+    for rel in files:
+        entry = file_entry(index, rel) if rel in index.entries or rel in index.errors else None
+        if entry is not None:
+            changed[rel] = entry
+        elif not full:
+            removed.append(rel)
+    body: dict = {"changed": changed}
+    if not full:
+        body["removed"] = sorted(removed)
+    return _answer(token, since, full, body)
+
+
+def type_delta(index: IndexView, since: str, inherits: str | None, kind: str | None) -> dict:
+    """find_types' matches in the files changed since `since`."""
+    token, files, removed, full = changes(index, since)
+    matches: list[dict] = []
+    changed_files: list[str] = []
+    for rel in files:
+        if rel not in index.entries:
+            continue
+        changed_files.append(rel)
+        for d in index.entries[rel].declarations:
+            if d.is_type and (kind is None or d.kind == kind) and (inherits is None or inherits in d.inherits):
+                match = {"file": rel, "line": d.line, "kind": d.kind, "name": d.qualified}
+                if d.inherits:
+                    match["inherits"] = list(d.inherits)
+                matches.append(match)
+    errors = [rel for rel in files if rel in index.errors]
+    body: dict = {"inherits": inherits, "kind": kind, "matches": matches}
+    if not full:
+        body["changed_files"] = changed_files
+        body["removed"] = removed
+    if errors:
+        body["errors"] = errors
+    return _answer(token, since, full, body)
@@ -0,0 +1,339 @@
+"""Swift file enumeration: gitignore-aware, glob-excludable, and cached.
+
+Every project-wide tool starts by listing the project's Swift files. Walking
+the whole tree on every call is slow on large repositories (asset catalogs,
+generated folders, vendored code), so enumeration here:
+
+- asks git (`git ls-files -c -o --exclude-standard`) when the root is inside a
+  repository, which honours .gitignore and never descends into ignored trees;
+  git doesn't look inside submodules or nested repositories, so those are
+  walked as below;
+- otherwise walks with `os.scandir`, applying the .gitignore files it finds
+  through a compiled matcher;
+- caches the result per (root, exclusions) and re-validates it by stat'ing
+  directories (and .gitignore files): adding, removing or renaming a file
+  changes its directory's mtime, so an unchanged set of mtimes means an
+  unchanged listing. A walk stamps every directory it visits; a git listing
+  only those git reported Swift files in, with their ancestors and the git
+  index (see _git_enumerate).
+
+`exclude_folders` entries are globs: a bare pattern ("Generated*",
+"*.xcassets") matches a folder name at any depth, and a pattern with a slash
+("App/Legacy/**", "Modules/*/Tests") matches the folder's path relative to
+the project root. The DEFAULT_EXCLUDES folders and hidden folders are always
+skipped, as before.
+"""
+
+from __future__ import annotations
+
+import os
+import re
+import subprocess
+import threading
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Iterable
+
+DEFAULT_EXCLUDES = {".git", ".build", "Pods", "Carthage", "DerivedData", ".swiftpm"}
+
+SWIFT_SUFFIX = ".swift"
+
+
+def glob_to_regex(pattern: str) -> str:
+    """Translate a gitignore-style glob (`*`, `?`, `[...]`, `**`) to a regex."""
+    out: list[str] = []
+    i, n = 0, len(pattern)
+    while i < n:
+        c = pattern[i]
+        if pattern.startswith("**/", i):
+            out.append("(?:.*/)?")
+            i += 3
+        elif pattern.startswith("/**", i) and i + 3 == n:
+            out.append("/.*")
+            i += 3
+        elif pattern.startswith("**", i):
+            out.append(".*")
+            i += 2
+        elif c == "*":
+            out.append("[^/]*")
+            i += 1
+        elif c == "?":
+            out.append("[^/]")
+            i += 1
+        elif c == "[":
+            j = pattern.find("]", i + 2)
+            if j == -1:
+                out.append(re.escape(c))
+                i += 1
+            else:
+                body = pattern[i + 1 : j].replace("\\", "\\\\")
+                if body.startswith("!"):
+                    body = "^" + body[1:]
+                out.append(f"[{body}]")
+                i = j + 1
+        elif c == "\\" and i + 1 < n:
+            out.append(re.escape(pattern[i + 1]))
+            i += 2
+        else:
+            out.append(re.escape(c))
+            i += 1
+    return "".join(out)
+
+
+class ExcludeMatcher:
+    """Decides which folders to skip: defaults, hidden folders, and user globs.
+
+    All user patterns are compiled into two regexes — one tested against a
+    folder's name, one against its root-relative path.
+    """
+
+    def __init__(self, patterns: Iterable[str] = ()) -> None:
+        name_parts: list[str] = []
+        path_parts: list[str] = []
+        for raw in patterns:
+            pattern = raw.strip().strip("/")
+            if not pattern:
+                continue
+            if "/" in pattern:
+                path_parts.append(glob_to_regex(pattern))
+            else:
+                name_parts.append(glob_to_regex(pattern))
+        self._name_re = re.compile("|".join(name_parts)) if name_parts else None
+        self._path_re = re.compile("|".join(path_parts)) if path_parts else None
+
+    def excludes(self, rel_dir: str) -> bool:
+        """Whether the folder at root-relative path `rel_dir` is skipped."""
+        name = rel_dir.rpartition("/")[2]
+        if name in DEFAULT_EXCLUDES or name.startswith("."):
+            return True
+        if self._name_re is not None and self._name_re.fullmatch(name):
+            return True
+        return self._path_re is not None and self._path_re.fullmatch(rel_dir) is not None
+
+
+@dataclass
+class _IgnoreRule:
+    regex: re.Pattern[str]
+    negate: bool
+    dir_only: bool
+
+
+def parse_gitignore(text: str, base: str = "") -> list[_IgnoreRule]:
+    """Compile one .gitignore file; `base` is its folder relative to the root."""
+    rules: list[_IgnoreRule] = []
+    prefix = f"{base}/" if base else ""
+    for line in text.splitlines():
+        if not line or line.startswith("#"):
+            continue
+        if not line.endswith("\\ "):
+            line = line.rstrip()
+        negate = line.startswith("!")
+        if negate:
+            line = line[1:]
+        elif line.startswith("\\!") or line.startswith("\\#"):
+            line = line[1:]
+        dir_only = line.endswith("/")
+        line = line.rstrip("/")
+        if not line:
+            continue
+        if "/" in line:
+            body = glob_to_regex(line.lstrip("/"))
+            regex = re.compile(re.escape(prefix) + body)
+        else:
+            regex = re.compile(re.escape(prefix) + "(?:.*/)?" + glob_to_regex(line))
+        rules.append(_IgnoreRule(regex, negate, dir_only))
+    return rules
+
+
+def is_ignored(rules: list[_IgnoreRule], rel: str, is_dir: bool) -> bool:
+    """gitignore semantics: the last rule matching `rel` decides."""
+    for rule in reversed(rules):
+        if rule.dir_only and not is_dir:
+            continue
+        if rule.regex.fullmatch(rel):
+            return not rule.negate
+    return False
+
+
+def _read_rules(path: Path, base: str) -> list[_IgnoreRule]:
+    try:
+        return parse_gitignore(path.read_text(encoding="utf-8", errors="replace"), base)
+    except OSError:
+        return []
+
+
+@dataclass
+class _Listing:
+    files: list[Path]
+    stamps: dict[str, int] = field(default_factory=dict)  # path -> st_mtime_ns
+
+    def is_current(self) -> bool:
+        for path, mtime in self.stamps.items():
+            try:
+                if os.stat(path).st_mtime_ns != mtime:
+                    return False
+            except OSError:
+                if mtime != -1:
+                    return False
+        return True
+
+
+def _stamp(path: Path | str) -> int:
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return -1
+
+
+def _git_index(root: Path) -> tuple[Path, Path] | None:
+    """(work tree top, index file) of the repository containing `root`, if any."""
+    for d in (root, *root.parents):
+        dot_git = d / ".git"
+        if dot_git.is_dir():
+            return d, dot_git / "index"
+        if dot_git.is_file():  # worktree / submodule: "gitdir: <path>"
+            text = dot_git.read_text(encoding="utf-8", errors="replace").strip()
+            if text.startswith("gitdir:"):
+                git_dir = Path(text[len("gitdir:") :].strip())
+                return d, (d / git_dir if not git_dir.is_absolute() else git_dir) / "index"
+    return None
+
+
+def _submodules(root: Path, top: Path) -> list[str]:
+    """Root-relative paths of the submodules the work tree's .gitmodules declares below `root`."""
+    try:
+        text = (top / ".gitmodules").read_text(encoding="utf-8", errors="replace")
+    except OSError:
+        return []
+    found = []
+    for m in re.finditer(r"^\s*path\s*=\s*(.+?)\s*$", text, re.M):
+        path = top / m.group(1)
+        if path != root and root in path.parents:
+            found.append(path.relative_to(root).as_posix())
+    return found
+
+
+def _git_enumerate(root: Path, matcher: ExcludeMatcher, top: Path, index: Path) -> _Listing | None:
+    """List with git, walking the submodules and nested repositories git leaves out.
+
+    The `:(glob)**/` pathspec adds the nested repositories to git's output
+    (as "dir/"); submodules come from .gitmodules. Revalidation stamps the
+    git index, .gitmodules and info/exclude, plus each directory git reported
+    a Swift file in, its ancestors, and their .gitignore files, so a hit
+    costs a few stats rather than a walk. The trade-off: a Swift file created
+    in a directory that had none (or in a new directory, unless its parent
+    is stamped) goes unseen until the git index changes — `git add`, a
+    commit, a checkout, or anything else that rewrites it.
+    """
+    try:
+        proc = subprocess.run(
+            ["git", "-C", str(root), "ls-files", "-z", "-c", "-o", "--exclude-standard", "--",
+             f"*{SWIFT_SUFFIX}", ":(glob)**/"],
+            capture_output=True,
+        )
+    except OSError:
+        return None
+    if proc.returncode != 0:
+        return None
+    listing = _Listing([])
+    for path in (index, top / ".gitmodules", index.parent / "info" / "exclude"):
+        listing.stamps[str(path)] = _stamp(path)
+    directories = {""}
+    repositories = _submodules(root, top)
+    verdicts: dict[str, bool] = {}
+
+    def excluded(rel_dir: str) -> bool:
+        if not rel_dir:
+            return False
+        if rel_dir not in verdicts:
+            parent = rel_dir.rpartition("/")[0]
+            verdicts[rel_dir] = excluded(parent) or matcher.excludes(rel_dir)
+        return verdicts[rel_dir]
+
+    for rel in sorted(set(proc.stdout.decode("utf-8", errors="surrogateescape").split("\0"))):
+        if rel.endswith("/"):
+            repositories.append(rel.rstrip("/"))  # a nested repository
+            continue
+        directory = rel.rpartition("/")[0]
+        if not rel.endswith(SWIFT_SUFFIX) or excluded(directory):
+            continue
+        path = root / rel
+        if path.is_file():  # -c still lists tracked files deleted from the working tree
+            listing.files.append(path)
+            while directory not in directories:
+                directories.add(directory)
+                directory = directory.rpartition("/")[0]
+    for rel in repositories:
+        if not excluded(rel) and (root / rel).is_dir():
+            walked = _scandir_enumerate(root, matcher, rel)
+            listing.files.extend(walked.files)
+            listing.stamps.update(walked.stamps)
+    for directory in directories:
+        path = root / directory if directory else root
+        listing.stamps[str(path)] = _stamp(path)
+        listing.stamps[str(path / ".gitignore")] = _stamp(path / ".gitignore")
+    listing.files.sort()
+    return listing
+
+
+def _scandir_enumerate(root: Path, matcher: ExcludeMatcher, top: str = "") -> _Listing:
+    """Walk the tree (or only `top`, a root-relative folder), stamping each directory and .gitignore it visits."""
+    listing = _Listing([])
+
+    def walk(directory: Path, rel: str, rules: list[_IgnoreRule]) -> None:
+        listing.stamps[str(directory)] = _stamp(directory)
+        gitignore = directory / ".gitignore"
+        listing.stamps[str(gitignore)] = _stamp(gitignore)
+        if listing.stamps[str(gitignore)] != -1:
+            rules = rules + _read_rules(gitignore, rel)
+        try:
+            entries = sorted(os.scandir(directory), key=lambda e: e.name)
+        except OSError:
+            return
+        for entry in entries:
+            child = f"{rel}/{entry.name}" if rel else entry.name
+            try:
+                is_dir = entry.is_dir(follow_symlinks=False)
+            except OSError:
+                continue
+            if is_dir:
+                if not matcher.excludes(child) and not is_ignored(rules, child, True):
+                    walk(Path(entry.path), child, rules)
+            elif entry.name.endswith(SWIFT_SUFFIX) and not is_ignored(rules, child, False):
+                listing.files.append(Path(entry.path))
+
+    walk(root / top if top else root, top, _read_rules(root / ".git" / "info" / "exclude", ""))
+    listing.files.sort()
+    return listing
+
+
+_cache: dict[tuple[Path, tuple[str, ...]], _Listing] = {}
+_cache_lock = threading.Lock()
+
+
+def swift_files(project_path: str, exclude_folders: list[str] | None = None) -> list[Path]:
+    """Every Swift file under `project_path` (sorted, absolute), cached.
+
+    Raises ValueError if `project_path` is not a directory.
+    """
+    root = Path(project_path).expanduser().resolve()
+    if not root.is_dir():
+        raise ValueError(f"Not a directory: {project_path}")
+    key = (root, tuple(sorted(exclude_folders or [])))
+    with _cache_lock:
+        cached = _cache.get(key)
+    if cached is not None and cached.is_current():
+        return list(cached.files)
+    matcher = ExcludeMatcher(exclude_folders or [])
+    repository = _git_index(root)
+    listing = _git_enumerate(root, matcher, *repository) if repository is not None else None
+    if listing is None:
+        listing = _scandir_enumerate(root, matcher)
+    with _cache_lock:
+        _cache[key] = listing
+    return list(listing.files)
+
+
+def clear_cache() -> None:
+    with _cache_lock:
+        _cache.clear()
@@ -0,0 +1,791 @@
+"""Incrementally maintained, persisted index of a project's declarations.
+
+A ProjectIndex keeps one compact FileEntry per Swift file: its imports, the
+types it references, and a flat, pre-order list of its declarations (type
+headers, members, top-level functions and globals) with their lines and byte
+ranges. Entries are keyed by the file's git blob id (see cache.py), so
+`update` only analyzes files whose content changed, and the index is saved to
+the cache directory as a binary snapshot (snapshot.py) so the next session
+starts warm: the snapshot is memory-mapped and its declarations are decoded
+only when a query returns them. A file whose (mtime, size) still matches the
+snapshot is trusted without being hashed.
+
+Declaration signatures are also kept as a single newline-delimited corpus
+(DeclarationCorpus) with a parallel line-start array, so a regex query over
+every declaration in the project is one pass of the regex engine plus a
+binary search per hit, instead of one `regex.search` call per declaration.
+
+Every update that changes anything bumps the index's generation and records
+the files it touched in a ChangeJournal, so get_project_map and find_types
+can answer `since=<token>` with only what changed (see mcp_server).
+"""
+
+from __future__ import annotations
+
+import atexit
+import hashlib
+import re
+import secrets
+import threading
+import time
+from bisect import bisect_right
+from collections import OrderedDict, deque
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import TYPE_CHECKING, Callable, Iterable, Iterator, MutableMapping, Sequence
+
+from swift_project_assistant.analyzer import (
+    LENGTH,
+    OFFSET,
+    TYPE_KINDS,
+    FileAnalysis,
+    TypeDecl,
+    analyze_structure,
+    referenced_types,
+    source_text,
+)
+from swift_project_assistant.cache import blob_id, cached_structure, configured_cache_dir, content_keys
+from swift_project_assistant.ranges import Stat, read_range
+from swift_project_assistant.symbols import SymbolIndex, SymbolMatch
+
+if TYPE_CHECKING:
+    from swift_project_assistant.snapshot import Snapshot
+
+INDEX_VERSION = 2
+
+TYPE_KIND_NAMES = frozenset(TYPE_KINDS.values())
+
+# Rough in-memory cost of an index, calibrated with tracemalloc on a
+# 2,000-file project (entries, corpus and symbol tables together).
+_BYTES_PER_FILE = 800
+_BYTES_PER_DECLARATION = 600
+_BYTES_PER_SIGNATURE_CHAR = 3
+# Files still served from a mapped snapshot hold only their corpus text and
+# symbol-table slots in memory.
+_BYTES_PER_MAPPED_DECLARATION = 100
+
+# Generations of file changes an index remembers for `since` queries.
+_JOURNAL_LENGTH = 1024
+# Distinct file listings (one per exclude_folders in use, as files come and go)
+# an index remembers, so a `since` query can compare the caller's listing with
+# the one behind its token.
+_JOURNAL_LISTINGS = 16
+
+# Seconds an index waits after its last change before its snapshot is
+# rewritten in the background, so a burst of edits costs one rewrite.
+_SAVE_DELAY = 2.0
+
+# A stat this close to "now" is not trusted to reflect the content: another
+# same-size write within the same timestamp tick would be invisible.
+_RACY_NS = 2_000_000_000
+
+
+@dataclass
+class Declaration:
+    kind: str  # a type kind ("class", "extension", …) or member kind ("method", "function", …)
+    name: str  # simple name as declared, e.g. "fetchMovies" or "Category"
+    parent: str  # qualified name of the enclosing type; "" at top level
+    signature: str  # type header ("class A.B: Base") or member signature
+    line: int
+    offset: int  # byte range of the whole declaration, body included
+    length: int
+    access: str | None = None
+    inherits: list[str] = field(default_factory=list)
+
+    @property
+    def qualified(self) -> str:
+        return f"{self.parent}.{self.name}" if self.parent else self.name
+
+    @property
+    def is_type(self) -> bool:
+        return self.kind in TYPE_KIND_NAMES
+
+
+@dataclass
+class FileEntry:
+    path: str  # relative to the project root
+    key: str  # blob id of the content this entry was built from
+    imports: list[str]
+    references: list[str]  # types used here but declared elsewhere
+    declarations: list[Declaration]
+
+
+def type_header(t: TypeDecl, prefix: str = "") -> str:
+    header = f"{t.kind} {prefix}{t.name}"
+    if t.inherits:
+        header += ": " + ", ".join(t.inherits)
+    return header
+
+
+def file_declarations(analysis: FileAnalysis) -> list[Declaration]:
+    """Every declaration in a file, in outline order.
+
+    Each type header is followed by its members and then its nested types;
+    top-level functions and globals come last.
+    """
+    out: list[Declaration] = []
+
+    def walk(types: list[TypeDecl], prefix: str = "") -> None:
+        for t in types:
+            out.append(Declaration(t.kind, t.name, prefix.rstrip("."), type_header(t, prefix),
+                                   analysis.line_of(t.offset), t.offset, t.length,
+                                   t.accessibility, list(t.inherits)))
+            qualified = prefix + t.name
+            for m, item in zip(t.members, t.member_items):
+                offset = item.get(OFFSET, t.offset)
+                out.append(Declaration(m.kind, m.name, qualified, m.declaration, analysis.line_of(offset),
+                                       offset, item.get(LENGTH, 0), m.accessibility))
+            walk(t.nested, qualified + ".")
+
+    walk(analysis.types)
+    for m, item in zip(analysis.functions + analysis.globals, analysis.function_items):
+        offset = item.get(OFFSET, 0)
+        out.append(Declaration(m.kind, m.name, "", m.declaration, analysis.line_of(offset),
+                               offset, item.get(LENGTH, 0), m.accessibility))
+    return out
+
+
+def build_entry(rel: str, key: str, analysis: FileAnalysis, structure: dict) -> FileEntry:
+    declarations = file_declarations(analysis)
+    declared = {d.name for d in declarations if d.is_type}
+    return FileEntry(rel, key, analysis.imports, referenced_types(structure, declared), declarations)
+
+
+def find_declaration(declarations: Sequence[Declaration], symbol: str) -> Declaration | None:
+    """The declaration analyzer.find_symbol_source would return for `symbol`.
+
+    Resolved over a file's flat, pre-order declaration list, so that the
+    source can be read by byte range instead of from a fresh analysis.
+    """
+    type_name, _, member_name = symbol.partition(".")
+    target = (member_name or symbol).split("(")[0]
+    for i, t in enumerate(declarations):
+        if t.is_type and t.name in (type_name, symbol):
+            if not member_name:
+                return t
+            # Its members come right after it, then its nested types' members.
+            qualified = t.qualified
+            for d in declarations[i + 1 :]:
+                if d.parent != qualified and not d.parent.startswith(qualified + "."):
+                    return None
+                if not d.is_type and d.length and d.name == target:
+                    return d
+            return None
+    members = [d for d in declarations if not d.is_type and d.length and d.name == target]
+    return next((d for d in members if not d.parent), members[0] if members else None)
+
+
+def corpus_line(signature: str) -> str:
+    """A signature as one corpus line."""
+    return signature.replace("\n", " ")
+
+
+class _Chunk:
+    """One file's signatures: its corpus lines plus each line's start offset.
+
+    A chunk from a snapshot holds a loader instead of its text, so the lines
+    stay in the map until a search joins them into the corpus.
+    """
+
+    __slots__ = ("_text", "starts", "declarations")
+
+    def __init__(self, text: str | Callable[[], str], starts: Sequence[int],
+                 declarations: Sequence[Declaration]) -> None:
+        self._text = text
+        self.starts = starts
+        self.declarations = declarations
+
+    @property
+    def text(self) -> str:
+        return self._text if isinstance(self._text, str) else self._text()
+
+    @classmethod
+    def from_declarations(cls, declarations: list[Declaration]) -> "_Chunk":
+        lines = [corpus_line(d.signature) for d in declarations]
+        starts: list[int] = []
+        pos = 0
+        for line in lines:
+            starts.append(pos)
+            pos += len(line) + 1
+        return cls("\n".join(lines), starts, declarations)
+
+
+class DeclarationCorpus:
+    """Every declaration signature of a project, as one newline-delimited string.
+
+    Each file contributes a chunk of lines with its own line-start array, built
+    once when the file is (re)indexed or taken as-is from a mapped snapshot.
+    The project-wide string is a join of the chunks, and a hit maps back to
+    its declaration with two binary searches: chunk base offsets, then the
+    chunk's line starts. Rebuilding after a change therefore costs one join
+    plus O(files), not O(declarations).
+    """
+
+    def __init__(self) -> None:
+        self._chunks: dict[str, _Chunk] = {}
+        self._order: list[str] = []
+        self._version = 0  # bumped by every change to a chunk
+        # (version, order, text, chunk bases, rels, chunks): one immutable build, so a
+        # search running alongside an update reads a consistent corpus.
+        self._built: tuple[int, tuple[str, ...], str, list[int], list[str], list[_Chunk]] | None = None
+
+    def set_file(self, rel: str, declarations: list[Declaration]) -> None:
+        self._chunks[rel] = _Chunk.from_declarations(declarations)
+        self._version += 1
+
+    def set_mapped(self, rel: str, text: Callable[[], str], starts: Sequence[int],
+                   declarations: Sequence[Declaration]) -> None:
+        """A file's chunk as stored in a snapshot; its text and declarations decode lazily."""
+        self._chunks[rel] = _Chunk(text, starts, declarations)
+        self._version += 1
+
+    def remove_file(self, rel: str) -> None:
+        if self._chunks.pop(rel, None) is not None:
+            self._version += 1
+
+    def set_order(self, order: list[str]) -> None:
+        """The file order searches use when not given one."""
+        self._order = list(order)
+
+    def _build(self, order: Sequence[str] | None = None) -> tuple[str, list[int], list[str], list[_Chunk]]:
+        files = tuple(self._order if order is None else order)
+        built = self._built
+        if built is None or built[0] != self._version or built[1] != files:
+            version = self._version  # read first: a change made meanwhile invalidates this build
+            texts: list[str] = []
+            bases: list[int] = []
+            rels: list[str] = []
+            chunks: list[_Chunk] = []
+            pos = 0
+            for rel in files:
+                chunk = self._chunks.get(rel)
+                if chunk is None or not chunk.declarations:
+                    continue
+                chunk_text = chunk.text
+                texts.append(chunk_text)
+                bases.append(pos)
+                rels.append(rel)
+                chunks.append(chunk)
+                pos += len(chunk_text) + 1
+            built = self._built = (version, files, "\n".join(texts), bases, rels, chunks)
+        return built[2:]
+
+    def __len__(self) -> int:
+        return sum(len(chunk.declarations) for chunk in self._build()[3])
+
+    def search(self, regex: re.Pattern[str], order: Sequence[str] | None = None) -> Iterator[tuple[str, Declaration]]:
+        """Declarations whose signature matches `regex`, in corpus order (or over `order`'s files, in it).
+
+        `regex` should be compiled with re.MULTILINE so that ^ and $ anchor
+        to a single signature. A match running past the end of its line is
+        re-checked against that line alone.
+        """
+        text, bases, rels, chunks = self._build(order)
+        pos = 0
+        while bases and pos <= len(text):
+            m = regex.search(text, pos)
+            if m is None:
+                return
+            fi = bisect_right(bases, m.start()) - 1
+            chunk = chunks[fi]
+            li = bisect_right(chunk.starts, m.start() - bases[fi]) - 1
+            start = bases[fi] + chunk.starts[li]
+            end = text.find("\n", start)
+            if end < 0:
+                end = len(text)
+            if m.end() <= end or regex.search(text[start:end]):
+                yield rels[fi], chunk.declarations[li]
+            pos = end + 1
+
+
+class _Entries(MutableMapping[str, FileEntry]):
+    """FileEntry by path: entries analyzed in this process over those still in a snapshot.
+
+    A snapshot file's entry is decoded on first access; `key` answers the
+    common "is this file current?" question without decoding anything.
+    """
+
+    def __init__(self) -> None:
+        self.analyzed: dict[str, FileEntry] = {}
+        self.snapshot: Snapshot | None = None
+        self.mapped: dict[str, int] = {}  # rel -> snapshot file id
+        self.mapped_keys: dict[str, str] = {}
+        self.mapped_rels: list[str] = []  # snapshot file id -> rel
+        self._decoded: dict[str, FileEntry] = {}
+
+    def attach(self, snapshot: Snapshot) -> dict[str, Stat | None]:
+        """Serve every file of `snapshot`; returns their recorded stats."""
+        self.snapshot = snapshot
+        stats: dict[str, Stat | None] = {}
+        for fid, rel, key, stat in snapshot.files():
+            self.mapped[rel] = fid
+            self.mapped_keys[rel] = key
+            self.mapped_rels.append(rel)
+            stats[rel] = stat
+        return stats
+
+    def is_mapped(self, rel: str, fid: int) -> bool:
+        return self.mapped.get(rel) == fid
+
+    def key(self, rel: str) -> str | None:
+        entry = self.analyzed.get(rel)
+        return entry.key if entry is not None else self.mapped_keys.get(rel)
+
+    def __contains__(self, rel: object) -> bool:
+        return rel in self.analyzed or rel in self.mapped
+
+    def __getitem__(self, rel: str) -> FileEntry:
+        entry = self.analyzed.get(rel)
+        if entry is not None:
+            return entry
+        entry = self._decoded.get(rel)
+        if entry is None:
+            fid = self.mapped[rel]  # KeyError if unknown
+            entry = self._decoded[rel] = self.snapshot.entry(fid)  # type: ignore[union-attr]
+        return entry
+
+    def __setitem__(self, rel: str, entry: FileEntry) -> None:
+        self._unmap(rel)
+        self.analyzed[rel] = entry
+
+    def __delitem__(self, rel: str) -> None:
+        if self.analyzed.pop(rel, None) is None and rel not in self.mapped:
+            raise KeyError(rel)
+        self._unmap(rel)
+
+    def _unmap(self, rel: str) -> None:
+        self.mapped.pop(rel, None)
+        self.mapped_keys.pop(rel, None)
+        self._decoded.pop(rel, None)
+
+    def __iter__(self) -> Iterator[str]:
+        yield from self.mapped
+        yield from self.analyzed
+
+    def __len__(self) -> int:
+        return len(self.mapped) + len(self.analyzed)
+
+
+def _index_path(root: Path) -> Path | None:
+    directory = configured_cache_dir()
+    if directory is None:
+        return None
+    digest = hashlib.sha1(str(root).encode()).hexdigest()[:16]
+    return directory / f"indexes-v{INDEX_VERSION}" / f"{digest}.snap"
+
+
+def trusted_stat(path: Path) -> Stat | None:
+    """(mtime_ns, size) of `path`, or None if missing or too recent to trust."""
+    try:
+        st = path.stat()
+    except OSError:
+        return None
+    if time.time_ns() - st.st_mtime_ns < _RACY_NS:
+        return None
+    return (st.st_mtime_ns, st.st_size)
+
+
+class ChangeJournal:
+    """The files each generation of an index changed, so tools can answer with just the changes.
+
+    Only entry and error changes are journaled. Which files a caller lists
+    depends on its exclude_folders, so each distinct listing gets an id of
+    its own, and a token names the listing its answer was for: the files a
+    caller gained or lost are then those its listing gained or lost, not
+    whatever another caller listed in between.
+
+    Tokens are `<epoch>.<generation>.<listing>`; the epoch is random per
+    index, so a token from another process or an index since evicted and
+    reloaded is recognized as unknown. Only the last _JOURNAL_LENGTH
+    generations and _JOURNAL_LISTINGS listings are kept; a token older than
+    that is unknown too.
+    """
+
+    def __init__(self) -> None:
+        self.epoch = secrets.token_hex(4)
+        self._changes: deque[tuple[int, frozenset[str]]] = deque(maxlen=_JOURNAL_LENGTH)
+        self._listing_ids: OrderedDict[tuple[str, ...], int] = OrderedDict()
+        self._listings: dict[int, tuple[str, ...]] = {}
+        self._next_listing = 0
+
+    def record(self, generation: int, rels: Iterable[str]) -> None:
+        self._changes.append((generation, frozenset(rels)))
+
+    def listing(self, rels: Sequence[str]) -> int:
+        """The id of a file listing, the same for every update that lists the same files."""
+        key = tuple(rels)
+        lid = self._listing_ids.get(key)
+        if lid is None:
+            lid = self._listing_ids[key] = self._next_listing
+            self._next_listing += 1
+            self._listings[lid] = key
+            if len(self._listing_ids) > _JOURNAL_LISTINGS:
+                _, evicted = self._listing_ids.popitem(last=False)
+                del self._listings[evicted]
+        self._listing_ids.move_to_end(key)
+        return lid
+
+    def token(self, generation: int, listing: int) -> str:
+        return f"{self.epoch}.{generation}.{listing}"
+
+    def since(self, token: str, generation: int) -> tuple[set[str], tuple[str, ...]] | None:
+        """(files changed after `token`, the listing it was for); None if it is unknown or too old."""
+        epoch, _, rest = token.partition(".")
+        since, _, listing = rest.partition(".")
+        if epoch != self.epoch or not since.isdigit() or int(since) > generation or not listing.isdigit():
+            return None
+        listed = self._listings.get(int(listing))
+        if listed is None:
+            return None
+        since_generation = int(since)
+        if since_generation < generation and (not self._changes or self._changes[0][0] > since_generation + 1):
+            return None  # the journal no longer reaches back that far
+        changed: set[str] = set()
+        for g, rels in self._changes:
+            if g > since_generation:
+                changed |= rels
+        return changed, listed
+
+
+class IndexView:
+    """A ProjectIndex as one update listed it.
+
+    Calls with different exclude_folders (from the prewarm thread, the
+    prefetcher or concurrent tool calls) update one shared index, each with
+    its own file set. `update` returns a view of its caller's set, whose
+    listing-dependent queries (order, files_declaring, dependents, the
+    searches) answer for that set whatever later updates list. Everything
+    else (entries, errors, generation, read_source, …) is the index's own.
+    """
+
+    def __init__(self, index: "ProjectIndex", order: list[str], listing: int) -> None:
+        self.index = index
+        self.order = order  # never mutated; a later update makes a new view
+        self.visible = frozenset(order)
+        self.listing = listing  # the journal's id for `order`
+
+    @property
+    def token(self) -> str:
+        """An opaque token for the index's current state as this view lists it, to ask for changes since."""
+        return self.index.journal.token(self.index.generation, self.listing)
+
+    def __getattr__(self, name: str):
+        return getattr(self.index, name)
+
+    def search_declarations(self, regex: re.Pattern[str]) -> Iterator[tuple[str, Declaration]]:
+        """(file, declaration) pairs whose signature matches, in outline order."""
+        yield from self.index.corpus.search(regex, self.order)
+
+    def search_symbols(self, query: str, limit: int = 20, kind: str | None = None) -> list[SymbolMatch]:
+        """Ranked fuzzy/prefix/camel-hump matches for a declared name."""
+        visible = self.visible
+        with self.index._lock:  # an update may be changing the postings
+            return self.index.symbols.search(
+                query, limit, lambda rel, d: rel in visible and (kind is None or d.kind == kind)
+            )
+
+    def files_declaring(self, *names: str) -> list[str]:
+        """Listed files declaring any of `names`, in listing order."""
+        found: set[str] = set()
+        with self.index._lock:
+            for name in names:
+                found |= self.index.symbols.files_declaring(name)
+        return [rel for rel in self.order if rel in found]
+
+    def dependents(self, type_name: str) -> list[str]:
+        """Listed files that reference `type_name` without declaring it, in listing order."""
+        entries = self.index.entries
+        found: set[str] = set()
+        with self.index._lock:
+            if entries.snapshot is not None:
+                for fid in entries.snapshot.referencing_files(type_name):
+                    rel = entries.mapped_rels[fid]
+                    if entries.is_mapped(rel, fid):
+                        found.add(rel)
+            found.update(rel for rel, e in entries.analyzed.items() if type_name in e.references)
+        return [rel for rel in self.order if rel in found]
+
+
+class ProjectIndex:
+    """The declarations of one project root, kept current by blob id."""
+
+    def __init__(self, root: Path) -> None:
+        self.root = root
+        self.snapshot_path = _index_path(root)  # fixed here: a later background save writes where this loaded
+        self.entries = _Entries()
+        self.errors: dict[str, str] = {}
+        self.corpus = DeclarationCorpus()
+        self._symbols: SymbolIndex | None = None
+        self._stats: dict[str, Stat | None] = {}  # the stat each entry's content was read at
+        self._lock = threading.RLock()
+        self._save_lock = threading.Lock()  # one rewrite at a time, so the newest lands last
+        self._dirty = False
+        self.generation = 0  # bumped whenever an entry or error changes
+        self.journal = ChangeJournal()
+        self.view = IndexView(self, [], self.journal.listing([]))  # the last update's file set
+        self.approx_bytes = 0
+
+    def _measure(self) -> None:
+        entries = self.entries
+        mapped_decls = declarations = chars = 0
+        for entry in entries.analyzed.values():
+            declarations += len(entry.declarations)
+            chars += sum(len(d.signature) for d in entry.declarations)
+        if entries.snapshot is not None:
+            for fid in entries.mapped.values():
+                decls, sig_chars = entries.snapshot.file_size(fid)
+                mapped_decls += decls
+                chars += sig_chars
+        self.approx_bytes = (len(entries) * _BYTES_PER_FILE + declarations * _BYTES_PER_DECLARATION
+                             + mapped_decls * _BYTES_PER_MAPPED_DECLARATION + chars * _BYTES_PER_SIGNATURE_CHAR)
+
+    @classmethod
+    def load(cls, root: Path) -> "ProjectIndex":
+        """The saved index for `root` (mapped, not decoded), or an empty one."""
+        from swift_project_assistant.snapshot import Snapshot  # snapshot.py imports this module
+
+        index = cls(root)
+        path = index.snapshot_path
+        snapshot = Snapshot.open(path, str(root)) if path is not None else None
+        if snapshot is None:
+            return index
+        index._stats = index.entries.attach(snapshot)
+        for rel, fid in index.entries.mapped.items():
+            index.corpus.set_mapped(rel, *snapshot.chunk(fid))
+        index._measure()
+        return index
+
+    def save(self) -> None:
+        """Rewrite the snapshot now if anything changed since the last save.
+
+        Only taking the file lists is done under the index lock; the rewrite
+        itself (seconds on a very large project) leaves queries running.
+        """
+        from swift_project_assistant.snapshot import SnapshotWriter
+
+        path = self.snapshot_path
+        if path is None or not self._dirty:
+            return
+        with self._save_lock:
+            with self._lock:
+                if not self._dirty:
+                    return
+                entries = self.entries
+                snapshot, mapped = entries.snapshot, list(entries.mapped.items())
+                analyzed, stats = list(entries.analyzed.items()), dict(self._stats)
+                self._dirty = False
+            writer = SnapshotWriter(str(self.root))
+            for rel, fid in mapped:
+                writer.copy_file(snapshot, fid, stats.get(rel))  # type: ignore[arg-type]
+            for rel, entry in analyzed:
+                writer.add_entry(entry, stats.get(rel))
+            try:
+                writer.write(path)
+            except OSError:
+                pass
+
+    @property
+    def symbols(self) -> SymbolIndex:
+        """The name index, built on first use (from the snapshot's name table)."""
+        with self._lock:
+            if self._symbols is None:
+                entries = self.entries
+                symbols = SymbolIndex(resolve=self._resolve)
+                snapshot = entries.snapshot
+                if snapshot is not None:
+                    for name, ids in snapshot.names():
+                        for did in ids:
+                            fid = snapshot.decl_file(did)
+                            rel = entries.mapped_rels[fid]
+                            if entries.is_mapped(rel, fid):
+                                symbols.add_mapped(rel, name, did)
+                for rel, entry in entries.analyzed.items():
+                    symbols.set_file(rel, entry.declarations)
+                self._symbols = symbols
+            return self._symbols
+
+    def _resolve(self, did: int) -> Declaration:
+        return self.entries.snapshot.declaration(did)  # type: ignore[union-attr]
+
+    def _analyze(self, f: Path, rel: str, key: str | None, stat: Stat | None) -> None:
+        try:
+            source = f.read_bytes()
+            structure = cached_structure(f, source, key)
+            analysis = analyze_structure(source, structure)
+        except (OSError, RuntimeError) as exc:
+            with self._lock:
+                self.errors[rel] = str(exc)
+            return
+        entry = build_entry(rel, key or "", analysis, structure)
+        with self._lock:
+            self.errors.pop(rel, None)
+            self.entries[rel] = entry
+            self._stats[rel] = stat
+            self.corpus.set_file(rel, entry.declarations)
+            if self._symbols is not None:
+                self._symbols.set_file(rel, entry.declarations)
+            self._dirty = True
+
+    def update(self, files: Iterable[Path], progress: Callable[[int, int], None] | None = None) -> IndexView:
+        """Bring the index in line with `files`, analyzing only changed content.
+
+        A file whose stat matches the one its entry was built from is current
+        as is; the others are keyed by blob id and re-analyzed if their
+        content changed. Entries for files outside `files` are kept (another
+        call may use a different exclude_folders) but are invisible to
+        queries until listed again; entries for files that no longer exist
+        are dropped. `progress(done, total)` is called after each file; if it
+        raises, the update stops there. Returns a view of `files` to query.
+        """
+        files = list(files)
+        rels = [str(f.relative_to(self.root)) for f in files]
+        stats = [trusted_stat(f) for f in files]
+        unverified = [f for f, rel, stat in zip(files, rels, stats)
+                      if stat is None or self._stats.get(rel) != stat or rel not in self.entries]
+        keys = content_keys(self.root, unverified) if unverified else {}
+        touched: set[str] = set()  # files whose entry or error changed
+        try:
+            for done, (f, rel, stat) in enumerate(zip(files, rels, stats), 1):
+                if f in keys or f in unverified:
+                    key = keys.get(f)
+                    if key is None or self.entries.key(rel) != key:
+                        self._analyze(f, rel, key, stat)
+                        touched.add(rel)
+                    elif self._stats.get(rel) != stat:
+                        with self._lock:
+                            self._stats[rel] = stat  # touched, not changed
+                            self._dirty = True
+                if progress is not None:
+                    progress(done, len(files))
+        except BaseException:
+            # Interrupted (e.g. the tool call was cancelled): keep what was
+            # analyzed, but don't let derived views built before it linger.
+            if touched:
+                with self._lock:
+                    self._advance(touched)
+            raise
+        with self._lock:
+            listed = set(rels)
+            view = self.view = IndexView(self, rels, self.journal.listing(rels))
+            self.corpus.set_order(rels)
+            for rel in [r for r in self.entries if r not in listed and not (self.root / r).exists()]:
+                del self.entries[rel]
+                self._stats.pop(rel, None)
+                self.corpus.remove_file(rel)
+                if self._symbols is not None:
+                    self._symbols.remove_file(rel)
+                self._dirty = True
+                touched.add(rel)
+            if touched:
+                self._advance(touched)
+                self._measure()
+        if self._dirty:
+            _saver.schedule(self)
+        return view
+
+    def _advance(self, touched: set[str]) -> None:
+        self.generation += 1
+        self.journal.record(self.generation, touched)
+
+    @property
+    def token(self) -> str:
+        """A token for the index's current state as the last update listed it."""
+        return self.view.token
+
+    def changed_since(self, token: str) -> tuple[set[str], tuple[str, ...]] | None:
+        """(files whose entry or error changed after `token`, the listing it was for).
+
+        None if the token is unknown or too old.
+        """
+        with self._lock:
+            return self.journal.since(token, self.generation)
+
+    @property
+    def order(self) -> list[str]:
+        """The last update's files, in listing order."""
+        return self.view.order
+
+    # Queries over the last update's files; a caller that listed its own set queries the view update returned.
+
+    def search_declarations(self, regex: re.Pattern[str]) -> Iterator[tuple[str, Declaration]]:
+        return self.view.search_declarations(regex)
+
+    def search_symbols(self, query: str, limit: int = 20, kind: str | None = None) -> list[SymbolMatch]:
+        return self.view.search_symbols(query, limit, kind)
+
+    def files_declaring(self, *names: str) -> list[str]:
+        return self.view.files_declaring(*names)
+
+    def dependents(self, type_name: str) -> list[str]:
+        return self.view.dependents(type_name)
+
+    def read_source(self, rel: str, declaration: Declaration) -> str | None:
+        """A declaration's source, read by byte range; None if the file changed since it was indexed.
+
+        A trusted stat is checked with fstat before the read; without one the
+        content is hashed and compared with the entry's blob id.
+        """
+        path = self.root / rel
+        stat = self._stats.get(rel)
+        if stat is not None:
+            raw = read_range(path, declaration.offset, declaration.length, stat)
+        else:
+            try:
+                data = path.read_bytes()
+            except OSError:
+                return None
+            match = blob_id(data) == self.entries.key(rel)
+            raw = data[declaration.offset : declaration.offset + declaration.length] if match else None
+        return None if raw is None else source_text(raw)
+
+
+class _SnapshotSaver:
+    """Rewrites changed indexes' snapshots on one daemon thread, off the tool-call path.
+
+    An index is saved _SAVE_DELAY seconds after the last update that changed
+    it; `flush` saves whatever is pending at once (at exit, and in tests).
+    """
+
+    def __init__(self, delay: float = _SAVE_DELAY) -> None:
+        self.delay = delay
+        self._due: dict[ProjectIndex, float] = {}
+        self._cond = threading.Condition()
+        self._thread: threading.Thread | None = None
+
+    def schedule(self, index: ProjectIndex) -> None:
+        with self._cond:
+            self._due[index] = time.monotonic() + self.delay
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="snapshot-save", daemon=True)
+                self._thread.start()
+            self._cond.notify()
+
+    def flush(self) -> None:
+        with self._cond:
+            pending = list(self._due)
+            self._due.clear()
+        for index in pending:
+            index.save()
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: self._due)
+                index, due = min(self._due.items(), key=lambda item: item[1])
+                if due > time.monotonic():
+                    self._cond.wait(due - time.monotonic())
+                    continue
+                del self._due[index]
+            try:
+                index.save()
+            except Exception:  # noqa: BLE001 - a failed save must never take the thread down
+                pass
+
+
+_saver = _SnapshotSaver()
+atexit.register(_saver.flush)
+
+
+def flush_saves() -> None:
+    """Write every snapshot still waiting for its background save."""
+    _saver.flush()
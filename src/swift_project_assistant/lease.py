@@ -0,0 +1,111 @@
+"""Cross-process markers for work in progress, so concurrent servers share it.
+
+Several stdio servers on one machine (one per agent or editor window) share
+the on-disk caches in SWIFT_ASSISTANT_CACHE. Their entries are written
+atomically (temp file + rename), so no process ever reads a partial one,
+but without coordination two servers reaching the same uncached file at
+once would both run SourceKitten on it (or both ask the LLM for the same
+summary). Before such work a process takes a lease on it: an advisory
+`flock` on `leases/<name>.lock` in the cache directory. A process that finds
+the lease held waits, checking every _POLL_INTERVAL seconds whether the
+result has appeared, and uses it instead of recomputing. The lock dies with
+its process, so a crashed holder never blocks the others; the holder
+removes the file when done.
+
+Within a process, threads are already coordinated (see cache.cached_structure);
+leases only add the cross-process step. With the cache off, or where
+`flock` isn't available, `held` grants every lease at once.
+"""
+
+from __future__ import annotations
+
+import os
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Callable, Iterator
+
+from swift_project_assistant import progress
+
+try:
+    import fcntl
+except ImportError:  # not POSIX
+    fcntl = None  # type: ignore[assignment]
+
+_POLL_INTERVAL = 0.05  # seconds between checks while another process holds a lease
+
+_stats_lock = threading.Lock()
+_stats = {"waited": 0, "reused": 0}
+
+
+def _try_lock(path: Path) -> int | None:
+    """An fd holding an exclusive lock on `path`, or None if another process holds it."""
+    while True:
+        fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            os.close(fd)
+            return None
+        except BaseException:
+            os.close(fd)
+            raise
+        try:
+            if os.stat(path).st_ino == os.fstat(fd).st_ino:
+                return fd
+        except FileNotFoundError:
+            pass
+        os.close(fd)  # locked a file its holder has just removed; try the new one
+
+
+@contextmanager
+def held(directory: Path | None, name: str, done: Callable[[], bool]) -> Iterator[bool]:
+    """Hold the lease `name` for the block, unless `done()` turns true while waiting for it.
+
+    Yields True when the lease is held (or leases are unavailable), False if
+    another process finished the work meanwhile: `done()` (e.g. "is the
+    result stored now?") returned True.
+    """
+    if directory is None or fcntl is None:
+        yield True
+        return
+    path = directory / "leases" / f"{name}.lock"
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd = _try_lock(path)
+    except OSError:
+        yield True  # leases are an optimization; work on without one
+        return
+    waited = False
+    while fd is None:
+        if not waited:
+            waited = True
+            with _stats_lock:
+                _stats["waited"] += 1
+        if done():
+            with _stats_lock:
+                _stats["reused"] += 1
+            yield False
+            return
+        progress.check_cancelled()
+        time.sleep(_POLL_INTERVAL)
+        try:
+            fd = _try_lock(path)
+        except OSError:
+            yield True
+            return
+    try:
+        yield True
+    finally:
+        try:
+            os.unlink(path)  # while still locked, so a waiter can tell a stale file from the next lease
+        except OSError:
+            pass
+        os.close(fd)
+
+
+def stats() -> dict:
+    """How often this process waited on another's lease, and how often that saved it the work."""
+    with _stats_lock:
+        return dict(_stats)
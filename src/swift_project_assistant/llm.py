@@ -13,6 +13,10 @@ The Ollama backend talks to the local Ollama HTTP API (OLLAMA_HOST,
 default http://localhost:11434). The claude-cli backend shells out to the
 `claude` binary with `-p`, which authenticates via your Claude Pro/Max
 subscription login rather than an API key.
+
+When the tool call an overview is for is cancelled (see progress.py), a
+running `claude` process is killed with its process group; an Ollama request
+in flight is left to finish, but no new one is sent.
 """
 
 from __future__ import annotations
@@ -22,6 +26,9 @@ import subprocess
 
 import httpx
 
+from swift_project_assistant import progress
+from swift_project_assistant.analyzer import kill_group
+
 DEFAULT_OLLAMA_MODEL = "qwen2.5-coder"
 DEFAULT_CLAUDE_MODEL = "haiku"
 
@@ -70,6 +77,7 @@ def _ollama_host() -> str:
 
 
 def _generate_ollama(model: str, prompt: str) -> str:
+    progress.check_cancelled()
     response = httpx.post(
         f"{_ollama_host()}/api/generate",
         json={"model": model, "prompt": prompt, "stream": False},
@@ -80,21 +88,31 @@ def _generate_ollama(model: str, prompt: str) -> str:
 
 
 def _generate_claude_cli(model: str, prompt: str) -> str:
+    progress.check_cancelled()
     try:
-        result = subprocess.run(
+        proc = subprocess.Popen(
             ["claude", "-p", "--model", model],
-            input=prompt,
-            capture_output=True,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
             text=True,
-            timeout=300,
+            start_new_session=True,
         )
     except FileNotFoundError:
         raise RuntimeError(
             "SUMMARY_LLM=claude-cli requires the Claude Code CLI (`claude`) on PATH."
         ) from None
-    if result.returncode != 0:
-        raise RuntimeError(f"claude -p failed: {result.stderr.strip()[:500]}")
-    return result.stdout.strip()
+    try:
+        with progress.on_cancel(lambda: kill_group(proc)):
+            stdout, stderr = proc.communicate(prompt, timeout=300)
+        progress.check_cancelled()
+    except BaseException:
+        kill_group(proc)
+        proc.wait()
+        raise
+    if proc.returncode != 0:
+        raise RuntimeError(f"claude -p failed: {stderr.strip()[:500]}")
+    return stdout.strip()
 
 
 def generate_overview(outline_markdown: str, source: str) -> str | None:
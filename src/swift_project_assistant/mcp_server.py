@@ -8,24 +8,37 @@ Analysis is powered by SourceKitten (the Swift compiler's tooling library),
 so it must run on a machine with SourceKitten installed:
 `brew install sourcekitten`.
 
-Run with:  swift-project-mcp  (stdio transport)
+Run with:  swift-project-mcp  (stdio transport), or
+           swift-project-mcp --transport http  (one shared server for many
+           clients, at http://127.0.0.1:8765/mcp)
 """
 
 from __future__ import annotations
 
+import argparse
+import asyncio
+import functools
+import inspect
 import json
 import os
 import re
 import subprocess
+import sys
+import threading
+import time
+from collections import OrderedDict
 from pathlib import Path
+from typing import Callable, Iterator
 
-from dotenv import load_dotenv
-from mcp.server.fastmcp import FastMCP
+import anyio
+from mcp.server.fastmcp import Context, FastMCP
 
+from swift_project_assistant.accesslog import default_access_logs
+from swift_project_assistant.admission import default_limits
 from swift_project_assistant.analyzer import (
     FileAnalysis,
+    SourceKittenTimeoutError,
     TypeDecl,
-    analyze_file,
     analyze_structure,
     extract_doc_comments,
     find_symbol_source,
@@ -34,25 +47,204 @@ from swift_project_assistant.analyzer import (
     public_interface_to_dict,
     referenced_type_names_in_text,
     referenced_types,
-    run_sourcekitten,
+    source_text,
 )
-from swift_project_assistant.summary import extract_block, get_summary
-
-DEFAULT_EXCLUDES = {".git", ".build", "Pods", "Carthage", "DerivedData", ".swiftpm"}
+from swift_project_assistant.artifact import IndexArtifact, build_artifact
+from swift_project_assistant.delta import map_delta, type_delta
+from swift_project_assistant.cache import (
+    add_readonly_tier,
+    analyze_cached,
+    cached_structure,
+    content_keys,
+    default_cache,
+)
+from swift_project_assistant.files import swift_files
+from swift_project_assistant.index import IndexView, ProjectIndex, file_declarations, find_declaration, trusted_stat
+from swift_project_assistant.lease import stats as lease_stats
+from swift_project_assistant.memo import engine, memoized, read_file, read_listing, volatile
+from swift_project_assistant.output import (
+    compact_declaration_matches,
+    compact_directory_map,
+    compact_map_delta,
+    compact_outline,
+    compact_project_map,
+    compact_type_delta,
+    compact_type_matches,
+    dump,
+)
+from swift_project_assistant.pipeline import DeadlineExceeded, configured_deadline, stream
+from swift_project_assistant.prefetch import Prefetcher, refresh_stale_summary
+from swift_project_assistant.progress import CallControl, Cancelled, report_progress
+from swift_project_assistant.prewarm import Prewarmer, configured_project_paths
+from swift_project_assistant.quarantine import QuarantinedError, default_quarantine
+from swift_project_assistant.ranges import RecentDeclarations, read_lines, read_range
+from swift_project_assistant.refdiff import diff_declarations, read_blobs, ref_analysis, ref_blobs
+from swift_project_assistant.rollup import directory_map, file_map, files_under, fit_map, normalize_path
+from swift_project_assistant.scanner import files_matching, identifier_regex, scan_files
+from swift_project_assistant.scheduler import default_scheduler
+from swift_project_assistant.summary import get_summary
 
 mcp = FastMCP("swift-project-assistant")
 
+TRANSPORTS = {"stdio": "stdio", "http": "streamable-http", "sse": "sse"}
+DEFAULT_HTTP_PORT = 8765
+
+
+def _tool(fn: Callable[..., str]) -> Callable[..., str]:
+    """Register `fn` as a tool that runs off the event loop, reports progress and can be cancelled.
+
+    Each call waits for admission (see admission.py), then runs on a worker
+    thread under a progress.CallControl, so a SourceKitten run for one
+    client never stalls the event loop serving the others. Progress
+    reported beneath it becomes MCP progress notifications (when the request
+    carries a progress token), and a client's cancellation stops it, killing
+    its subprocesses (see progress.py). `fn` is returned as is, so calling
+    it directly stays synchronous.
+    """
+
+    async def tool(ctx: Context, **arguments) -> str:
+        loop = asyncio.get_running_loop()
+
+        def report(done: int, total: int | None, phase: str | None) -> None:
+            asyncio.run_coroutine_threadsafe(ctx.report_progress(done, total, phase), loop)
+
+        call = CallControl(report)
+        try:
+            async with default_limits().admit(ctx.session):
+                return await anyio.to_thread.run_sync(functools.partial(call.run, fn, **arguments),
+                                                      abandon_on_cancel=True)
+        except Cancelled:
+            raise RuntimeError("Cancelled by the client") from None
+        except BaseException:
+            call.cancel()
+            raise
+
+    signature = inspect.signature(fn)
+    context = inspect.Parameter("ctx", inspect.Parameter.KEYWORD_ONLY, annotation=Context)
+    parameters = [*signature.parameters.values(), context]
+    tool.__signature__ = signature.replace(parameters=parameters)  # type: ignore[attr-defined]
+    tool.__annotations__ = {**fn.__annotations__, "ctx": Context}
+    mcp.add_tool(tool, name=fn.__name__, description=fn.__doc__)
+    return fn
+
 
 def _swift_files(project_path: str, exclude_folders: list[str] | None = None) -> list[Path]:
+    files = swift_files(project_path, exclude_folders)
+    read_listing(project_path, exclude_folders, files)
+    return files
+
+
+DEFAULT_MEMORY_BUDGET_MB = 1024
+
+
+def configured_memory_budget() -> int:
+    """SWIFT_ASSISTANT_MEMORY_MB as bytes: the budget for in-memory project indexes."""
+    raw = os.getenv("SWIFT_ASSISTANT_MEMORY_MB", "").strip()
+    try:
+        mb = float(raw) if raw else DEFAULT_MEMORY_BUDGET_MB
+    except ValueError:
+        raise ValueError(f"SWIFT_ASSISTANT_MEMORY_MB must be a number of megabytes, got {raw!r}") from None
+    return int(mb * 1024 * 1024)
+
+
+class ProjectRegistry:
+    """The in-memory state of each project root, under one global memory budget.
+
+    Each resolved root owns a ProjectIndex (declarations, signature corpus,
+    symbol tables) plus the memoized tool results that read its files. When
+    the indexes' estimated size exceeds the budget, the least recently used
+    projects are evicted: their index is saved to its on-disk snapshot (see
+    index.py) and dropped along with their memoized results, and is reloaded
+    from the snapshot on next use. The most recently used project is always
+    kept, even if it alone exceeds the budget. SourceKitten structures live in
+    the shared, content-addressed analysis cache, which is bounded separately.
+    """
+
+    def __init__(self, budget_bytes: int | None = None) -> None:
+        self.budget_bytes = budget_bytes
+        self._projects: OrderedDict[Path, ProjectIndex] = OrderedDict()
+        self._lock = threading.Lock()
+        self.loads = 0
+        self.evictions = 0
+
+    def get(self, root: Path) -> ProjectIndex:
+        """The index for `root`, loaded from its snapshot if not in memory."""
+        with self._lock:
+            index = self._projects.get(root)
+            if index is None:
+                index = self._projects[root] = ProjectIndex.load(root)
+                self.loads += 1
+            self._projects.move_to_end(root)
+            return index
+
+    def loaded(self, root: Path) -> bool:
+        """Whether `root`'s index is in memory (used without counting as a use)."""
+        with self._lock:
+            return root in self._projects
+
+    def containing(self, path: Path) -> tuple[ProjectIndex, str] | None:
+        """A loaded index with an entry for `path`, and its relative path there."""
+        with self._lock:
+            loaded = list(self._projects.items())
+        for root, index in loaded:
+            if root in path.parents:
+                rel = str(path.relative_to(root))
+                if rel in index.entries:
+                    return index, rel
+        return None
+
+    def enforce_budget(self) -> None:
+        """Evict least recently used projects until the rest fit the budget."""
+        budget = self.budget_bytes if self.budget_bytes is not None else configured_memory_budget()
+        evicted: list[tuple[Path, ProjectIndex]] = []
+        with self._lock:
+            total = sum(index.approx_bytes for index in self._projects.values())
+            while total > budget and len(self._projects) > 1:
+                root, index = self._projects.popitem(last=False)
+                total -= index.approx_bytes
+                evicted.append((root, index))
+                self.evictions += 1
+        for root, index in evicted:
+            index.save()
+            engine.forget(root)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._projects.clear()
+
+    def stats(self) -> dict:
+        budget = self.budget_bytes if self.budget_bytes is not None else configured_memory_budget()
+        with self._lock:
+            projects = [{"root": str(root), "files": len(index.entries),
+                         "approx_mb": round(index.approx_bytes / 2**20, 1)}
+                        for root, index in reversed(self._projects.items())]
+        return {"budget_mb": round(budget / 2**20, 1), "loads": self.loads,
+                "evictions": self.evictions, "projects": projects}
+
+
+_projects = ProjectRegistry()
+_prewarmer: Prewarmer | None = None
+_artifacts: list[IndexArtifact] = []
+_recent_declarations = RecentDeclarations()
+
+
+def _index_for(root: Path) -> ProjectIndex:
+    return _projects.get(root)
+
+
+def _project_index(project_path: str, exclude_folders: list[str] | None = None) -> IndexView:
+    """The project's declaration index, brought up to date with its files, as this call listed them."""
     root = Path(project_path).expanduser().resolve()
-    if not root.is_dir():
-        raise ValueError(f"Not a directory: {project_path}")
-    excludes = DEFAULT_EXCLUDES | set(exclude_folders or [])
-    files: list[Path] = []
-    for dirpath, dirnames, filenames in os.walk(root):
-        dirnames[:] = [d for d in dirnames if d not in excludes and not d.startswith(".")]
-        files.extend(Path(dirpath) / f for f in filenames if f.endswith(".swift"))
-    return sorted(files)
+    files = _swift_files(project_path, exclude_folders)
+    index = _index_for(root)
+    _access_logs.add_root(root)
+    for f in files:
+        read_file(f)
+    view = index.update(files, lambda done, total: report_progress(done, total, "indexing"))
+    _projects.enforce_budget()
+    if index.errors.keys() & view.visible:
+        volatile()
+    return view
 
 
 def _resolve_file(file_path: str) -> Path:
@@ -62,11 +254,85 @@ def _resolve_file(file_path: str) -> Path:
     return path
 
 
+def _analyze_recorded(path: Path, key: str | None = None) -> FileAnalysis:
+    read_file(path)
+    try:
+        return analyze_cached(path, key)
+    except (OSError, RuntimeError):
+        volatile()
+        raise
+
+
+def _note_request(path: Path) -> None:
+    _prefetcher.note_request(path)
+    _access_logs.record_file(path)
+
+
+def _analyze_timed(path: Path) -> FileAnalysis:
+    started = time.monotonic()
+    analysis = _analyze_recorded(path)
+    _access_logs.first_touch(path, time.monotonic() - started)
+    return analysis
+
+
 def _analyze(file_path: str) -> FileAnalysis:
-    return analyze_file(str(_resolve_file(file_path)))
+    path = _resolve_file(file_path)
+    _note_request(path)
+    return _analyze_timed(path)
+
 
+def _serves_file(warm_neighbors: bool = False) -> Callable[[Callable[..., str]], Callable[..., str]]:
+    """Note a tool's file as requested, and queue its neighbors once served if `warm_neighbors`.
+
+    Goes between @_tool and @memoized, so a call answered from the memo
+    still counts towards the access log and prefetching.
+    """
 
-@mcp.tool()
+    def decorate(fn: Callable[..., str]) -> Callable[..., str]:
+        @functools.wraps(fn)
+        def wrapper(file_path: str, *args, **kwargs) -> str:
+            path = _resolve_file(file_path)
+            _note_request(path)
+            result = fn(file_path, *args, **kwargs)
+            if warm_neighbors:
+                _prefetcher.after_serving(path)
+            return result
+
+        return wrapper
+
+    return decorate
+
+
+def _neighbors(path: Path) -> Iterator[Path]:
+    """The files declaring the types `path` references, then those referencing the types it declares."""
+    found = _projects.containing(path)
+    if found is None:
+        return
+    index, rel = found
+    entry = index.entries[rel]
+    for other in index.files_declaring(*entry.references):
+        yield index.root / other
+    for d in entry.declarations:
+        if d.is_type and not d.parent:
+            for other in index.dependents(d.name):
+                yield index.root / other
+
+
+_prefetcher = Prefetcher(_neighbors)
+_access_logs = default_access_logs()
+
+
+def _analyzer_for(root: Path, files: list[Path]) -> Callable[[Path], FileAnalysis]:
+    """An analyze function for `files` that reuses cached analyses by git blob id.
+
+    Blob ids for the whole set are looked up up front (one git call on a clean
+    checkout), so each file's cache check is a dictionary lookup.
+    """
+    keys = content_keys(root, files)
+    return lambda f: _analyze_recorded(f, keys.get(f))
+
+
+@_tool
 def list_swift_files(project_path: str, exclude_folders: list[str] | None = None) -> str:
     """List every Swift file in a project, with line counts.
 
@@ -86,22 +352,62 @@ def list_swift_files(project_path: str, exclude_folders: list[str] | None = None
     return json.dumps({"root": str(root), "file_count": len(entries), "files": entries}, indent=1)
 
 
-@mcp.tool()
-def get_project_map(project_path: str, exclude_folders: list[str] | None = None) -> str:
+@_tool
+@memoized
+def get_project_map(
+    project_path: str,
+    exclude_folders: list[str] | None = None,
+    format: str = "json",
+    path: str | None = None,
+    depth: int | None = None,
+    max_tokens: int | None = None,
+    since: str | None = None,
+) -> str:
     """Get a compact map of every type declared in a Swift project.
 
     Call this to understand what a project contains and where, without reading
     any source. Returns, per file, the declared types (classes, structs, enums,
     protocols, actors, extensions) and what they inherit/conform to. Use
     get_file_outline or get_symbol_source afterwards to drill into specifics.
+    format="compact" returns an indented text listing (about half the tokens);
+    "min" returns minified JSON.
+
+    On a large project, ask for a directory rollup instead: `depth` returns
+    one entry per directory (file count, type counts by kind, the protocols
+    declared there with their project-wide conformer counts, the most common
+    conformances, top-level public types), with subdirectories expanded
+    `depth` levels deep (0 = just the directory itself). `path` limits the
+    map to one directory, to drill into it. `max_tokens` picks the most
+    detailed map that fits: the per-file listing if it does, otherwise the
+    deepest rollup that does.
+
+    To refresh a map you already have, pass `since`: the answer is then just
+    the files added or changed since (`changed`, with their new entries) and
+    the files gone (`removed`), plus a `generation` token to pass as `since`
+    next time. Start with since="" to get every file and a first token. If
+    the token is unknown or too old, everything is returned with full=true.
     """
-    root = Path(project_path).expanduser().resolve()
+    if since is not None and (depth is not None or max_tokens is not None):
+        return dump({"error": "since can't be combined with depth or max_tokens"}, format, compact_project_map)
+    if path is not None or depth is not None or max_tokens is not None or since is not None:
+        index = _project_index(project_path, exclude_folders)
+        directory = normalize_path(index.root, path)
+        if since is not None:
+            return dump(map_delta(index, since, directory), format, compact_map_delta)
+        if not files_under(index, directory):
+            return dump({"error": f"No Swift files under {directory or project_path}"}, format, compact_project_map)
+        if max_tokens is not None:
+            return fit_map(index, directory, max_tokens,
+                           lambda data: dump(data, format, compact_project_map),
+                           lambda data: dump(data, format, compact_directory_map))
+        if depth is None:
+            return dump(file_map(index, directory), format, compact_project_map)
+        return dump(directory_map(index, directory, depth), format, compact_directory_map)
+
     project: dict[str, dict] = {}
-    for f in _swift_files(project_path, exclude_folders):
-        try:
-            analysis = analyze_file(str(f))
-        except (OSError, RuntimeError) as exc:
-            project[str(f.relative_to(root))] = {"error": str(exc)}
+    for rel, analysis, error in _stream_analyses(project_path, exclude_folders):
+        if analysis is None:
+            project[rel] = {"error": str(error)}
             continue
         decls = []
 
@@ -118,12 +424,14 @@ def get_project_map(project_path: str, exclude_folders: list[str] | None = None)
             entry: dict = {"types": decls}
             if analysis.functions:
                 entry["functions"] = [m.name for m in analysis.functions]
-            project[str(f.relative_to(root))] = entry
-    return json.dumps(project, indent=1)
+            project[rel] = entry
+    return dump(project, format, compact_project_map)
 
 
-@mcp.tool()
-def get_file_outline(file_path: str) -> str:
+@_tool
+@_serves_file(warm_neighbors=True)
+@memoized
+def get_file_outline(file_path: str, format: str = "json") -> str:
     """Get the structure of one Swift file as JSON with line numbers.
 
     Prefer get_file_summary when you just need to understand what a file
@@ -132,12 +440,17 @@ def get_file_outline(file_path: str) -> str:
     call). Returns imports, types, conformances, property and method
     signatures, enum cases, and nested types — no implementation bodies.
     Roughly 10x fewer tokens than the raw source.
+
+    format="compact" renders the outline as terse Swift-like text, with each
+    type's line as a trailing `// L<n>` comment; "min" returns minified JSON.
     """
-    return json.dumps(outline_to_dict(_analyze(file_path)), indent=1)
+    return dump(outline_to_dict(_analyze_timed(_resolve_file(file_path))), format, compact_outline)
 
 
-@mcp.tool()
-def get_public_interface(file_path: str, min_access: str = "internal") -> str:
+@_tool
+@_serves_file()
+@memoized
+def get_public_interface(file_path: str, min_access: str = "internal", format: str = "json") -> str:
     """Get a Swift file's interface — its types and members with the internals hidden.
 
     Like get_file_outline, but filtered by access level so you see only what a
@@ -154,51 +467,175 @@ def get_public_interface(file_path: str, min_access: str = "internal") -> str:
       - "fileprivate" / "private" / "package": other thresholds if needed.
 
     For the body of one specific declaration, use get_symbol_source /
-    get_implementation instead.
+    get_implementation instead. `format` is as for get_file_outline.
     """
-    return json.dumps(public_interface_to_dict(_analyze(file_path), min_access), indent=1)
+    interface = public_interface_to_dict(_analyze_timed(_resolve_file(file_path)), min_access)
+    return dump(interface, format, compact_outline)
+
 
+def _declarations_named(rel: str, analysis: FileAnalysis, symbols: set[str]) -> Iterator[tuple[str, dict]]:
+    """(symbol, match) for each declaration in `analysis` named one of `symbols`, in file order."""
 
-@mcp.tool()
-def find_symbol(project_path: str, symbol: str, exclude_folders: list[str] | None = None) -> str:
+    def walk(types, prefix=""):
+        for t in types:
+            if t.name in symbols:
+                yield t.name, {"file": rel, "line": analysis.line_of(t.offset), "kind": t.kind, "name": prefix + t.name}
+            for m in t.members:
+                if m.name in symbols:
+                    yield m.name, {"file": rel, "kind": m.kind, "name": f"{prefix}{t.name}.{m.name}",
+                                   "declaration": m.declaration}
+            yield from walk(t.nested, prefix + t.name + ".")
+
+    yield from walk(analysis.types)
+    for m in analysis.functions + analysis.globals:
+        if m.name in symbols:
+            yield m.name, {"file": rel, "kind": m.kind, "name": m.name, "declaration": m.declaration}
+
+
+def _find_symbols(
+    project_path: str, symbols: list[str], exclude_folders: list[str] | None, limit: int | None
+) -> tuple[dict[str, list[dict]], dict[str, Exception]]:
+    """Declarations of each of `symbols`, from one scan of the project, and the files it missed.
+
+    With `limit`, the scan stops once every symbol has that many matches.
+    """
+    matches: dict[str, list[dict]] = {symbol: [] for symbol in symbols}
+    gaps: dict[str, Exception] = {}
+    for rel, analysis, error in _stream_analyses(project_path, exclude_folders):
+        if limit is not None and all(len(found) >= limit for found in matches.values()):
+            break
+        if analysis is None:
+            gaps[rel] = error  # type: ignore[assignment]
+            continue
+        for symbol, match in _declarations_named(rel, analysis, set(matches)):
+            matches[symbol].append(match)
+    return matches, gaps
+
+
+@_tool
+def find_symbol(
+    project_path: str, symbol: str, exclude_folders: list[str] | None = None, limit: int | None = None
+) -> str:
     """Find where a type, function, property, or method is declared in a project.
 
     Call this when you know a symbol's name (e.g. "MovieViewModel" or
     "fetchMovies") but not which file defines it. Returns matching
-    declarations with file path and line number.
+    declarations with file path and line number. Set `limit` (e.g. 1 when any
+    declaration will do) to stop scanning once that many are found.
     """
-    root = Path(project_path).expanduser().resolve()
-    matches = []
-    for f in _swift_files(project_path, exclude_folders):
-        try:
-            analysis = analyze_file(str(f))
-        except (OSError, RuntimeError):
-            continue
-        rel = str(f.relative_to(root))
+    found, gaps = _find_symbols(project_path, [symbol], exclude_folders, limit)
+    matches = found[symbol]
+    result: dict = {"symbol": symbol, "matches": matches[:limit], **_scan_gaps(gaps)}
+    if limit is not None and len(matches) >= limit:
+        result["truncated"] = f"stopped at {limit} matches"
+    return json.dumps(result, indent=1)
 
-        def walk(types, prefix=""):
-            for t in types:
-                if t.name == symbol:
-                    matches.append(
-                        {"file": rel, "line": analysis.line_of(t.offset),
-                         "kind": t.kind, "name": prefix + t.name}
-                    )
-                for m in t.members:
-                    if m.name == symbol:
-                        matches.append(
-                            {"file": rel, "kind": m.kind,
-                             "name": f"{prefix}{t.name}.{m.name}", "declaration": m.declaration}
-                        )
-                walk(t.nested, prefix + t.name + ".")
 
-        walk(analysis.types)
-        for m in analysis.functions + analysis.globals:
-            if m.name == symbol:
-                matches.append({"file": rel, "kind": m.kind, "name": m.name, "declaration": m.declaration})
-    return json.dumps({"symbol": symbol, "matches": matches}, indent=1)
+@_tool
+def find_symbols(
+    project_path: str, symbols: list[str], exclude_folders: list[str] | None = None, limit: int | None = None
+) -> str:
+    """Find the declarations of several symbols in a single scan of the project.
+
+    The batch form of find_symbol: pass the names you are about to look up
+    one by one (e.g. ["MovieViewModel", "fetchMovies", "MovieService"]) and
+    get each one's matches keyed by symbol. Every file is analyzed once for
+    all of them. `limit` caps the matches per symbol; the scan stops once
+    every symbol has that many.
+    """
+    symbols = list(dict.fromkeys(symbols))
+    found, gaps = _find_symbols(project_path, symbols, exclude_folders, limit)
+    entries: dict[str, dict] = {}
+    for symbol, matches in found.items():
+        entry: dict = {"matches": matches[:limit]}
+        if limit is not None and len(matches) >= limit:
+            entry["truncated"] = f"stopped at {limit} matches"
+        entries[symbol] = entry
+    return json.dumps({"symbols": entries, **_scan_gaps(gaps)}, indent=1)
+
+
+@_tool
+@memoized
+def search_symbols(
+    project_path: str,
+    query: str,
+    limit: int = 20,
+    kind: str | None = None,
+    exclude_folders: list[str] | None = None,
+) -> str:
+    """Search declared names forgivingly: prefixes, camel humps, substrings, typos.
+
+    Use this instead of find_symbol when you only half-remember a name —
+    "MovieVM" finds MovieViewModel, "fetchMov" finds fetchMovies(for:), and
+    "MoveiService" still finds MovieService. "Type.member" narrows members to
+    matching parent types. Returns the top `limit` declarations, best match
+    first, with file, line, kind and how the name matched; optional `kind`
+    filters ("class", "method", "property", …). Far cheaper than scanning
+    get_project_map for a name.
+    """
+    matches = []
+    for m in _project_index(project_path, exclude_folders).search_symbols(query, limit, kind):
+        entry = {"name": m.declaration.qualified, "kind": m.declaration.kind, "file": m.rel,
+                 "line": m.declaration.line, "match": m.match}
+        if not m.declaration.is_type:
+            entry["declaration"] = m.declaration.signature
+        matches.append(entry)
+    return json.dumps({"query": query, "matches": matches}, indent=1)
+
 
+def _symbol_source_by_range(path: Path, symbol: str) -> str | None:
+    """A declaration's source via its recorded byte range, without analyzing the file.
 
-@mcp.tool()
+    The range comes from a loaded project index or a recent analysis of the
+    file; None if neither knows the current content.
+    """
+    read_file(path)
+    found = _projects.containing(path)
+    if found is not None:
+        index, rel = found
+        declaration = find_declaration(index.entries[rel].declarations, symbol)
+        if declaration is not None and (source := index.read_source(rel, declaration)) is not None:
+            return source
+    stat = trusted_stat(path)
+    declarations = _recent_declarations.get(path, stat) if stat is not None else None
+    declaration = find_declaration(declarations, symbol) if declarations else None
+    if declaration is None:
+        return None
+    raw = read_range(path, declaration.offset, declaration.length, stat)  # type: ignore[arg-type]
+    return None if raw is None else source_text(raw)
+
+
+def _symbol_sources(file_path: str, symbols: list[str]) -> dict[str, str]:
+    """Each symbol's source in one file, or get_symbol_source's not-found message.
+
+    Sources are read by byte range where the index or a recent analysis
+    knows it; the file is analyzed at most once for the rest.
+    """
+    path = _resolve_file(file_path)
+    _access_logs.record_file(path)
+    root = _access_logs.root_of(path)
+    sources: dict[str, str | None] = {}
+    for symbol in symbols:
+        if root is not None:
+            _access_logs.record_symbol(root, symbol)
+        sources[symbol] = _symbol_source_by_range(path, symbol)
+    missing = [symbol for symbol, source in sources.items() if source is None]
+    if missing:
+        stat = trusted_stat(path)  # taken before the read, so a concurrent edit can't be cached
+        analysis = _analyze_recorded(path)
+        if stat is not None:
+            _recent_declarations.put(path, stat, file_declarations(analysis))
+        for symbol in missing:
+            sources[symbol] = find_symbol_source(analysis, symbol)
+    return {
+        symbol: source
+        if source is not None
+        else f"Symbol '{symbol}' not found in {file_path}. Use get_file_outline to see available symbols."
+        for symbol, source in sources.items()
+    }
+
+
+@_tool
 def get_symbol_source(file_path: str, symbol: str) -> str:
     """Get the full source code of a single declaration from a Swift file.
 
@@ -207,13 +644,64 @@ def get_symbol_source(file_path: str, symbol: str) -> str:
     a qualified member ("MovieViewModel.fetchMovies"), or a top-level function
     name. Combine with find_symbol to locate the file first.
     """
-    result = find_symbol_source(_analyze(file_path), symbol)
-    if result is None:
-        return f"Symbol '{symbol}' not found in {file_path}. Use get_file_outline to see available symbols."
-    return result
+    return _symbol_sources(file_path, [symbol])[symbol]
+
+
+@_tool
+def get_symbol_sources(file_path: str, symbols: list[str]) -> str:
+    """Get the source of several declarations from one Swift file in a single call.
+
+    The batch form of get_symbol_source: pass the symbols you want (e.g.
+    ["MovieViewModel.fetchMovies", "MovieViewModel.reload"]) and get each
+    one's source keyed by symbol, or the usual not-found message for it. The
+    file is analyzed at most once. To pull symbols from several files without
+    knowing where they live, use get_implementations.
+    """
+    return json.dumps(_symbol_sources(file_path, list(dict.fromkeys(symbols))), indent=1)
+
 
+def _implementations(project_path: str, symbols: list[str], exclude_folders: list[str] | None) -> dict[str, str]:
+    """Each symbol's sources across the project, or get_implementation's not-found message.
+
+    Sources are read by byte range from the project index; a file changed
+    since it was indexed is analyzed at most once, whichever symbols it holds.
+    """
+    root = Path(project_path).expanduser().resolve()
+    index = _project_index(project_path, exclude_folders)
+    reanalyzed: dict[str, FileAnalysis | None] = {}
 
-@mcp.tool()
+    def analysis_of(rel: str) -> FileAnalysis | None:
+        if rel not in reanalyzed:
+            try:
+                reanalyzed[rel] = _analyze_recorded(root / rel)
+            except (OSError, RuntimeError):
+                reanalyzed[rel] = None
+        return reanalyzed[rel]
+
+    results: dict[str, str] = {}
+    for symbol in symbols:
+        matches: list[str] = []
+        type_name, _, member_name = symbol.partition(".")
+        for rel in index.files_declaring(type_name, (member_name or symbol).split("(")[0]):
+            declaration = find_declaration(index.entries[rel].declarations, symbol)
+            if declaration is None:
+                continue
+            source = index.read_source(rel, declaration)
+            if source is None:  # changed since it was indexed
+                analysis = analysis_of(rel)
+                source = None if analysis is None else find_symbol_source(analysis, symbol)
+            if source is not None:
+                matches.append(f"// {rel}\n{source}")
+                _access_logs.record_file(root / rel)
+        _access_logs.record_symbol(root, symbol)
+        results[symbol] = "\n\n".join(matches) if matches else (
+            f"Symbol '{symbol}' not found in {root}. Use find_symbol to search "
+            "for similar names, or get_project_map to see what's declared."
+        )
+    return results
+
+
+@_tool
 def get_implementation(project_path: str, symbol: str, exclude_folders: list[str] | None = None) -> str:
     """Get the full source of a declaration by name, searching the whole project.
 
@@ -224,24 +712,42 @@ def get_implementation(project_path: str, symbol: str, exclude_folders: list[str
     a `// <relative path>` comment. If the same name is declared in several
     files, all are returned. Use find_symbol first if you only need locations.
     """
-    root = Path(project_path).expanduser().resolve()
-    matches: list[str] = []
-    for f in _swift_files(project_path, exclude_folders):
-        try:
-            source = find_symbol_source(analyze_file(str(f)), symbol)
-        except (OSError, RuntimeError):
-            continue
-        if source is not None:
-            matches.append(f"// {f.relative_to(root)}\n{source}")
-    if not matches:
-        return (
-            f"Symbol '{symbol}' not found in {root}. Use find_symbol to search "
-            "for similar names, or get_project_map to see what's declared."
-        )
-    return "\n\n".join(matches)
+    return _implementations(project_path, [symbol], exclude_folders)[symbol]
+
 
+@_tool
+def get_implementations(project_path: str, symbols: list[str], exclude_folders: list[str] | None = None) -> str:
+    """Get the full source of several declarations by name in a single call.
 
-@mcp.tool()
+    The batch form of get_implementation: pass the symbols you are about to
+    pull in one by one (e.g. ["MovieViewModel.fetchMovies", "MovieService",
+    "makeDefaultViewModel"]) and get each one's sources keyed by symbol, in
+    get_implementation's format, or its not-found message. The project is
+    enumerated once, and no file is analyzed more than once.
+    """
+    return json.dumps(_implementations(project_path, list(dict.fromkeys(symbols)), exclude_folders), indent=1)
+
+
+@_tool
+def get_source_range(file_path: str, start_line: int, end_line: int) -> str:
+    """Get lines `start_line` through `end_line` (1-based, inclusive) of a file.
+
+    Use this to read around a line reported by find_symbol, find_references or
+    get_file_outline without pulling in the whole file. Only the requested
+    lines are read, so it stays cheap on very large (e.g. generated) files.
+    The text is prefixed with a `// <file>:<start>-<end>` comment giving the
+    lines actually returned.
+    """
+    path = _resolve_file(file_path)
+    if start_line < 1 or end_line < start_line:
+        raise ValueError("start_line must be >= 1 and end_line >= start_line")
+    text, last, total = read_lines(path, start_line, end_line)
+    if last < start_line:
+        return f"{file_path} has only {total} lines."
+    return f"// {file_path}:{start_line}-{last}\n{text}"
+
+
+@_tool
 def get_file_summary(file_path: str, refresh: bool = False) -> str:
     """Get a markdown summary of a Swift file: imports, types, member signatures.
 
@@ -263,10 +769,16 @@ def get_file_summary(file_path: str, refresh: bool = False) -> str:
     claude-cli[:model]), regenerated summaries also include an LLM-written
     prose Overview section.
     """
-    return get_summary(_resolve_file(file_path), refresh=refresh)
+    path = _resolve_file(file_path)
+    _note_request(path)
+    started = time.monotonic()
+    summary = get_summary(path, refresh=refresh)
+    _access_logs.first_touch(path, time.monotonic() - started)
+    _prefetcher.after_serving(path)
+    return summary
 
 
-@mcp.tool()
+@_tool
 def get_file_dependencies(file_path: str) -> str:
     """Get the imports of a Swift file plus the external type names it references.
 
@@ -274,8 +786,9 @@ def get_file_dependencies(file_path: str) -> str:
     which modules it imports and which types declared elsewhere it uses.
     """
     path = _resolve_file(file_path)
-    structure = run_sourcekitten(str(path))
-    analysis = analyze_structure(path.read_bytes(), structure)
+    source = path.read_bytes()
+    structure = cached_structure(path, source)
+    analysis = analyze_structure(source, structure)
     declared: set[str] = set()
 
     def collect(types):
@@ -294,7 +807,7 @@ def get_file_dependencies(file_path: str) -> str:
     )
 
 
-@mcp.tool()
+@_tool
 def get_doc_comments(file_path: str) -> str:
     """Get the authored doc comments (/// and /** */) for a file's declarations.
 
@@ -306,7 +819,7 @@ def get_doc_comments(file_path: str) -> str:
     return json.dumps(extract_doc_comments(_analyze(file_path)), indent=1)
 
 
-@mcp.tool()
+@_tool
 def find_references(project_path: str, symbol: str, exclude_folders: list[str] | None = None) -> str:
     """Find every place a name is used across a project (call sites, usages).
 
@@ -319,46 +832,48 @@ def find_references(project_path: str, symbol: str, exclude_folders: list[str] |
     """
     root = Path(project_path).expanduser().resolve()
     name = symbol.split(".")[-1].split("(")[0]
-    word = re.compile(rf"\b{re.escape(name)}\b")
     cap = 400
-    refs: list[dict] = []
-    truncated = False
-    for f in _swift_files(project_path, exclude_folders):
-        try:
-            text = f.read_text(encoding="utf-8")
-        except (OSError, UnicodeDecodeError):
-            continue
-        parsed = extract_block(text)
-        skip_until = text[: parsed[2]].count("\n") + 1 if parsed else 0
-        for i, line in enumerate(text.split("\n"), start=1):
-            if i < skip_until:
-                continue
-            if word.search(line):
-                refs.append({"file": str(f.relative_to(root)), "line": i, "text": line.strip()})
-                if len(refs) >= cap:
-                    truncated = True
-                    break
-        if truncated:
-            break
+    hits, truncated = scan_files(_swift_files(project_path, exclude_folders), identifier_regex(name), cap=cap)
+    refs = [{"file": str(h.path.relative_to(root)), "line": h.line, "text": h.text} for h in hits]
     result = {"symbol": symbol, "identifier": name, "count": len(refs), "references": refs}
     if truncated:
         result["truncated"] = f"stopped at {cap} matches; narrow the search"
     return json.dumps(result, indent=1)
 
 
-def _project_analyses(project_path: str, exclude_folders: list[str] | None) -> dict[str, FileAnalysis]:
-    """Parse every Swift file once; returns {relative_path: FileAnalysis}."""
+def _stream_analyses(
+    project_path: str, exclude_folders: list[str] | None
+) -> Iterator[tuple[str, FileAnalysis | None, Exception | None]]:
+    """(relative path, analysis, error) per Swift file, in listing order, analyzed in parallel.
+
+    See pipeline.py: only a few analyses are alive at once, and breaking out
+    of the loop cancels the files not yet analyzed.
+    """
     root = Path(project_path).expanduser().resolve()
-    out: dict[str, FileAnalysis] = {}
-    for f in _swift_files(project_path, exclude_folders):
-        try:
-            out[str(f.relative_to(root))] = analyze_file(str(f))
-        except (OSError, RuntimeError):
-            continue
+    files = _swift_files(project_path, exclude_folders)
+    analyze = _analyzer_for(root, files)
+    results = stream(analyze, files, errors=(OSError, RuntimeError), timeout=configured_deadline())
+    for done, (f, analysis, error) in enumerate(results, 1):
+        if isinstance(error, DeadlineExceeded):
+            volatile()
+        report_progress(done, len(files), "analyzing")
+        yield str(f.relative_to(root)), analysis, error
+
+
+def _scan_gaps(gaps: dict[str, Exception]) -> dict:
+    """What a scan left out: files whose analysis timed out or is quarantined, and files past the deadline."""
+    out: dict = {}
+    timed_out = [rel for rel, e in gaps.items() if isinstance(e, (SourceKittenTimeoutError, QuarantinedError))]
+    if timed_out:
+        out["timed_out"] = timed_out
+    skipped = [e for e in gaps.values() if isinstance(e, DeadlineExceeded)]
+    if skipped:
+        out["incomplete"] = f"{len(skipped)} files {skipped[0]}"
     return out
 
 
-@mcp.tool()
+@_tool
+@memoized
 def get_context_bundle(
     project_path: str,
     symbol: str,
@@ -374,31 +889,33 @@ def get_context_bundle(
     safely — in one call, instead of many file reads. Types referenced but not
     declared in the project (framework types) are listed by name only.
     """
-    analyses = _project_analyses(project_path, exclude_folders)
-
     focal_src: str | None = None
     focal_rel = ""
-    focal_analysis: FileAnalysis | None = None
     also_in: list[str] = []
-    for rel, a in analyses.items():
-        src = find_symbol_source(a, symbol)
-        if src is None:
+    # Every declared type, so references can be resolved to interfaces. Only
+    # the type trees are kept, not the files' sources.
+    index: dict[str, tuple[str, TypeDecl]] = {}
+    gaps: dict[str, Exception] = {}
+    for rel, a, error in _stream_analyses(project_path, exclude_folders):
+        if a is None:
+            gaps[rel] = error  # type: ignore[assignment]
             continue
-        if focal_src is None:
-            focal_src, focal_rel, focal_analysis = src, rel, a
-        else:
-            also_in.append(rel)
-    if focal_src is None or focal_analysis is None:
-        return f"Symbol '{symbol}' not found in {project_path}. Use find_symbol or get_project_map."
+        src = find_symbol_source(a, symbol)
+        if src is not None:
+            if focal_src is None:
+                focal_src, focal_rel = src, rel
+            else:
+                also_in.append(rel)
 
-    # Index every declared type so references can be resolved to interfaces.
-    index: dict[str, tuple[str, TypeDecl]] = {}
-    for rel, a in analyses.items():
-        def collect(types: list[TypeDecl]) -> None:
+        def collect(types: list[TypeDecl], rel: str = rel) -> None:
             for t in types:
                 index.setdefault(t.name, (rel, t))
                 collect(t.nested)
         collect(a.types)
+    missing = _scan_gaps(gaps)
+    if focal_src is None:
+        note = f" ({missing['incomplete']})" if "incomplete" in missing else ""
+        return f"Symbol '{symbol}' not found in {project_path}{note}. Use find_symbol or get_project_map."
 
     declared_here = {name for name in index if index[name][0] == focal_rel}
     refs = referenced_type_names_in_text(focal_src, declared_here)
@@ -426,15 +943,23 @@ def get_context_bundle(
     overflow = [n for n in refs if n in index][max_references:]
     if overflow:
         footer.append(f"// {len(overflow)} more referenced types omitted (raise max_references): {', '.join(overflow)}")
+    if "timed_out" in missing:
+        footer.append(f"// not analyzed (SourceKitten timed out): {', '.join(missing['timed_out'])}")
+    if "incomplete" in missing:
+        footer.append(f"// {missing['incomplete']}")
     return "\n\n".join(parts) + ("\n\n" + "\n".join(footer) if footer else "")
 
 
-@mcp.tool()
+@_tool
+@memoized
 def find_types(
     project_path: str,
     inherits: str | None = None,
     kind: str | None = None,
     exclude_folders: list[str] | None = None,
+    format: str = "json",
+    limit: int | None = None,
+    since: str | None = None,
 ) -> str:
     """Find types across a project by what they conform to / subclass, or by kind.
 
@@ -443,11 +968,27 @@ def find_types(
     of a protocol, or every `enum` (kind="enum"). `inherits` matches the type's
     inheritance clause, which covers both superclasses and protocol
     conformances (SourceKitten does not distinguish them). Returns file, line,
-    kind, qualified name, and the inheritance list for each match.
+    kind, qualified name, and the inheritance list for each match
+    (format="compact": one `file:line kind Name: Inherits` line per match).
+    Set `limit` to stop scanning once that many types are found.
+
+    To refresh a result you already have, pass `since` (see get_project_map):
+    the answer lists the matches in the files changed since, which replace
+    any you had for the files in `changed_files`, plus the files `removed`
+    and a new `generation` token. Start with since="" for a first token.
     """
-    root = Path(project_path).expanduser().resolve()
+    if since is not None:
+        index = _project_index(project_path, exclude_folders)
+        return dump(type_delta(index, since, inherits, kind), format, compact_type_delta)
     matches: list[dict] = []
-    for rel, a in _project_analyses(project_path, exclude_folders).items():
+    gaps: dict[str, Exception] = {}
+    for rel, a, error in _stream_analyses(project_path, exclude_folders):
+        if limit is not None and len(matches) >= limit:
+            break
+        if a is None:
+            gaps[rel] = error  # type: ignore[assignment]
+            continue
+
         def walk(types: list[TypeDecl], prefix: str = "") -> None:
             for t in types:
                 if (kind is None or t.kind == kind) and (inherits is None or inherits in t.inherits):
@@ -457,10 +998,13 @@ def find_types(
                     matches.append(entry)
                 walk(t.nested, prefix + t.name + ".")
         walk(a.types)
-    return json.dumps({"inherits": inherits, "kind": kind, "matches": matches}, indent=1)
+    result: dict = {"inherits": inherits, "kind": kind, "matches": matches[:limit], **_scan_gaps(gaps)}
+    if limit is not None and len(matches) >= limit:
+        result["truncated"] = f"stopped at {limit} matches"
+    return dump(result, format, compact_type_matches)
 
 
-@mcp.tool()
+@_tool
 def get_dependents(project_path: str, type_name: str, exclude_folders: list[str] | None = None) -> str:
     """Find which files reference a type — the reverse of get_file_dependencies.
 
@@ -470,11 +1014,21 @@ def get_dependents(project_path: str, type_name: str, exclude_folders: list[str]
     find_references for the exact lines.
     """
     root = Path(project_path).expanduser().resolve()
-    dependents: list[str] = []
-    for f in _swift_files(project_path, exclude_folders):
+    if _projects.loaded(root):
+        # The index (e.g. mapped from its snapshot) keeps reference postings.
+        dependents = _project_index(project_path, exclude_folders).dependents(type_name)
+        return json.dumps({"type": type_name, "dependent_files": dependents}, indent=1)
+    dependents = []
+    # Only files that mention the name textually can reference it, so a cheap
+    # scan narrows the set before SourceKitten runs.
+    candidates = files_matching(_swift_files(project_path, exclude_folders), identifier_regex(type_name))
+    keys = content_keys(root, candidates)
+    for done, f in enumerate(candidates):
+        report_progress(done, len(candidates), "analyzing")
         try:
-            structure = run_sourcekitten(str(f))
-            analysis = analyze_structure(f.read_bytes(), structure)
+            source = f.read_bytes()
+            structure = cached_structure(f, source, keys.get(f))
+            analysis = analyze_structure(source, structure)
         except (OSError, RuntimeError):
             continue
         declared: set[str] = set()
@@ -489,10 +1043,11 @@ def get_dependents(project_path: str, type_name: str, exclude_folders: list[str]
             continue
         if type_name in referenced_types(structure, declared):
             dependents.append(str(f.relative_to(root)))
+    report_progress(len(candidates), len(candidates), "analyzing")
     return json.dumps({"type": type_name, "dependent_files": dependents}, indent=1)
 
 
-@mcp.tool()
+@_tool
 def get_outlines(paths: list[str], exclude_folders: list[str] | None = None) -> str:
     """Get outlines for many files (or whole folders) in a single call.
 
@@ -502,30 +1057,37 @@ def get_outlines(paths: list[str], exclude_folders: list[str] | None = None) ->
     round trip instead of one call per file.
     """
     result: dict[str, dict] = {}
+    batches: list[tuple[list[Path], Callable[[Path], FileAnalysis]]] = []
     for p in paths:
         path = Path(p).expanduser().resolve()
         if path.is_dir():
-            for f in _swift_files(str(path), exclude_folders):
-                try:
-                    result[str(f)] = outline_to_dict(analyze_file(str(f)))
-                except (OSError, RuntimeError) as exc:
-                    result[str(f)] = {"error": str(exc)}
+            files = _swift_files(str(path), exclude_folders)
+            batches.append((files, _analyzer_for(path, files)))
         elif path.is_file():
-            try:
-                result[str(path)] = outline_to_dict(analyze_file(str(path)))
-            except (OSError, RuntimeError) as exc:
-                result[str(path)] = {"error": str(exc)}
+            batches.append(([path], analyze_cached))
         else:
             result[str(path)] = {"error": "not found"}
+    total = sum(len(files) for files, _ in batches)
+    done = 0
+    for files, analyze in batches:
+        for f in files:
+            report_progress(done, total, "analyzing")
+            try:
+                result[str(f)] = outline_to_dict(analyze(f))
+            except (OSError, RuntimeError) as exc:
+                result[str(f)] = {"error": str(exc)}
+            done += 1
+    report_progress(done, total, "analyzing")
     return json.dumps(result, indent=1)
 
 
-@mcp.tool()
+@_tool
 def changed_files_context(
     project_path: str,
     git_ref: str = "HEAD",
     interface_only: bool = False,
     exclude_folders: list[str] | None = None,
+    diff: bool = False,
 ) -> str:
     """Outline the Swift files changed versus a git ref — focused diff context.
 
@@ -534,7 +1096,13 @@ def changed_files_context(
     Returns each changed file's outline (or its public interface when
     interface_only=true), plus any deleted files. `git_ref` defaults to HEAD
     (working tree vs last commit); pass a branch or commit to diff against it.
+    With diff=true, each file lists only the declarations `added`, `removed`
+    or `modified` since the ref (with their lines; `was` holds a changed
+    signature), which is far smaller than whole outlines when a few methods
+    changed; files whose declarations are all unchanged go in `unchanged`.
     """
+    if diff and interface_only:
+        return json.dumps({"error": "diff and interface_only can't be combined"}, indent=1)
     root = Path(project_path).expanduser().resolve()
     proc = subprocess.run(
         ["git", "-C", str(root), "diff", "--name-only", git_ref, "--", "*.swift"],
@@ -545,57 +1113,207 @@ def changed_files_context(
         return json.dumps({"error": f"git diff failed: {proc.stderr.strip()}"}, indent=1)
     changed: dict[str, dict] = {}
     deleted: list[str] = []
+    present: list[Path] = []
     for rel in filter(None, proc.stdout.splitlines()):
-        fp = root / rel
-        if not fp.exists():
+        if (root / rel).exists():
+            present.append(root / rel)
+        else:
             deleted.append(rel)
-            continue
+    if diff:
+        return _declaration_diff(root, git_ref, present, deleted)
+    analyze = _analyzer_for(root, present)
+    for done, fp in enumerate(present):
+        report_progress(done, len(present), "analyzing")
+        rel = str(fp.relative_to(root))
         try:
-            analysis = analyze_file(str(fp))
+            analysis = analyze(fp)
         except (OSError, RuntimeError) as exc:
             changed[rel] = {"error": str(exc)}
             continue
         changed[rel] = public_interface_to_dict(analysis) if interface_only else outline_to_dict(analysis)
+    report_progress(len(present), len(present), "analyzing")
     return json.dumps({"git_ref": git_ref, "changed": changed, "deleted": deleted}, indent=1)
 
 
-@mcp.tool()
-def search_declarations(project_path: str, pattern: str, exclude_folders: list[str] | None = None) -> str:
+def _declaration_diff(root: Path, git_ref: str, present: list[Path], deleted: list[str]) -> str:
+    """changed_files_context with diff=true: the declarations that changed in each file."""
+    rels = [str(fp.relative_to(root)) for fp in present]
+    try:
+        blobs = ref_blobs(root, git_ref, rels)
+        contents = read_blobs(root, list(dict.fromkeys(blobs.values())))
+    except RuntimeError as exc:
+        return json.dumps({"error": str(exc)}, indent=1)
+    changed: dict[str, dict] = {}
+    unchanged: list[str] = []
+    analyze = _analyzer_for(root, present)
+    for done, (fp, rel) in enumerate(zip(present, rels)):
+        report_progress(done, len(present), "analyzing")
+        sha = blobs.get(rel)
+        try:
+            old = ref_analysis(root, rel, sha, contents[sha]) if sha in contents else None
+            declarations = diff_declarations(old, analyze(fp))
+        except (OSError, RuntimeError) as exc:
+            changed[rel] = {"error": str(exc)}
+            continue
+        if declarations:
+            changed[rel] = declarations
+        else:
+            unchanged.append(rel)
+    report_progress(len(present), len(present), "analyzing")
+    result: dict = {"git_ref": git_ref, "changed": changed, "deleted": deleted}
+    if unchanged:
+        result["unchanged"] = unchanged
+    return json.dumps(result, indent=1)
+
+
+@_tool
+@memoized
+def search_declarations(
+    project_path: str, pattern: str, exclude_folders: list[str] | None = None, format: str = "json"
+) -> str:
     """Search declaration signatures across a project with a regular expression.
 
     Token-cheap structural discovery for when you know the shape but not the
     name — e.g. pattern="-> \\[Workout\\]" to find functions returning
     [Workout], or "@Published" / "async throws". Matches type headers and
     member/function signatures. Returns file, line/qualified name, and the
-    matching declaration.
+    matching declaration (format="compact": grouped under each file, one
+    declaration per line).
     """
     try:
-        regex = re.compile(pattern)
+        regex = re.compile(pattern, re.MULTILINE)
     except re.error as exc:
-        return json.dumps({"error": f"invalid regex: {exc}"}, indent=1)
+        return dump({"error": f"invalid regex: {exc}"}, format, compact_declaration_matches)
     matches: list[dict] = []
-    for rel, a in _project_analyses(project_path, exclude_folders).items():
-        def walk(types: list[TypeDecl], prefix: str = "") -> None:
-            for t in types:
-                header = f"{t.kind} {prefix}{t.name}"
-                if t.inherits:
-                    header += ": " + ", ".join(t.inherits)
-                if regex.search(header):
-                    matches.append({"file": rel, "line": a.line_of(t.offset), "declaration": header})
-                for m in t.members:
-                    if regex.search(m.declaration):
-                        matches.append({"file": rel, "name": f"{prefix}{t.name}.{m.name}", "declaration": m.declaration})
-                walk(t.nested, prefix + t.name + ".")
-        walk(a.types)
-        for m in a.functions + a.globals:
-            if regex.search(m.declaration):
-                matches.append({"file": rel, "declaration": m.declaration})
-    return json.dumps({"pattern": pattern, "match_count": len(matches), "matches": matches}, indent=1)
-
+    for rel, d in _project_index(project_path, exclude_folders).search_declarations(regex):
+        if d.is_type:
+            matches.append({"file": rel, "line": d.line, "declaration": d.signature})
+        elif d.parent:
+            matches.append({"file": rel, "name": d.qualified, "declaration": d.signature})
+        else:
+            matches.append({"file": rel, "declaration": d.signature})
+    result = {"pattern": pattern, "match_count": len(matches), "matches": matches}
+    return dump(result, format, compact_declaration_matches)
+
+
+@_tool
+def get_server_stats() -> str:
+    """Report this server's cache effectiveness: memoized tool results and analyses.
+
+    `queries` counts, per tool, calls answered from a memoized result (hits),
+    first-time computations (misses) and recomputations because a file or
+    listing the result depended on changed (invalidated). `analysis_cache`
+    counts SourceKitten structures served from the blob-id cache. `prewarm`
+    shows the progress of projects indexed in the background at startup,
+    `projects` the indexes held in memory against SWIFT_ASSISTANT_MEMORY_MB,
+    `artifacts` the index artifacts loaded with --index, `scheduler` the
+    SourceKitten queue (depth, running jobs and wait times per priority
+    class), `prefetch` the files analyzed speculatively and how many were
+    then asked for, `access_log` how long each file's first analysis of the
+    session took, for files warmed from the access log and for the rest,
+    `calls` the tool calls running and waiting for admission, `leases` how
+    often this server waited on work another server sharing the cache had
+    in progress and reused its result, and `quarantined` the files skipped
+    because SourceKitten repeatedly timed out on them.
+    """
+    analyses = default_cache()
+    stats = {**engine.stats(), "analysis_cache": {"hits": analyses.hits, "misses": analyses.misses},
+             "projects": _projects.stats(), "scheduler": default_scheduler().stats(),
+             "prefetch": _prefetcher.stats(), "access_log": _access_logs.stats(),
+             "calls": default_limits().stats(), "leases": lease_stats()}
+    if _prewarmer is not None:
+        stats["prewarm"] = _prewarmer.stats()
+    if _artifacts:
+        stats["artifacts"] = [a.stats() for a in _artifacts]
+    if quarantined := default_quarantine().files():
+        stats["quarantined"] = quarantined
+    return json.dumps(stats, indent=1)
+
+
+def start_prewarm(roots: list[str]) -> Prewarmer:
+    """Index `roots` on a low-priority background thread; see prewarm.py.
+
+    The files each project's access log shows as hottest go first, with their
+    stale standalone summaries (see accesslog.py).
+    """
+    global _prewarmer
 
-def main() -> None:
+    def warm(root: str, files: list[Path], progress) -> None:
+        index = _index_for(Path(root))
+        if hot := _access_logs.hot_files(Path(root), files):
+            index.update(hot)
+            for f in hot:
+                try:
+                    refresh_stale_summary(f)
+                except (OSError, RuntimeError):
+                    pass
+            _access_logs.mark_warmed(hot)
+        index.update(files, progress)
+        _projects.enforce_budget()
+
+    _prewarmer = Prewarmer(roots, warm)
+    for p in _prewarmer.progress:
+        _access_logs.add_root(Path(p.root))
+    _prewarmer.start()
+    return _prewarmer
+
+
+def load_artifacts(paths: list[str]) -> list[IndexArtifact]:
+    """Serve analyses from index artifacts (see artifact.py) before running SourceKitten."""
+    artifacts = [IndexArtifact(Path(p).expanduser()) for p in paths]
+    for artifact in artifacts:
+        add_readonly_tier(artifact)
+    _artifacts.extend(artifacts)
+    return artifacts
+
+
+def _index_command(args: argparse.Namespace) -> None:
+    manifest = build_artifact(Path(args.root), Path(args.out), args.exclude, args.jobs)
+    for rel, error in sorted(manifest["errors"].items()):
+        print(f"{rel}: {error}", file=sys.stderr)
+    commit = (manifest["commit"] or "no commit")[:12] + (" (dirty)" if manifest["dirty"] else "")
+    print(f"Indexed {len(manifest['files'])} files at {commit} -> {args.out}", file=sys.stderr)
+
+
+def main(argv: list[str] | None = None) -> None:
+    from dotenv import load_dotenv  # only the CLI entry point reads .env
+
+    parser = argparse.ArgumentParser(prog="swift-project-mcp", description="Swift code intelligence MCP server.")
+    parser.add_argument(
+        "--transport", choices=sorted(TRANSPORTS), default="stdio",
+        help="stdio (default), or serve many clients from one process over streamable HTTP or SSE on localhost",
+    )
+    parser.add_argument("--port", type=int, default=None, help=f"HTTP port (default {DEFAULT_HTTP_PORT})")
+    parser.add_argument(
+        "--project", action="append", default=[], metavar="PATH",
+        help="index this project in the background at startup (repeatable; adds to SWIFT_PROJECT_PATHS)",
+    )
+    parser.add_argument(
+        "--index", action="append", default=[], metavar="FILE",
+        help="serve analyses from an index artifact built by `swift-project-mcp index` (repeatable)",
+    )
+    commands = parser.add_subparsers(dest="command")
+    index = commands.add_parser("index", help="analyze a project into a shareable index artifact and exit")
+    index.add_argument("root", help="project root")
+    index.add_argument("--out", required=True, metavar="FILE", help="artifact to write")
+    index.add_argument("--exclude", action="append", default=[], metavar="DIR", help="folder to skip (repeatable)")
+    index.add_argument("--jobs", type=int, default=None, help="parallel SourceKitten runs (default: CPU count)")
+    args = parser.parse_args(argv)
     load_dotenv()  # pick up SUMMARY_LLM etc. from a .env in the working directory
-    mcp.run()
+    if args.command == "index":
+        _index_command(args)
+        return
+    try:
+        load_artifacts(args.index)
+    except ValueError as exc:
+        parser.error(str(exc))
+    roots = list(dict.fromkeys(configured_project_paths() + args.project))
+    if roots:
+        start_prewarm(roots)
+    if args.transport != "stdio":
+        mcp.settings.host = "127.0.0.1"  # local agents only; FastMCP also rejects foreign Host headers
+        mcp.settings.port = args.port or DEFAULT_HTTP_PORT
+    mcp.run(TRANSPORTS[args.transport])
 
 
 if __name__ == "__main__":
@@ -0,0 +1,222 @@
+"""Dependency-tracked memoization of tool results.
+
+Most tool calls in an agent session repeat a question whose inputs have not
+changed: the same project map, the same interface, the same type search. The
+QueryEngine memoizes a tool's result by its arguments and records, while the
+tool runs, every input it read:
+
+- files, by stat signature (mtime, size, inode), recorded *before* the file is
+  read so a concurrent edit can only cause a spurious recompute, never a
+  stale answer;
+- file listings (a project root plus its exclude_folders), by the listed
+  paths.
+
+A memoized result is served only after re-checking those inputs: one stat per
+file and one (itself cached) listing lookup per project, instead of
+re-analyzing every file and rebuilding the answer. Reads are recorded through
+a context variable, so the helpers that read files only call `read_file` /
+`read_listing`; a memoized query that calls another inherits its inputs, as
+in salsa or a build system's dependency graph.
+
+Results are not memoized when the computation raised or saw a failure it
+reported inline (`volatile()`), so a transient SourceKitten error is retried
+on the next call.
+"""
+
+from __future__ import annotations
+
+import functools
+import inspect
+import json
+import os
+import threading
+from collections import OrderedDict
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, TypeVar
+
+from swift_project_assistant.files import swift_files
+
+T = TypeVar("T")
+
+StatSignature = tuple[int, int, int] | None  # (mtime_ns, size, inode); None if missing
+ListingKey = tuple[str, tuple[str, ...]]  # (project_path, sorted exclude_folders)
+
+
+def stat_signature(path: Path) -> StatSignature:
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return (st.st_mtime_ns, st.st_size, st.st_ino)
+
+
+@dataclass
+class _Inputs:
+    files: dict[Path, StatSignature] = field(default_factory=dict)
+    listings: dict[ListingKey, tuple[Path, ...]] = field(default_factory=dict)
+    volatile: bool = False
+
+    def merge(self, other: "_Inputs") -> None:
+        for path, sig in other.files.items():
+            self.files.setdefault(path, sig)
+        for key, listed in other.listings.items():
+            self.listings.setdefault(key, listed)
+        self.volatile |= other.volatile
+
+
+_recording: ContextVar[_Inputs | None] = ContextVar("memo_recording", default=None)
+
+
+def read_file(path: Path) -> None:
+    """Record that the running query depends on `path`'s content."""
+    inputs = _recording.get()
+    if inputs is not None and path not in inputs.files:
+        inputs.files[path] = stat_signature(path)
+
+
+def read_listing(project_path: str, exclude_folders: list[str] | None, listed: list[Path]) -> None:
+    """Record that the running query depends on a project's Swift file listing."""
+    inputs = _recording.get()
+    if inputs is not None:
+        inputs.listings.setdefault((project_path, tuple(sorted(exclude_folders or []))), tuple(listed))
+
+
+def volatile() -> None:
+    """Mark the running query's result as not worth memoizing (it saw an error)."""
+    inputs = _recording.get()
+    if inputs is not None:
+        inputs.volatile = True
+
+
+def _listing_current(key: ListingKey, listed: tuple[Path, ...]) -> bool:
+    project_path, excludes = key
+    try:
+        return tuple(swift_files(project_path, list(excludes))) == listed
+    except ValueError:
+        return False
+
+
+@dataclass
+class _Entry:
+    value: Any
+    inputs: _Inputs
+
+    def is_current(self) -> bool:
+        return all(stat_signature(p) == sig for p, sig in self.inputs.files.items()) and all(
+            _listing_current(key, listed) for key, listed in self.inputs.listings.items()
+        )
+
+
+@dataclass
+class QueryStats:
+    hits: int = 0
+    misses: int = 0  # never computed, or evicted
+    invalidated: int = 0  # computed before, but an input changed
+
+    def to_dict(self) -> dict:
+        calls = self.hits + self.misses + self.invalidated
+        return {"calls": calls, "hits": self.hits, "misses": self.misses,
+                "invalidated": self.invalidated, "hit_rate": round(self.hits / calls, 3) if calls else None}
+
+
+class QueryEngine:
+    """Memoized query results, each validated against the inputs it read."""
+
+    def __init__(self, max_entries: int = 512) -> None:
+        self.max_entries = max_entries
+        self._entries: OrderedDict[tuple[str, str], _Entry] = OrderedDict()
+        self._stats: dict[str, QueryStats] = {}
+        self._lock = threading.Lock()
+
+    def run(self, name: str, args_key: str, compute: Callable[[], T]) -> T:
+        """The result of `compute`, reused while everything it read is unchanged."""
+        key = (name, args_key)
+        parent = _recording.get()
+        with self._lock:
+            entry = self._entries.get(key)
+            stats = self._stats.setdefault(name, QueryStats())
+        if entry is not None and entry.is_current():
+            with self._lock:
+                stats.hits += 1
+                self._entries.move_to_end(key)
+            if parent is not None:
+                parent.merge(entry.inputs)
+            return entry.value
+
+        inputs = _Inputs()
+        token = _recording.set(inputs)
+        try:
+            value = compute()
+        except BaseException:
+            inputs.volatile = True
+            raise
+        finally:
+            _recording.reset(token)
+            if parent is not None:
+                parent.merge(inputs)
+        with self._lock:
+            if entry is None:
+                stats.misses += 1
+            else:
+                stats.invalidated += 1
+            if inputs.volatile:
+                self._entries.pop(key, None)
+            else:
+                self._entries[key] = _Entry(value, inputs)
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+        return value
+
+    def stats(self) -> dict:
+        """Per-query and overall hit counts."""
+        with self._lock:
+            total = QueryStats()
+            for s in self._stats.values():
+                total.hits += s.hits
+                total.misses += s.misses
+                total.invalidated += s.invalidated
+            return {"entries": len(self._entries), "total": total.to_dict(),
+                    "queries": {name: s.to_dict() for name, s in sorted(self._stats.items())}}
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._stats.clear()
+
+    def forget(self, root: Path) -> int:
+        """Drop memoized results that read anything under `root`; returns how many."""
+
+        def under(path: Path) -> bool:
+            return path == root or root in path.parents
+
+        with self._lock:
+            stale = [key for key, entry in self._entries.items()
+                     if any(under(p) for p in entry.inputs.files)
+                     or any(under(Path(k[0]).expanduser().resolve()) for k in entry.inputs.listings)]
+            for key in stale:
+                del self._entries[key]
+            return len(stale)
+
+
+engine = QueryEngine()
+
+
+def memoized(fn: Callable[..., T]) -> Callable[..., T]:
+    """Memoize a tool function in the process-wide engine, keyed by its arguments.
+
+    The wrapper keeps `fn`'s signature (via __wrapped__), so it can sit under
+    `@mcp.tool()`.
+    """
+    signature = inspect.signature(fn)
+
+    @functools.wraps(fn)
+    def wrapper(*args: Any, **kwargs: Any) -> T:
+        bound = signature.bind(*args, **kwargs)
+        bound.apply_defaults()
+        args_key = json.dumps(bound.arguments, sort_keys=True, default=str)
+        return engine.run(fn.__name__, args_key, lambda: fn(*args, **kwargs))
+
+    return wrapper
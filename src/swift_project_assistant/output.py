@@ -0,0 +1,199 @@
+"""Output encodings for tool results, selectable per call.
+
+Tool results are read by a model, so every indent, quote and repeated key
+("kind", "name", "line") is paid for in tokens. Tools that return outlines or
+declaration lists take a `format` argument:
+
+    json     (default) indented JSON, as before
+    min      the same JSON, minified
+    compact  terse, Swift-like indented text carrying the same information
+
+In compact text a declaration's line is a trailing `// L<n>` comment, nesting
+is two-space indentation, and per-file listings are headed by the file path.
+Every declaration is on one line: a signature written across several lines
+(say, a closure parameter's type) is joined with single spaces.
+
+packaging/bench_output.py measures each format's size per tool.
+"""
+
+from __future__ import annotations
+
+import json
+import re
+from typing import Any, Callable
+
+OUTPUT_FORMATS = ("json", "min", "compact")
+
+_INDENT = "  "
+_LINE_BREAK = re.compile(r"\s*\n\s*")
+
+
+def dump(data: Any, fmt: str = "json", compact: Callable[[Any], str] | None = None) -> str:
+    """Encode a tool result in the requested format."""
+    if fmt == "json":
+        return json.dumps(data, indent=1)
+    if fmt == "min":
+        return json.dumps(data, separators=(",", ":"), ensure_ascii=False)
+    if fmt == "compact" and compact is not None:
+        if isinstance(data, dict) and set(data) == {"error"}:
+            return f"error: {data['error']}"
+        return compact(data)
+    raise ValueError(f"format must be one of {list(OUTPUT_FORMATS)}, got {fmt!r}")
+
+
+def approx_tokens(text: str) -> int:
+    """A rough token count for sizing results: about four characters per token."""
+    return (len(text) + 3) // 4
+
+
+def _count(n: int) -> str:
+    return f"{n} match" if n == 1 else f"{n} matches"
+
+
+def _one_line(text: str) -> str:
+    """A signature on one line: each line break, with the indentation around it, becomes a space."""
+    return _LINE_BREAK.sub(" ", text)
+
+
+def _line(text: str, line: int | None) -> str:
+    text = _one_line(text)
+    return f"{text}  // L{line}" if line is not None else text
+
+
+def _type_header(t: dict) -> str:
+    head = f"{t['kind']} {t['name']}"
+    if t.get("inherits"):
+        head += ": " + ", ".join(t["inherits"])
+    return _one_line(head)
+
+
+def _outline_lines(outline: dict, depth: int = 0) -> list[str]:
+    pad = _INDENT * depth
+    out: list[str] = []
+    if outline.get("imports"):
+        out.append(f"{pad}import {', '.join(outline['imports'])}")
+
+    def emit(t: dict, level: int) -> None:
+        out.append(pad + _INDENT * level + _line(_type_header(t), t.get("line")))
+        out.extend(pad + _INDENT * (level + 1) + _one_line(m) for m in t.get("members", []))
+        for nested in t.get("nested_types", []):
+            emit(nested, level + 1)
+
+    for t in outline.get("types", []):
+        emit(t, 0)
+    out.extend(pad + _one_line(f) for f in outline.get("functions", []))
+    out.extend(pad + _one_line(g) for g in outline.get("globals", []))
+    return out
+
+
+def compact_outline(outline: dict) -> str:
+    """An outline_to_dict / public_interface_to_dict result as Swift-like text."""
+    lines = _outline_lines(outline)
+    if "min_access" in outline:
+        lines.insert(0, f"// min_access: {outline['min_access']}")
+    return "\n".join(lines)
+
+
+def compact_project_map(project: dict[str, dict]) -> str:
+    """get_project_map's {file: {types, functions}} as an indented listing."""
+    out: list[str] = []
+    for path, entry in project.items():
+        out.append(path)
+        if "error" in entry:
+            out.append(f"{_INDENT}error: {entry['error']}")
+            continue
+        out.extend(_INDENT + _type_header(t) for t in entry.get("types", []))
+        out.extend(f"{_INDENT}func {name}" for name in entry.get("functions", []))
+    return "\n".join(out)
+
+
+def _directory_lines(node: dict, depth: int = 0) -> list[str]:
+    pad = _INDENT * depth
+    files = f"{node['files']} file" if node["files"] == 1 else f"{node['files']} files"
+    head = [f"{node['path']}/", files]
+    if node.get("errors"):
+        head.append(f"{node['errors']} not analyzed")
+    if node["types"]:
+        head.append(", ".join(f"{kind} {n}" for kind, n in node["types"].items()))
+    if node.get("functions"):
+        head.append(f"func {node['functions']}")
+    if node.get("subdirs"):
+        head.append(f"+{node['subdirs']} subdirs")
+    out = [pad + "  ".join(head)]
+    detail = pad + _INDENT
+    if node.get("protocols"):
+        out.append(detail + "protocols: " + ", ".join(f"{p} ({n})" for p, n in node["protocols"].items()))
+    if node.get("conforms_to"):
+        out.append(detail + "conforms to: " + ", ".join(f"{p} {n}" for p, n in node["conforms_to"].items()))
+    if node.get("public"):
+        more = f" (+{node['public_more']} more)" if node.get("public_more") else ""
+        out.append(detail + "public: " + ", ".join(node["public"]) + more)
+    for child in node.get("dirs", []):
+        out.extend(_directory_lines(child, depth + 1))
+    return out
+
+
+def compact_directory_map(node: dict) -> str:
+    """get_project_map's directory rollup as an indented tree, one directory per header line."""
+    return "\n".join(_directory_lines(node))
+
+
+def _gap_lines(result: dict) -> list[str]:
+    """A scan's timed-out files and deadline note, as trailing comments."""
+    out = []
+    if result.get("timed_out"):
+        out.append(f"// timed out: {', '.join(result['timed_out'])}")
+    if result.get("incomplete"):
+        out.append(f"// {result['incomplete']}")
+    return out
+
+
+def compact_type_matches(result: dict) -> str:
+    """find_types' matches as `file:line header` lines."""
+    query = ", ".join(f"{k}={result[k]}" for k in ("inherits", "kind") if result.get(k) is not None)
+    out = [f"// {query or 'all types'}: {_count(len(result['matches']))}"]
+    out.extend(f"{m['file']}:{m['line']} {_type_header(m)}" for m in result["matches"])
+    return "\n".join(out + _gap_lines(result))
+
+
+def _delta_lines(delta: dict) -> list[str]:
+    """A delta answer's header line: its token and what it is relative to."""
+    basis = "full" if delta.get("full") else f"since {delta['since']}"
+    return [f"// generation {delta['generation']} ({basis})"]
+
+
+def compact_map_delta(delta: dict) -> str:
+    """A get_project_map delta: the changed files' listing, then `- file` per removed file."""
+    out = _delta_lines(delta)
+    if delta["changed"]:
+        out.append(compact_project_map(delta["changed"]))
+    out.extend(f"- {rel}" for rel in delta.get("removed", []))
+    return "\n".join(out)
+
+
+def compact_type_delta(delta: dict) -> str:
+    """A find_types delta: the matches in changed files, then which files they replace and which left."""
+    out = _delta_lines(delta) + compact_type_matches(delta).splitlines()
+    if delta.get("changed_files"):
+        out.append(f"// changed: {', '.join(delta['changed_files'])}")
+    out.extend(f"- {rel}" for rel in delta.get("removed", []))
+    if delta.get("errors"):
+        out.append(f"// not analyzed: {', '.join(delta['errors'])}")
+    return "\n".join(out)
+
+
+def compact_declaration_matches(result: dict) -> str:
+    """search_declarations' matches, one per line, grouped under their file."""
+    out = [f"// /{result['pattern']}/: {_count(result['match_count'])}"]
+    current = None
+    for m in result["matches"]:
+        if m["file"] != current:
+            current = m["file"]
+            out.append(current)
+        if "line" in m:
+            out.append(_INDENT + _line(m["declaration"], m["line"]))
+        elif "name" in m:
+            out.append(f"{_INDENT}{_one_line(m['declaration'])}  // in {m['name'].rpartition('.')[0]}")
+        else:
+            out.append(_INDENT + _one_line(m["declaration"]))
+    return "\n".join(out)
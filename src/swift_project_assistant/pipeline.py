@@ -0,0 +1,128 @@
+"""Streaming, parallel per-file work for project-wide scans.
+
+A project scan used to analyze every file into one dict before looking at
+any of it, so its memory grew with the project (each FileAnalysis holds the
+file's full source). `stream` instead runs the work on a small thread pool
+and hands results to the consumer one at a time, in input order, keeping at
+most `window` files in flight. A result is dropped as soon as the consumer
+moves on, so memory stays proportional to the worker count.
+
+When the consumer stops early (a limit reached, a first match found),
+closing the generator cancels every queued task; tasks already running
+finish in the background and their results are discarded.
+
+The pool size comes from SWIFT_ASSISTANT_WORKERS (default: the CPU count, at
+most 8). SourceKitten runs are separate processes, so threads parallelize
+them fine.
+
+A scan can also be given a deadline (SWIFT_ASSISTANT_TOOL_DEADLINE seconds
+for the project-wide tools, default 120): once it passes, every item not yet
+finished is reported with DeadlineExceeded instead of being waited for, so a
+tool returns partial results on time. Work already running carries on in the
+background and still fills the caches.
+
+Inside a tool call the client can cancel (see progress.py), the stream
+raises Cancelled as soon as it is, instead of waiting for the next result.
+"""
+
+from __future__ import annotations
+
+import contextvars
+import os
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeout
+from concurrent.futures import wait as wait_futures
+from typing import Callable, Iterable, Iterator, TypeVar
+
+from swift_project_assistant import progress
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+_MAX_DEFAULT_WORKERS = 8
+DEFAULT_TOOL_DEADLINE = 120.0
+
+
+class DeadlineExceeded(Exception):
+    pass
+
+
+def configured_workers() -> int:
+    """SWIFT_ASSISTANT_WORKERS, or min(CPU count, 8)."""
+    raw = os.getenv("SWIFT_ASSISTANT_WORKERS", "").strip()
+    if raw:
+        try:
+            workers = int(raw)
+        except ValueError:
+            raise ValueError(f"SWIFT_ASSISTANT_WORKERS must be a whole number, got {raw!r}") from None
+        return max(1, workers)
+    return min(os.cpu_count() or 1, _MAX_DEFAULT_WORKERS)
+
+
+def configured_deadline() -> float | None:
+    """SWIFT_ASSISTANT_TOOL_DEADLINE in seconds; None (no limit) for "off" or 0."""
+    raw = os.getenv("SWIFT_ASSISTANT_TOOL_DEADLINE", "").strip()
+    if raw.lower() in ("off", "none"):
+        return None
+    try:
+        seconds = float(raw) if raw else DEFAULT_TOOL_DEADLINE
+    except ValueError:
+        raise ValueError(f"SWIFT_ASSISTANT_TOOL_DEADLINE must be a number of seconds, got {raw!r}") from None
+    return seconds if seconds > 0 else None
+
+
+def stream(
+    fn: Callable[[T], R],
+    items: Iterable[T],
+    workers: int | None = None,
+    window: int | None = None,
+    errors: tuple[type[Exception], ...] = (Exception,),
+    timeout: float | None = None,
+) -> Iterator[tuple[T, R | None, Exception | None]]:
+    """(item, fn(item), None) for each item in order, or (item, None, error) if fn raised one of `errors`.
+
+    Each call runs in a copy of the caller's context, so context variables
+    (e.g. the memo module's input recording) see the calling query. After
+    `timeout` seconds, the remaining items come back with DeadlineExceeded.
+    """
+    workers = workers or configured_workers()
+    window = max(window or 2 * workers, 1)
+    deadline = time.monotonic() + timeout if timeout is not None else None
+    expired: DeadlineExceeded | None = None
+    pending: deque[tuple[T, Future[R]]] = deque()
+    pool = ThreadPoolExecutor(workers, thread_name_prefix="scan")
+
+    def result(item: T, future: Future[R]) -> tuple[T, R | None, Exception | None]:
+        nonlocal expired
+        if expired is None and deadline is not None:
+            try:
+                future.exception(max(deadline - time.monotonic(), 0))
+            except FutureTimeout:
+                expired = DeadlineExceeded(f"not analyzed: the {timeout:g}s deadline passed")
+        if expired is not None and not future.done():
+            future.cancel()
+            return item, None, expired
+        progress.wait(lambda t: not wait_futures([future], t).not_done)
+        try:
+            return item, future.result(), None
+        except errors as exc:
+            return item, None, exc
+
+    items = iter(items)
+    try:
+        for item in items:
+            pending.append((item, pool.submit(contextvars.copy_context().run, fn, item)))
+            if len(pending) >= window:
+                yield result(*pending.popleft())
+                if expired is not None:
+                    break
+        while pending:
+            yield result(*pending.popleft())
+        for item in items:  # only left over once the deadline has passed
+            yield item, None, expired
+    finally:
+        for _, future in pending:
+            future.cancel()
+        pool.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,168 @@
+"""Speculative analysis of the files an agent is likely to ask about next.
+
+Agent sessions are predictable: after an outline or summary of one file, the
+next calls are nearly always about the types it references or the files that
+reference it. After get_file_outline and get_file_summary, the served file is
+handed to the Prefetcher, whose daemon thread looks up its neighbors in the
+project's declaration index (the files declaring the types it references,
+then the files referencing the types it declares) and analyzes them in the
+scheduler's prefetch class, behind any tool call (see scheduler.py). Neighbors
+whose standalone summary (SUMMARY_STORAGE=standalone) is stale are
+regenerated too; same-file summaries are left for an explicit call, since
+regenerating one rewrites a source file the agent hasn't asked about.
+
+The budget, SWIFT_ASSISTANT_PREFETCH, is the number of neighbors warmed per
+served file (default 8, "off" to disable). Only the latest few served files
+wait their turn; older ones are dropped. Nothing is prefetched for a file
+whose project index isn't loaded.
+
+get_server_stats reports how many files got speculative work (a SourceKitten
+run or a summary) and how many of those a tool later asked for (the hit
+rate), so the speculative work can be weighed against what it saves.
+"""
+
+from __future__ import annotations
+
+import os
+import threading
+from collections import OrderedDict, deque
+from pathlib import Path
+from typing import Callable, Iterable
+
+from swift_project_assistant import cache
+from swift_project_assistant.scheduler import Priority, priority
+from swift_project_assistant.summary import (
+    SummaryStorage,
+    cached_summary,
+    configured_storage,
+    sidecar_path,
+    update_summary,
+)
+
+DEFAULT_PREFETCH_BUDGET = 8
+_MAX_TRIGGERS = 4  # served files waiting for their neighbors to be warmed
+_MAX_TRACKED = 1024  # warmed files remembered for hit accounting
+
+
+def configured_budget() -> int | None:
+    """SWIFT_ASSISTANT_PREFETCH; None disables prefetching."""
+    raw = os.getenv("SWIFT_ASSISTANT_PREFETCH", "").strip()
+    if raw.lower() in ("off", "none", "0"):
+        return None
+    try:
+        budget = int(raw) if raw else DEFAULT_PREFETCH_BUDGET
+    except ValueError:
+        raise ValueError(f"SWIFT_ASSISTANT_PREFETCH must be a whole number, got {raw!r}") from None
+    return budget if budget > 0 else None
+
+
+class Prefetcher:
+    """Warms the neighbors of served files on one daemon thread."""
+
+    def __init__(self, neighbors: Callable[[Path], Iterable[Path]]) -> None:
+        """`neighbors(path)` yields the files most likely to be asked about after `path`, best first."""
+        self._neighbors = neighbors
+        self._triggers: deque[Path] = deque()
+        self._warmed: OrderedDict[Path, None] = OrderedDict()
+        self._cond = threading.Condition()
+        self._busy = False
+        self._thread: threading.Thread | None = None
+        self.triggers = self.dropped = self.warmed = self.analyzed = self.summaries = self.cached = 0
+        self.hits = self.errors = 0
+
+    def after_serving(self, path: Path) -> None:
+        """Queue `path`'s neighbors for warming."""
+        if configured_budget() is None:
+            return
+        with self._cond:
+            if path in self._triggers:
+                return
+            self._triggers.append(path)
+            self.triggers += 1
+            if len(self._triggers) > _MAX_TRIGGERS:
+                self._triggers.popleft()
+                self.dropped += 1
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="prefetch", daemon=True)
+                self._thread.start()
+            self._cond.notify()
+
+    def note_request(self, path: Path) -> None:
+        """Count a tool's request for `path` as a hit if it was warmed speculatively."""
+        with self._cond:
+            if path in self._warmed:
+                del self._warmed[path]
+                self.hits += 1
+
+    def wait_idle(self, timeout: float | None = None) -> bool:
+        """Block until every queued file has been handled; False on timeout."""
+        with self._cond:
+            return self._cond.wait_for(lambda: not self._triggers and not self._busy, timeout)
+
+    def stats(self) -> dict:
+        with self._cond:
+            return {"budget": configured_budget() or 0, "triggers": self.triggers, "dropped": self.dropped,
+                    "warmed": self.warmed, "analyzed": self.analyzed, "summaries": self.summaries,
+                    "already_cached": self.cached, "errors": self.errors, "hits": self.hits,
+                    "hit_rate": round(self.hits / self.warmed, 3) if self.warmed else 0.0}
+
+    def _run(self) -> None:
+        with priority(Priority.PREFETCH):
+            while True:
+                with self._cond:
+                    self._cond.wait_for(lambda: self._triggers)
+                    served = self._triggers.popleft()
+                    self._busy = True
+                try:
+                    budget = configured_budget() or 0
+                    seen = {served}
+                    for path in self._neighbors(served):
+                        if len(seen) > budget:
+                            break
+                        if path not in seen:
+                            seen.add(path)
+                            self._warm(path)
+                except Exception:  # noqa: BLE001 - speculation must never take the thread down
+                    with self._cond:
+                        self.errors += 1
+                finally:
+                    with self._cond:
+                        self._busy = False
+                        self._cond.notify_all()
+
+    def _warm(self, path: Path) -> None:
+        ran = []
+
+        def run(p: str) -> dict:
+            ran.append(p)
+            return cache.run_sourcekitten(p)
+
+        try:
+            cache.cached_structure(path, path.read_bytes(), run=run)
+            summarized = refresh_stale_summary(path)
+        except (OSError, RuntimeError):
+            with self._cond:
+                self.errors += 1
+            return
+        with self._cond:
+            if not ran and not summarized:
+                self.cached += 1
+                return
+            self.warmed += 1
+            self.analyzed += bool(ran)
+            self.summaries += summarized
+            self._warmed[path] = None
+            self._warmed.move_to_end(path)
+            if len(self._warmed) > _MAX_TRACKED:
+                self._warmed.popitem(last=False)
+
+
+def refresh_stale_summary(path: Path) -> bool:
+    """Regenerate `path`'s standalone summary if it exists but is out of date."""
+    storage = configured_storage()
+    if storage is not SummaryStorage.STANDALONE or not sidecar_path(path).exists():
+        return False
+    if cached_summary(path, storage) is not None:
+        return False
+    update_summary(path, storage)
+    return True
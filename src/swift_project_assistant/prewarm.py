@@ -0,0 +1,117 @@
+"""Background pre-warming of configured projects at server start.
+
+The first project-wide call of a session otherwise pays for analyzing every
+file while the agent waits. Roots listed in SWIFT_PROJECT_PATHS (separated
+by os.pathsep, ":" on macOS/Linux) or passed as `--project` are indexed by a
+daemon thread right after startup:
+
+    SWIFT_PROJECT_PATHS=~/src/App:~/src/AppKit swift-project-mcp
+    swift-project-mcp --project ~/src/App
+
+Warming only fills the shared caches — the analysis cache and the project's
+declaration index — so tool calls never wait for it: a file already warmed
+is a cache hit, one not yet reached is analyzed on demand (and a file being
+analyzed by both at once runs SourceKitten once, see cache.cached_structure).
+Its runs are queued in the scheduler's background class, behind any tool
+call, and each SourceKitten child is started niced (see
+analyzer.run_sourcekitten). On Linux the warm-up thread also renices itself. Progress is reported by the
+get_server_stats tool.
+"""
+
+from __future__ import annotations
+
+import os
+import sys
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable
+
+from swift_project_assistant.files import swift_files
+from swift_project_assistant.scheduler import Priority, priority
+
+_NICENESS = 10
+
+
+def configured_project_paths() -> list[str]:
+    """Parse SWIFT_PROJECT_PATHS into a list of project roots."""
+    raw = os.getenv("SWIFT_PROJECT_PATHS", "")
+    return [p.strip() for p in raw.split(os.pathsep) if p.strip()]
+
+
+@dataclass
+class WarmProgress:
+    root: str
+    state: str = "pending"  # pending | analyzing | done | failed
+    files: int = 0
+    analyzed: int = 0
+    started: float | None = None
+    finished: float | None = None
+    error: str | None = None
+
+    def to_dict(self) -> dict:
+        d: dict = {"root": self.root, "state": self.state, "files": self.files, "analyzed": self.analyzed}
+        if self.started is not None:
+            d["seconds"] = round((self.finished or time.monotonic()) - self.started, 2)
+        if self.error:
+            d["error"] = self.error
+        return d
+
+
+def _lower_priority() -> None:
+    """Renice the calling thread; best effort, Linux only.
+
+    Linux schedules threads individually and accepts a thread id as the
+    target. Elsewhere (macOS) a native thread id is not a pid, so nothing is done.
+    """
+    if not sys.platform.startswith("linux"):
+        return
+    try:
+        os.setpriority(os.PRIO_PROCESS, threading.get_native_id(), _NICENESS)
+    except (AttributeError, OSError):
+        pass
+
+
+class Prewarmer:
+    """Warms each root in turn on one low-priority daemon thread."""
+
+    def __init__(self, roots: list[str], warm: Callable[[str, list[Path], Callable[[int, int], None]], None]):
+        """`warm(root, files, progress)` analyzes `files` and reports progress(done, total)."""
+        self.progress = [WarmProgress(str(Path(r).expanduser().resolve())) for r in roots]
+        self._warm = warm
+        self._thread: threading.Thread | None = None
+
+    def start(self) -> "Prewarmer":
+        if self.progress and self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="prewarm", daemon=True)
+            self._thread.start()
+        return self
+
+    def join(self, timeout: float | None = None) -> None:
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def _run(self) -> None:
+        _lower_priority()
+        with priority(Priority.BACKGROUND):
+            self._warm_all()
+
+    def _warm_all(self) -> None:
+        for p in self.progress:
+            p.started = time.monotonic()
+            try:
+                files = swift_files(p.root)
+                p.files, p.state = len(files), "analyzing"
+
+                def report(done: int, total: int, p: WarmProgress = p) -> None:
+                    p.analyzed = done
+
+                self._warm(p.root, files, report)
+                p.state = "done"
+            except Exception as exc:  # noqa: BLE001 - one bad root must not stop the others
+                p.state, p.error = "failed", str(exc)
+            p.finished = time.monotonic()
+
+    def stats(self) -> list[dict]:
+        return [p.to_dict() for p in self.progress]
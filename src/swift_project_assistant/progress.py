@@ -0,0 +1,159 @@
+"""Progress reporting and client cancellation for long-running tool calls.
+
+A project-wide tool on a large project can run for minutes. MCP lets the
+client follow it (progress notifications, when the request carries a
+progress token) and give up on it (a cancellation notification). The
+server runs such tools on a worker thread with a CallControl installed in
+a context variable (see mcp_server._tool), and the code underneath
+reports through the module functions here, which do nothing outside a
+controlled call:
+
+    report_progress(done, total, phase)   files done out of total, and what
+                                          they are being done for
+    check_cancelled()                     raises Cancelled once the client
+                                          has given up
+    on_cancel(callback)                   runs `callback` the moment it does,
+                                          e.g. to kill a subprocess
+
+The scan pipeline stops handing out results and cancels its queued files, a
+running SourceKitten or `claude -p` process is killed with its process
+group, and a request still queued for a scheduler slot leaves the queue, so
+the slots go to other calls at once.
+
+Cancelled derives from BaseException, like asyncio.CancelledError, so the
+`except Exception` handlers that keep one bad file from failing a scan let
+it through.
+"""
+
+from __future__ import annotations
+
+import contextvars
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Iterator, TypeVar
+
+T = TypeVar("T")
+
+_REPORT_INTERVAL = 0.1  # seconds between progress notifications
+_POLL_INTERVAL = 0.05  # seconds between cancellation checks while blocked
+
+
+class Cancelled(BaseException):
+    """The client cancelled the tool call."""
+
+
+class CallControl:
+    """Progress and cancellation state of one tool call.
+
+    `report(done, total, phase)` receives progress, at most every
+    _REPORT_INTERVAL seconds except for the last step of a phase. It is
+    called on the tool's thread and must not block for long.
+    """
+
+    def __init__(self, report: Callable[[int, int | None, str | None], None] | None = None) -> None:
+        self._report = report
+        self._lock = threading.Lock()
+        self._cancelled = threading.Event()
+        self._callbacks: dict[int, Callable[[], None]] = {}
+        self._next_id = 0
+        self._reported_at = float("-inf")
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancelled.is_set()
+
+    def cancel(self) -> None:
+        """Mark the call cancelled and run every registered callback once."""
+        with self._lock:
+            if self._cancelled.is_set():
+                return
+            self._cancelled.set()
+            callbacks = list(self._callbacks.values())
+            self._callbacks.clear()
+        for callback in callbacks:
+            try:
+                callback()
+            except Exception:  # noqa: BLE001 - one failed cleanup mustn't skip the others
+                pass
+
+    def check(self) -> None:
+        if self._cancelled.is_set():
+            raise Cancelled("the client cancelled the request")
+
+    def progress(self, done: int, total: int | None = None, phase: str | None = None) -> None:
+        self.check()
+        if self._report is None:
+            return
+        now = time.monotonic()
+        if done != total and now - self._reported_at < _REPORT_INTERVAL:
+            return
+        self._reported_at = now
+        self._report(done, total, phase)
+
+    def run(self, fn: Callable[..., T], *args, **kwargs) -> T:
+        """Call fn with this call's control installed for report_progress and friends."""
+        token = _current.set(self)
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            _current.reset(token)
+
+    def _register(self, callback: Callable[[], None]) -> int | None:
+        with self._lock:
+            if not self._cancelled.is_set():
+                self._next_id += 1
+                self._callbacks[self._next_id] = callback
+                return self._next_id
+        callback()  # already cancelled
+        return None
+
+    def _unregister(self, handle: int | None) -> None:
+        if handle is not None:
+            with self._lock:
+                self._callbacks.pop(handle, None)
+
+
+_current: contextvars.ContextVar[CallControl | None] = contextvars.ContextVar("tool_call", default=None)
+
+
+def current_call() -> CallControl | None:
+    return _current.get()
+
+
+def report_progress(done: int, total: int | None = None, phase: str | None = None) -> None:
+    """Report progress to the current call's client, raising Cancelled if it gave up."""
+    call = _current.get()
+    if call is not None:
+        call.progress(done, total, phase)
+
+
+def check_cancelled() -> None:
+    call = _current.get()
+    if call is not None:
+        call.check()
+
+
+@contextmanager
+def on_cancel(callback: Callable[[], None]) -> Iterator[None]:
+    """Run `callback` if the current call is cancelled during the block (at once if it already was)."""
+    call = _current.get()
+    if call is None:
+        yield
+        return
+    handle = call._register(callback)
+    try:
+        yield
+    finally:
+        call._unregister(handle)
+
+
+def wait(ready: Callable[[float | None], bool]) -> None:
+    """Block until `ready(timeout)` (e.g. an Event's wait) returns True; raise Cancelled if the call is cancelled first."""
+    call = _current.get()
+    if call is None:
+        ready(None)
+        return
+    call.check()
+    while not ready(_POLL_INTERVAL):
+        call.check()
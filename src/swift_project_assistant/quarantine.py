@@ -0,0 +1,109 @@
+"""Files whose analysis keeps timing out, skipped on later scans.
+
+A file that makes SourceKitten hang (a huge generated Localizable.swift, a
+SourceKit crash loop) would otherwise cost the full per-file timeout on
+every project-wide call. Each timeout is counted against the file's content
+(its blob id); after SWIFT_ASSISTANT_QUARANTINE_AFTER timeouts (default 2,
+"off" to disable) the content is quarantined and cache.cached_structure
+refuses it immediately with QuarantinedError. Tools report such files
+alongside their partial results.
+
+Because entries are keyed by content, editing the file releases it; an
+explicit refresh (e.g. get_file_summary with refresh=true) retries it once.
+The list is kept in the cache directory as quarantine.json, so it survives
+restarts; delete that file to clear it.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import tempfile
+import threading
+from pathlib import Path
+
+from swift_project_assistant.cache import configured_cache_dir
+
+DEFAULT_QUARANTINE_AFTER = 2
+
+
+class QuarantinedError(RuntimeError):
+    pass
+
+
+def configured_threshold() -> int | None:
+    """SWIFT_ASSISTANT_QUARANTINE_AFTER; None disables quarantining."""
+    raw = os.getenv("SWIFT_ASSISTANT_QUARANTINE_AFTER", "").strip()
+    if raw.lower() in ("off", "none", "0"):
+        return None
+    try:
+        return int(raw) if raw else DEFAULT_QUARANTINE_AFTER
+    except ValueError:
+        raise ValueError(f"SWIFT_ASSISTANT_QUARANTINE_AFTER must be a whole number, got {raw!r}") from None
+
+
+class Quarantine:
+    """Timeout counts by blob id, persisted to `path` (in memory only if None)."""
+
+    def __init__(self, path: Path | None) -> None:
+        self.path = path
+        self._lock = threading.Lock()
+        self._entries: dict[str, dict] = {}
+        if path is not None:
+            try:
+                self._entries = json.loads(path.read_text())
+            except (OSError, ValueError):
+                pass
+
+    def is_quarantined(self, key: str) -> bool:
+        threshold = configured_threshold()
+        with self._lock:
+            entry = self._entries.get(key)
+        return threshold is not None and entry is not None and entry["timeouts"] >= threshold
+
+    def record_timeout(self, key: str, path: Path) -> None:
+        with self._lock:
+            entry = self._entries.setdefault(key, {"path": str(path), "timeouts": 0})
+            entry["path"] = str(path)
+            entry["timeouts"] += 1
+            self._save()
+
+    def release(self, key: str) -> None:
+        with self._lock:
+            if self._entries.pop(key, None) is not None:
+                self._save()
+
+    def files(self) -> list[str]:
+        """Paths of the quarantined contents (as last seen)."""
+        threshold = configured_threshold()
+        if threshold is None:
+            return []
+        with self._lock:
+            return sorted(e["path"] for e in self._entries.values() if e["timeouts"] >= threshold)
+
+    def _save(self) -> None:
+        if self.path is None:
+            return
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            fd, tmp = tempfile.mkstemp(dir=self.path.parent, suffix=".tmp")
+            with os.fdopen(fd, "w") as f:
+                json.dump(self._entries, f, indent=1)
+            os.replace(tmp, self.path)
+        except OSError:
+            pass
+
+
+_default: Quarantine | None = None
+_default_lock = threading.Lock()
+
+
+def default_quarantine() -> Quarantine:
+    """The process-wide quarantine for the currently configured cache directory."""
+    global _default
+    directory = configured_cache_dir()
+    path = directory / "quarantine.json" if directory else None
+    with _default_lock:
+        if _default is None or _default.path != path:
+            _default = Quarantine(path)
+        return _default
@@ -0,0 +1,141 @@
+"""Reading parts of a source file without reading the whole file.
+
+Once a file has been analyzed, the byte range of each declaration is known
+(from the project index or from a recent analysis), so fetching one method
+is a seek and a read of that range. A range is only read if the file's
+(mtime_ns, size) still matches the stat the range was recorded at, checked
+with fstat on the open file; a mismatch means "re-analyze", never stale
+text.
+
+Line-addressed reads (get_source_range) use a per-file table of line start
+offsets, built by scanning a memory map for newlines only as far as the
+requested lines and extended on later calls, so reading lines 10-20 of a
+10,000-line file touches the first pages of it, not all of it.
+"""
+
+from __future__ import annotations
+
+import mmap
+import os
+import threading
+from array import array
+from collections import OrderedDict
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from swift_project_assistant.index import Declaration
+
+Stat = tuple[int, int]  # (mtime_ns, size)
+
+_MAX_FILES = 256
+
+
+def read_range(path: Path, offset: int, length: int, stat: Stat) -> bytes | None:
+    """`length` bytes of `path` at `offset`, or None if the file no longer matches `stat`."""
+    try:
+        with open(path, "rb") as f:
+            st = os.fstat(f.fileno())
+            if (st.st_mtime_ns, st.st_size) != stat or offset + length > st.st_size:
+                return None
+            f.seek(offset)
+            return f.read(length)
+    except OSError:
+        return None
+
+
+class RecentDeclarations:
+    """Declarations of recently analyzed files, valid while their stat is unchanged."""
+
+    def __init__(self, max_files: int = _MAX_FILES) -> None:
+        self.max_files = max_files
+        self._files: OrderedDict[Path, tuple[Stat, list["Declaration"]]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, path: Path, stat: Stat) -> list["Declaration"] | None:
+        with self._lock:
+            found = self._files.get(path)
+            if found is None or found[0] != stat:
+                return None
+            self._files.move_to_end(path)
+            return found[1]
+
+    def put(self, path: Path, stat: Stat, declarations: list["Declaration"]) -> None:
+        with self._lock:
+            self._files[path] = (stat, declarations)
+            self._files.move_to_end(path)
+            while len(self._files) > self.max_files:
+                self._files.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._files.clear()
+
+
+class _LineTable:
+    """Start offsets of a file's lines, scanned as far as needed so far.
+
+    `lock` guards the scan, so reads of other files never wait on it.
+    """
+
+    def __init__(self, stat: Stat) -> None:
+        self.stat = stat
+        self.starts = array("Q", [0])
+        self.complete = stat[1] == 0
+        self.lock = threading.Lock()
+
+    def extend(self, data: mmap.mmap, lines: int) -> None:
+        """Scan until the start of line `lines + 1` (1-based) is known, or EOF."""
+        pos = self.starts[-1]
+        while not self.complete and len(self.starts) <= lines:
+            nl = data.find(b"\n", pos)
+            if nl < 0:
+                self.complete = True
+                break
+            pos = nl + 1
+            if pos < len(data):
+                self.starts.append(pos)
+            else:
+                self.complete = True
+
+
+_tables: OrderedDict[Path, _LineTable] = OrderedDict()
+_tables_lock = threading.Lock()
+
+
+def read_lines(path: Path, start_line: int, end_line: int) -> tuple[str, int, int | None]:
+    """Lines `start_line`..`end_line` (1-based, inclusive) of `path`.
+
+    Returns the text, the last line actually read (smaller than `end_line`
+    past the end of the file) and the file's line count once it is known,
+    else None. Raises OSError if the file cannot be read.
+    """
+    with open(path, "rb") as f:
+        st = os.fstat(f.fileno())
+        stat = (st.st_mtime_ns, st.st_size)
+        with _tables_lock:
+            table = _tables.get(path)
+            if table is None or table.stat != stat:
+                table = _tables[path] = _LineTable(stat)
+            _tables.move_to_end(path)
+            while len(_tables) > _MAX_FILES:
+                _tables.popitem(last=False)
+        if stat[1] == 0:
+            return "", 0, 0
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            with table.lock:
+                table.extend(data, end_line)
+                starts = table.starts
+                total = len(starts) if table.complete else None
+                if start_line > len(starts):
+                    return "", 0, total
+                last = min(end_line, len(starts))
+                begin = starts[start_line - 1]
+                end = starts[last] if last < len(starts) else len(data)
+            raw = data[begin:end]
+    return raw.decode("utf-8", errors="replace").removesuffix("\n"), last, total
+
+
+def clear_cache() -> None:
+    with _tables_lock:
+        _tables.clear()
@@ -0,0 +1,136 @@
+"""Declaration-level diffs of changed files against a git ref.
+
+changed_files_context outlines every changed file in full, even when one
+method changed in a 3,000-line file. With `diff=true` it instead compares
+each file's declarations with the version at `git_ref` and reports only
+those added, removed or modified, with their lines.
+
+The ref side never touches the working tree: one `git ls-tree` lists the
+blob id of every changed file at the ref and one `git cat-file --batch`
+reads their contents. The analysis cache is keyed by blob id (see
+cache.py), so a ref-side version is analyzed once, then served from the
+cache on every later diff against that ref (or any ref sharing the blob),
+and by whatever else has seen the same content. SourceKitten needs a file,
+so a missed blob is written to a temporary file for the run.
+
+Declarations are matched by enclosing type, kind and name, preferring one
+with the same signature, so overloads pair up correctly. A matched type
+counts as modified only if its header changed (its members are compared
+individually); a member also counts as modified if its source changed.
+Moving a declaration, or edits elsewhere in the file, don't count.
+"""
+
+from __future__ import annotations
+
+import subprocess
+import tempfile
+from collections import defaultdict
+from pathlib import Path
+
+from swift_project_assistant import cache
+from swift_project_assistant.analyzer import FileAnalysis, analyze_structure
+from swift_project_assistant.index import Declaration, file_declarations
+
+
+def ref_blobs(root: Path, ref: str, rels: list[str]) -> dict[str, str]:
+    """Blob id at `ref` of each of `rels` (relative to the repository top) that exists there."""
+    if not rels:
+        return {}
+    proc = subprocess.run(
+        ["git", "-C", str(root), "ls-tree", "-r", "-z", "--full-tree", ref, "--", *rels],
+        capture_output=True,
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(f"git ls-tree failed: {proc.stderr.decode(errors='replace').strip()}")
+    blobs: dict[str, str] = {}
+    for record in filter(None, proc.stdout.split(b"\0")):
+        meta, _, path = record.partition(b"\t")
+        _, kind, sha = meta.decode().split()
+        if kind == "blob":
+            blobs[path.decode()] = sha
+    return blobs
+
+
+def read_blobs(root: Path, shas: list[str]) -> dict[str, bytes]:
+    """The contents of `shas`, read with one `git cat-file --batch`."""
+    if not shas:
+        return {}
+    proc = subprocess.run(
+        ["git", "-C", str(root), "cat-file", "--batch"],
+        input="".join(f"{sha}\n" for sha in shas).encode(),
+        capture_output=True,
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(f"git cat-file failed: {proc.stderr.decode(errors='replace').strip()}")
+    out, pos, contents = proc.stdout, 0, {}
+    for sha in shas:
+        end = out.index(b"\n", pos)
+        header = out[pos:end].split()
+        pos = end + 1
+        if len(header) < 3 or header[1] != b"blob":
+            continue  # "<sha> missing"
+        size = int(header[2])
+        contents[sha] = out[pos : pos + size]
+        pos += size + 1
+    return contents
+
+
+def ref_analysis(root: Path, rel: str, sha: str, source: bytes) -> FileAnalysis:
+    """The analysis of `rel` as blob `sha` (content `source`), from the cache when it has been seen."""
+
+    def run(_: str) -> dict:
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / Path(rel).name
+            path.write_bytes(source)
+            return cache.run_sourcekitten(str(path))
+
+    return analyze_structure(source, cache.cached_structure(root / rel, source, key=sha, run=run))
+
+
+def _entry(d: Declaration) -> dict:
+    return {"name": d.qualified, "kind": d.kind, "line": d.line, "declaration": d.signature}
+
+
+def diff_declarations(old: FileAnalysis | None, new: FileAnalysis) -> dict:
+    """{added, removed, modified} declarations from `old` (None: a new file) to `new`; empty lists left out."""
+    before = file_declarations(old) if old is not None else []
+    after = file_declarations(new)
+    unmatched: dict[tuple, list[Declaration]] = defaultdict(list)
+    for d in before:
+        unmatched[(d.parent, d.kind, d.name, d.signature)].append(d)
+    pairs: list[tuple[Declaration, Declaration]] = []
+    added: list[Declaration] = []
+    for d in after:  # same signature first
+        same = unmatched.get((d.parent, d.kind, d.name, d.signature))
+        if same:
+            pairs.append((same.pop(0), d))
+        else:
+            added.append(d)
+    by_name: dict[tuple, list[Declaration]] = defaultdict(list)
+    for d in sorted((d for left in unmatched.values() for d in left), key=lambda d: d.offset):
+        by_name[(d.parent, d.kind, d.name)].append(d)
+    new_only: list[Declaration] = []
+    for d in added:  # then a changed signature
+        renamed = by_name.get((d.parent, d.kind, d.name))
+        if renamed:
+            pairs.append((renamed.pop(0), d))
+        else:
+            new_only.append(d)
+    removed = [d for found in by_name.values() for d in found]
+
+    modified: list[dict] = []
+    for was, now in pairs:
+        if was.signature != now.signature:
+            modified.append({**_entry(now), "ref_line": was.line, "was": was.signature})
+        elif not now.is_type and old is not None and (
+            old.slice(was.offset, was.length) != new.slice(now.offset, now.length)
+        ):
+            modified.append({**_entry(now), "ref_line": was.line, "change": "body"})
+    result: dict = {}
+    if new_only:
+        result["added"] = [_entry(d) for d in new_only]
+    if removed:
+        result["removed"] = [_entry(d) for d in sorted(removed, key=lambda d: d.line)]
+    if modified:
+        result["modified"] = sorted(modified, key=lambda m: m["line"])
+    return result
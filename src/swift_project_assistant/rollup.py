@@ -0,0 +1,231 @@
+"""Directory rollups of a project index, for get_project_map's hierarchical mode.
+
+A per-file project map of a 10k-file repository runs to hundreds of
+thousands of tokens. A rollup summarizes each directory instead: how many
+types of each kind it declares, the protocols declared there (with how many
+types in the whole project conform to each), the types its own types
+conform to most, and its top-level public types. Rollups nest to a chosen
+depth below any starting directory, so a caller reads the top levels first
+and then drills into one directory with `path`.
+
+Everything is computed from the project index's declarations, so a rollup of
+an indexed project costs no SourceKitten runs.
+"""
+
+from __future__ import annotations
+
+import threading
+from collections import Counter
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Iterable
+from weakref import WeakKeyDictionary
+
+from swift_project_assistant.index import Declaration, IndexView, ProjectIndex
+from swift_project_assistant.output import approx_tokens
+
+_NOTABLE = 5  # protocols and conformances listed per directory
+_PUBLIC_LISTED = 10  # top-level public types listed per directory
+
+
+@dataclass
+class _Directory:
+    files: int = 0
+    errors: int = 0
+    kinds: Counter = field(default_factory=Counter)
+    functions: int = 0
+    protocols: list[str] = field(default_factory=list)
+    conformances: Counter = field(default_factory=Counter)
+    public: list[str] = field(default_factory=list)
+    children: dict[str, "_Directory"] = field(default_factory=dict)
+    height: int = 0  # levels of subdirectories below this one
+
+    @classmethod
+    def of_file(cls, declarations: Iterable[Declaration]) -> "_Directory":
+        summary = cls(files=1)
+        for d in declarations:
+            if d.kind == "function" and not d.parent:
+                summary.functions += 1
+            if not d.is_type:
+                continue
+            summary.kinds[d.kind] += 1
+            summary.conformances.update(d.inherits)
+            if d.kind == "protocol":
+                summary.protocols.append(d.qualified)
+            if not d.parent and d.kind != "extension" and d.access in ("public", "open"):
+                summary.public.append(d.name)
+        return summary
+
+    def merge(self, other: "_Directory") -> None:
+        self.files += other.files
+        self.errors += other.errors
+        self.kinds.update(other.kinds)
+        self.functions += other.functions
+        self.protocols += other.protocols
+        self.conformances.update(other.conformances)
+        self.public += other.public
+
+
+# Per-file summaries by index, reused while the file's content is unchanged.
+_summaries: WeakKeyDictionary[ProjectIndex, dict[str, tuple[str | None, _Directory]]] = WeakKeyDictionary()
+_ERROR = _Directory(errors=1)
+_EMPTY = _Directory()
+# The whole project's rollup tree by index: (generation, file order, tree, conformer counts).
+_trees: WeakKeyDictionary[ProjectIndex, tuple[int, list[str], _Directory, Counter]] = WeakKeyDictionary()
+_lock = threading.Lock()
+
+
+def _summary(index: IndexView, rel: str) -> _Directory:
+    if rel in index.errors:
+        return _ERROR
+    cached = _summaries.setdefault(index.index, {})
+    key = index.entries.key(rel)
+    hit = cached.get(rel)
+    if hit is not None and hit[0] == key:
+        return hit[1]
+    summary = _Directory.of_file(index.entries[rel].declarations)
+    cached[rel] = (key, summary)
+    return summary
+
+
+def normalize_path(root: Path, path: str | None) -> str:
+    """`path` (absolute, or relative to `root`) as a rollup directory, "" for the root."""
+    if not path:
+        return ""
+    directory = Path(path).expanduser()
+    if directory.is_absolute():
+        try:
+            directory = directory.resolve().relative_to(root)
+        except ValueError:
+            raise ValueError(f"path must be inside the project {root}, got {path!r}") from None
+    rel = directory.as_posix().strip("/")
+    return "" if rel == "." else rel
+
+
+def files_under(index: IndexView, path: str) -> list[str]:
+    """The indexed files below `path`, in listing order."""
+    prefix = f"{path}/" if path else ""
+    return [rel for rel in index.order if rel.startswith(prefix)]
+
+
+def file_map(index: IndexView, path: str = "") -> dict[str, dict]:
+    """get_project_map's per-file {types, functions} entries, from the index."""
+    project: dict[str, dict] = {}
+    for rel in files_under(index, path):
+        entry = file_entry(index, rel)
+        if entry is not None:
+            project[rel] = entry
+    return project
+
+
+def file_entry(index: IndexView, rel: str) -> dict | None:
+    """One file's get_project_map entry; None if it declares no types or functions."""
+    if rel in index.errors:
+        return {"error": index.errors[rel]}
+    declarations = index.entries[rel].declarations
+    types = []
+    for d in declarations:
+        if d.is_type:
+            entry = {"kind": d.kind, "name": d.qualified}
+            if d.inherits:
+                entry["inherits"] = list(d.inherits)
+            types.append(entry)
+    functions = [d.name for d in declarations if d.kind == "function" and not d.parent]
+    if not types and not functions:
+        return None
+    entry = {"types": types}
+    if functions:
+        entry["functions"] = functions
+    return entry
+
+
+def _project_tree(index: IndexView) -> tuple[_Directory, Counter]:
+    """The rollup tree of the whole project and its conformer counts, rebuilt only after a change."""
+    with _lock:
+        cached = _trees.get(index.index)
+        if cached is not None and cached[0] == index.generation and cached[1] == index.order:
+            return cached[2], cached[3]
+    root = _Directory()
+    for rel in index.order:
+        node = root
+        for part in rel.split("/")[:-1]:
+            child = node.children.get(part)
+            if child is None:
+                child = node.children[part] = _Directory()
+            node = child
+        node.merge(_summary(index, rel))
+
+    def total(node: _Directory) -> None:
+        for child in node.children.values():
+            total(child)
+            node.merge(child)
+            node.height = max(node.height, child.height + 1)
+
+    total(root)
+    # How many types across the project inherit from or conform to each name.
+    conformers = root.conformances
+    with _lock:
+        _trees[index.index] = (index.generation, index.order, root, conformers)
+    return root, conformers
+
+
+def _tree(index: IndexView, path: str) -> tuple[_Directory, Counter]:
+    node, conformers = _project_tree(index)
+    for part in path.split("/") if path else []:
+        node = node.children.get(part, _EMPTY)
+    return node, conformers
+
+
+def _most_common(counts: Counter) -> list[tuple[str, int]]:
+    return sorted(counts.items(), key=lambda item: (-item[1], item[0]))
+
+
+def _render(name: str, node: _Directory, conformers: Counter, depth: int) -> dict:
+    out: dict = {"path": name or ".", "files": node.files}
+    if node.errors:
+        out["errors"] = node.errors
+    out["types"] = dict(_most_common(node.kinds))
+    if node.functions:
+        out["functions"] = node.functions
+    if node.protocols:
+        notable = sorted(node.protocols, key=lambda p: (-conformers[p.rpartition(".")[2]], p))[:_NOTABLE]
+        out["protocols"] = {p: conformers[p.rpartition(".")[2]] for p in notable}
+    if node.conformances:
+        out["conforms_to"] = dict(_most_common(node.conformances)[:_NOTABLE])
+    if node.public:
+        out["public"] = sorted(node.public)[:_PUBLIC_LISTED]
+        if len(node.public) > _PUBLIC_LISTED:
+            out["public_more"] = len(node.public) - _PUBLIC_LISTED
+    if node.children:
+        if depth > 0:
+            prefix = f"{name}/" if name else ""
+            out["dirs"] = [_render(prefix + child, node.children[child], conformers, depth - 1)
+                           for child in sorted(node.children)]
+        else:
+            out["subdirs"] = len(node.children)
+    return out
+
+
+def directory_map(index: IndexView, path: str = "", depth: int = 1) -> dict:
+    """The rollup of `path`, with its subdirectories expanded `depth` levels deep."""
+    return _render(path, *_tree(index, path), max(depth, 0))
+
+
+def fit_map(
+    index: IndexView, path: str, max_tokens: int,
+    render_files: Callable[[dict], str], render_rollup: Callable[[dict], str],
+) -> str:
+    """The most detailed map of `path` whose rendering fits `max_tokens`.
+
+    Tries the per-file map, then rollups from the deepest directory level
+    up; when nothing fits, returns the shallowest rollup (depth 0).
+    """
+    rendered = render_files(file_map(index, path))
+    if approx_tokens(rendered) <= max_tokens:
+        return rendered
+    tree, conformers = _tree(index, path)
+    for depth in range(tree.height, -1, -1):
+        rendered = render_rollup(_render(path, tree, conformers, depth))
+        if approx_tokens(rendered) <= max_tokens:
+            break
+    return rendered
@@ -0,0 +1,148 @@
+"""Memory-mapped text scanning across many Swift files.
+
+Textual searches (find_references, the get_dependents prefilter) used to read
+each file into a str, split it into lines and run a regex per line, which
+allocates every line of the project as a Python string. Here each file is
+memory-mapped and a compiled bytes regex runs over the whole buffer; line
+numbers and line text are only computed for the hits. Files are scanned in
+parallel on a thread pool, in order, and the scan stops as soon as the cap is
+reached.
+
+A cached summary block at the top of a file (same-file summary storage) is
+skipped, so matches inside generated markdown are never reported.
+"""
+
+from __future__ import annotations
+
+import mmap
+import os
+import re
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterable
+
+from swift_project_assistant.summary import BLOCK_END, BLOCK_START, extract_block
+
+DEFAULT_WORKERS = min(8, os.cpu_count() or 4)
+
+_BLOCK_START = BLOCK_START.encode()
+_BLOCK_END = BLOCK_END.encode()
+
+
+@dataclass
+class Hit:
+    path: Path
+    line: int  # 1-based
+    text: str  # the matching line, stripped
+
+
+# Bytes that can continue a Swift identifier. Every byte of a non-ASCII UTF-8
+# sequence is >= 0x80, so `größe` is one word here as it is in a str regex;
+# rb"\b" would treat those bytes as boundaries.
+_WORD = rb"[A-Za-z0-9_\x80-\xff]"
+
+
+def identifier_regex(name: str) -> re.Pattern[bytes]:
+    """Whole-word bytes regex for a Swift identifier."""
+    return re.compile(rb"(?<!" + _WORD + rb")" + re.escape(name.encode("utf-8")) + rb"(?!" + _WORD + rb")")
+
+
+def _body_start(buf: mmap.mmap) -> int:
+    """Byte offset of the code below a valid summary block (0 if none)."""
+    if buf[: len(_BLOCK_START)] != _BLOCK_START:
+        return 0
+    end = buf.find(_BLOCK_END)
+    if end == -1:
+        return 0
+    end += len(_BLOCK_END)
+    if extract_block(buf[:end].decode("utf-8", errors="replace")) is None:
+        return 0
+    return end + 1 if buf[end : end + 1] == b"\n" else end
+
+
+def _scan_buffer(path: Path, buf: mmap.mmap, regex: re.Pattern[bytes], limit: int | None) -> list[Hit]:
+    hits: list[Hit] = []
+    pos = _body_start(buf)
+    line = buf[:pos].count(b"\n") + 1
+    counted = pos  # newlines before `counted` are already included in `line`
+    size = len(buf)
+    while pos <= size:
+        m = regex.search(buf, pos)
+        if m is None:
+            break
+        start = buf.rfind(b"\n", 0, m.start()) + 1
+        end = buf.find(b"\n", m.start())
+        if end == -1:
+            end = size
+        line += buf[counted:start].count(b"\n")
+        counted = start
+        text = buf[start:end].decode("utf-8", errors="replace").strip()
+        hits.append(Hit(path, line, text))
+        if limit is not None and len(hits) >= limit:
+            break
+        # One hit per line, like a per-line search: resume on the next line.
+        pos = end + 1
+    return hits
+
+
+def scan_file(path: Path, regex: re.Pattern[bytes], limit: int | None = None) -> list[Hit]:
+    """Every line of `path` matching `regex`, up to `limit` hits."""
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return []
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buf:
+            return _scan_buffer(path, buf, regex, limit)
+
+
+def _scan_or_empty(path: Path, regex: re.Pattern[bytes], limit: int | None) -> list[Hit]:
+    try:
+        return scan_file(path, regex, limit)
+    except (OSError, ValueError):
+        return []
+
+
+def scan_files(
+    paths: Iterable[Path],
+    regex: re.Pattern[bytes],
+    cap: int | None = None,
+    workers: int = DEFAULT_WORKERS,
+    per_file_limit: int | None = None,
+) -> tuple[list[Hit], bool]:
+    """Scan files in parallel, returning (hits in file order, truncated).
+
+    At most `workers * 2` files are in flight, and once `cap` hits have been
+    collected the remaining queued files are cancelled. `truncated` is True
+    when the cap was reached. Unreadable files are skipped.
+    """
+    limit = per_file_limit if cap is None else min(cap, per_file_limit or cap)
+    hits: list[Hit] = []
+    truncated = False
+    todo = iter(paths)
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        pending: deque[Future[list[Hit]]] = deque()
+
+        def submit_next() -> None:
+            path = next(todo, None)
+            if path is not None:
+                pending.append(pool.submit(_scan_or_empty, path, regex, limit))
+
+        for _ in range(max(1, workers) * 2):
+            submit_next()
+        while pending:
+            hits.extend(pending.popleft().result())
+            if cap is not None and len(hits) >= cap:
+                del hits[cap:]
+                truncated = True
+                for future in pending:
+                    future.cancel()
+                break
+            submit_next()
+    return hits, truncated
+
+
+def files_matching(paths: Iterable[Path], regex: re.Pattern[bytes], workers: int = DEFAULT_WORKERS) -> list[Path]:
+    """The files (in input order) containing at least one match of `regex`."""
+    hits, _ = scan_files(paths, regex, workers=workers, per_file_limit=1)
+    return [hit.path for hit in hits]
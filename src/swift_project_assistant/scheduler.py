@@ -0,0 +1,265 @@
+"""One queue, by priority, for every SourceKitten run in the process.
+
+Background warm-up, speculative prefetch and interactive tool calls all need
+SourceKitten, and each run occupies a core for its duration. Without
+coordination a user's get_symbol_source could queue behind thousands of
+warm-up jobs. Every cache miss in cache.cached_structure therefore takes a
+slot from the process-wide Scheduler first.
+
+Requests carry one of three priority classes, taken from a context variable
+so that work a tool fans out (e.g. on the scan pipeline's threads) keeps the
+caller's class:
+
+    interactive  a tool call the agent is waiting on (the default)
+    prefetch     speculative work likely to be asked for next
+    background   warm-up and re-indexing
+
+Slots are granted strictly by class, then first come first served, so queued
+background work is passed over whenever an interactive request arrives; and
+the lower classes together never hold more than `limit - 1` slots, so an
+interactive request waits for at most one running job to finish. A run can't
+be interrupted once started, but a queued one can be promoted: when a tool
+call needs a file whose background run is still queued, it boosts that run
+to its own class instead of waiting behind it. A request whose tool call is
+cancelled while queued (see progress.py) leaves the queue at once.
+
+The limit is SWIFT_ASSISTANT_SOURCEKITTEN_JOBS (default: the CPU count). The
+lower classes are further held to the cores the machine's load average
+leaves idle, so warm-up backs off while the user builds. get_server_stats
+reports queue depth, running jobs and wait times per class.
+"""
+
+from __future__ import annotations
+
+import contextvars
+import heapq
+import itertools
+import os
+import threading
+import time
+from contextlib import contextmanager
+from enum import IntEnum
+from typing import Callable, Iterator
+
+from swift_project_assistant import progress
+
+_LOAD_TTL = 1.0  # seconds a load average reading is reused
+
+
+class Priority(IntEnum):
+    INTERACTIVE = 0
+    PREFETCH = 1
+    BACKGROUND = 2
+
+
+_current: contextvars.ContextVar[Priority] = contextvars.ContextVar("sourcekitten_priority",
+                                                                    default=Priority.INTERACTIVE)
+
+
+def current_priority() -> Priority:
+    return _current.get()
+
+
+@contextmanager
+def priority(level: Priority) -> Iterator[None]:
+    """Run SourceKitten requests made inside the block at `level`."""
+    token = _current.set(level)
+    try:
+        yield
+    finally:
+        _current.reset(token)
+
+
+def configured_limit() -> int:
+    """SWIFT_ASSISTANT_SOURCEKITTEN_JOBS, or the CPU count."""
+    raw = os.getenv("SWIFT_ASSISTANT_SOURCEKITTEN_JOBS", "").strip()
+    if raw:
+        try:
+            jobs = int(raw)
+        except ValueError:
+            raise ValueError(f"SWIFT_ASSISTANT_SOURCEKITTEN_JOBS must be a whole number, got {raw!r}") from None
+        return max(1, jobs)
+    return os.cpu_count() or 1
+
+
+def _load_average() -> float | None:
+    try:
+        return os.getloadavg()[0]
+    except (AttributeError, OSError):
+        return None
+
+
+class Ticket:
+    """One request's place in the queue; `boost` moves it up to a more urgent class."""
+
+    def __init__(self, scheduler: "Scheduler", level: Priority) -> None:
+        self.priority = level
+        self.queued = self.granted = self.abandoned = False
+        self._scheduler = scheduler
+        self._event = threading.Event()
+        self._queued_at = 0.0
+
+    def boost(self, level: Priority) -> None:
+        self._scheduler._boost(self, level)
+
+
+class _ClassStats:
+    def __init__(self) -> None:
+        self.queued = self.running = self.completed = self.jumped = 0
+        self.wait_total = self.wait_max = 0.0
+
+    def to_dict(self) -> dict:
+        waited = self.completed + self.running
+        return {"queued": self.queued, "running": self.running, "completed": self.completed,
+                "wait_ms_avg": round(1000 * self.wait_total / waited, 1) if waited else 0.0,
+                "wait_ms_max": round(1000 * self.wait_max, 1), "jumped_queue": self.jumped}
+
+
+class Scheduler:
+    """Grants at most `limit` concurrent slots, most urgent class first."""
+
+    def __init__(self, limit: int | None = None, load: Callable[[], float | None] = _load_average) -> None:
+        self.limit = limit or configured_limit()
+        self._load = load
+        self._lock = threading.Lock()
+        self._queue: list[tuple[int, int, Ticket]] = []  # (priority, seq, ticket); stale entries skipped
+        self._seq = itertools.count()
+        self._running = 0
+        self._running_low = 0  # slots held by the prefetch and background classes
+        self._stats = {p: _ClassStats() for p in Priority}
+        self._load_read: tuple[float, float | None] = (float("-inf"), None)
+
+    def ticket(self, level: Priority | None = None) -> Ticket:
+        return Ticket(self, current_priority() if level is None else level)
+
+    @contextmanager
+    def slot(self, ticket: Ticket | None = None) -> Iterator[None]:
+        """Hold one slot for the block, waiting in the queue for it if needed.
+
+        Inside the block current_priority() is the ticket's class, so a
+        background run boosted by a tool call is no longer started niced.
+        """
+        ticket = ticket or self.ticket()
+        with self._lock:
+            ticket._queued_at = time.monotonic()
+            ticket.queued = True
+            self._stats[ticket.priority].queued += 1
+            heapq.heappush(self._queue, (ticket.priority, next(self._seq), ticket))
+            self._dispatch()
+        try:
+            with progress.on_cancel(lambda: self._abandon(ticket)):
+                progress.wait(ticket._event.wait)
+            if ticket.abandoned:
+                raise progress.Cancelled("the client cancelled the request")
+        except BaseException:
+            # Cancelled while waiting, possibly just as the slot was granted: give it back.
+            self._withdraw(ticket)
+            raise
+        try:
+            with priority(ticket.priority):  # the class it was granted in, boosts included
+                yield
+        finally:
+            with self._lock:
+                self._release(ticket)
+
+    def low_priority_limit(self) -> int:
+        """Slots the prefetch and background classes may hold right now."""
+        cap = max(1, self.limit - 1)
+        now = time.monotonic()
+        if now - self._load_read[0] > _LOAD_TTL:
+            self._load_read = (now, self._load())
+        load = self._load_read[1]
+        if load is not None:
+            # Our own running jobs are part of the load; only other work takes cores away.
+            idle = (os.cpu_count() or 1) - load + self._running
+            cap = min(cap, max(1, int(idle)))
+        return cap
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"limit": self.limit, "low_priority_limit": self.low_priority_limit(),
+                    **{p.name.lower(): s.to_dict() for p, s in self._stats.items()}}
+
+    def _boost(self, ticket: Ticket, level: Priority) -> None:
+        with self._lock:
+            if ticket.granted or ticket.abandoned or level >= ticket.priority:
+                return
+            if not ticket.queued:
+                ticket.priority = level
+                return
+            self._stats[ticket.priority].queued -= 1
+            self._stats[level].queued += 1
+            ticket.priority = level
+            heapq.heappush(self._queue, (level, next(self._seq), ticket))  # the old entry goes stale
+            self._dispatch()
+
+    def _abandon(self, ticket: Ticket) -> None:
+        with self._lock:
+            if ticket.granted or ticket.abandoned:
+                return
+            ticket.abandoned = True  # its heap entry goes stale
+            self._stats[ticket.priority].queued -= 1
+            ticket._event.set()
+            self._dispatch()
+
+    def _withdraw(self, ticket: Ticket) -> None:
+        """Take a ticket whose caller gave up waiting out of the queue, or free its slot if granted."""
+        with self._lock:
+            if ticket.granted:
+                self._release(ticket)
+            elif not ticket.abandoned:
+                ticket.abandoned = True
+                self._stats[ticket.priority].queued -= 1
+                self._dispatch()
+
+    def _release(self, ticket: Ticket) -> None:
+        self._running -= 1
+        if ticket.priority != Priority.INTERACTIVE:
+            self._running_low -= 1
+        stats = self._stats[ticket.priority]
+        stats.running -= 1
+        stats.completed += 1
+        self._dispatch()
+
+    def _dispatch(self) -> None:
+        queue = self._queue
+        while queue:
+            level, _, ticket = queue[0]
+            if ticket.granted or ticket.abandoned or level != ticket.priority:
+                heapq.heappop(queue)
+                continue
+            if self._running >= self.limit:
+                return
+            if level != Priority.INTERACTIVE and self._running_low >= self.low_priority_limit():
+                return
+            heapq.heappop(queue)
+            self._grant(ticket)
+
+    def _grant(self, ticket: Ticket) -> None:
+        level = ticket.priority
+        stats = self._stats[level]
+        waited = time.monotonic() - ticket._queued_at
+        stats.queued -= 1
+        stats.running += 1
+        stats.wait_total += waited
+        stats.wait_max = max(stats.wait_max, waited)
+        if any(self._stats[p].queued for p in Priority if p > level):
+            stats.jumped += 1
+        self._running += 1
+        if level != Priority.INTERACTIVE:
+            self._running_low += 1
+        ticket.granted = True
+        ticket._event.set()
+
+
+_default: Scheduler | None = None
+_default_lock = threading.Lock()
+
+
+def default_scheduler() -> Scheduler:
+    """The process-wide scheduler, created on first use."""
+    global _default
+    with _default_lock:
+        if _default is None:
+            _default = Scheduler()
+        return _default
@@ -0,0 +1,374 @@
+"""Binary, memory-mapped snapshots of a project's declaration index.
+
+A snapshot is one file the server maps with mmap and queries in place, so a
+warm start does not rebuild Python objects for every declaration: files and
+their keys are read up front, while declarations are decoded one at a time
+when a query returns them.
+
+Layout (little-endian; every section starts on an 8-byte boundary):
+
+    header   MAGIC, FORMAT_VERSION, INDEX_VERSION, section count
+    toc      per section: 4-byte name, offset, length
+    STRS     utf-8 string table        SOFF  u32 start of each string (+ end)
+    FILE     one _FILE row per file    DECL  one _DECL row per declaration
+    LIST     u32 string ids: each file's imports and references, each
+             declaration's inherits
+    CORP     every signature, one per line, in file order (the search corpus);
+             each file's run is utf-8 of its own, decoded when searched
+    LINE     u32 per declaration: start of its line, relative to its file's
+             first corpus character
+    NAME     (name, postings start, count) sorted by name; NPST u32 decl ids
+    REFS     (type, postings start, count) sorted by type; RPST u32 file ids
+
+String id 0 is the project root the snapshot was built for. Each file row
+keeps the (mtime_ns, size) it was analyzed at, so a reader can trust an
+unchanged stat without hashing the file; a file with no trusted stat (see
+index.trusted_stat) is stored as unknown and always re-keyed.
+
+A snapshot whose magic, format or index version, or root do not match is
+ignored and the index is rebuilt.
+"""
+
+from __future__ import annotations
+
+import mmap
+import os
+import struct
+import tempfile
+from array import array
+from bisect import bisect_right
+from functools import partial
+from pathlib import Path
+from typing import Callable, Iterator, Sequence
+
+from swift_project_assistant.index import INDEX_VERSION, Declaration, FileEntry, Stat, corpus_line
+
+MAGIC = b"SPASNAP\0"
+FORMAT_VERSION = 2
+
+_HEADER = struct.Struct("<8sIII")
+_TOC = struct.Struct("<4sQQ")
+# rel, key, mtime_ns, size, first decl, decl count, first import, import count,
+# first reference, reference count, corpus start, corpus length (both in bytes), signature chars
+_FILE = struct.Struct("<IIqqIIIIIIIII")
+# file, kind, name, parent, signature, line, offset, length, access, first inherit, inherit count
+_DECL = struct.Struct("<IIIIIIIIIII")
+_POSTING = struct.Struct("<III")
+
+_NONE = 0xFFFFFFFF
+_UNKNOWN_SIZE = -1
+
+_SECTIONS = (b"STRS", b"SOFF", b"FILE", b"DECL", b"LIST", b"CORP", b"LINE", b"NAME", b"NPST", b"REFS", b"RPST")
+
+
+class _LazyDeclarations(Sequence[Declaration]):
+    """A file's declarations, decoded from the snapshot on access."""
+
+    __slots__ = ("_snapshot", "_start", "_count", "_cache")
+
+    def __init__(self, snapshot: "Snapshot", start: int, count: int) -> None:
+        self._snapshot = snapshot
+        self._start = start
+        self._count = count
+        self._cache: dict[int, Declaration] = {}
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __getitem__(self, i):  # type: ignore[override]
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(self._count))]
+        if i < 0:
+            i += self._count
+        if not 0 <= i < self._count:
+            raise IndexError(i)
+        d = self._cache.get(i)
+        if d is None:
+            d = self._cache[i] = self._snapshot.declaration(self._start + i)
+        return d
+
+
+class Snapshot:
+    """A mapped snapshot file; see the module docstring for the layout."""
+
+    def __init__(self, path: Path, mm: mmap.mmap, sections: dict[bytes, tuple[int, int]]) -> None:
+        self.path = path
+        self._mm = mm
+        self._sections = sections
+        self._soff = self._u32(b"SOFF")
+        self._list = self._u32(b"LIST")
+        self._line = self._u32(b"LINE")
+        self._npst = self._u32(b"NPST")
+        self._rpst = self._u32(b"RPST")
+        self._strings: dict[int, str] = {}
+        self.file_count = sections[b"FILE"][1] // _FILE.size
+        self.decl_count = sections[b"DECL"][1] // _DECL.size
+        self._decl_starts = array("I", (self._file_row(i)[4] for i in range(self.file_count)))
+
+    @classmethod
+    def open(cls, path: Path, root: str) -> "Snapshot | None":
+        """Map `path` if it is a valid snapshot of `root`, else None."""
+        try:
+            with open(path, "rb") as f:
+                mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):
+            return None
+        snapshot = None
+        try:
+            magic, fmt, version, count = _HEADER.unpack_from(mm, 0)
+            if magic != MAGIC or fmt != FORMAT_VERSION or version != INDEX_VERSION:
+                raise ValueError("incompatible snapshot")
+            sections = {}
+            for i in range(count):
+                name, offset, length = _TOC.unpack_from(mm, _HEADER.size + i * _TOC.size)
+                if offset + length > len(mm):
+                    raise ValueError("truncated snapshot")
+                sections[name] = (offset, length)
+            if set(_SECTIONS) - set(sections):
+                raise ValueError("missing sections")
+            snapshot = cls(path, mm, sections)
+            if snapshot.string(0) != root:
+                raise ValueError("snapshot of another root")
+            return snapshot
+        except (ValueError, struct.error, UnicodeDecodeError):
+            if snapshot is not None:
+                snapshot.close()
+            else:
+                mm.close()
+            return None
+
+    def _u32(self, name: bytes) -> memoryview:
+        offset, length = self._sections[name]
+        return memoryview(self._mm)[offset : offset + length].cast("I")
+
+    def string(self, sid: int) -> str:
+        s = self._strings.get(sid)
+        if s is None:
+            base = self._sections[b"STRS"][0]
+            s = self._strings[sid] = self._mm[base + self._soff[sid] : base + self._soff[sid + 1]].decode()
+        return s
+
+    def _opt_string(self, sid: int) -> str | None:
+        return None if sid == _NONE else self.string(sid)
+
+    def _strings_at(self, start: int, count: int) -> list[str]:
+        return [self.string(sid) for sid in self._list[start : start + count]]
+
+    def _file_row(self, fid: int) -> tuple:
+        return _FILE.unpack_from(self._mm, self._sections[b"FILE"][0] + fid * _FILE.size)
+
+    def _decl_row(self, did: int) -> tuple:
+        return _DECL.unpack_from(self._mm, self._sections[b"DECL"][0] + did * _DECL.size)
+
+    # --- files ---------------------------------------------------------------
+
+    def files(self) -> Iterator[tuple[int, str, str, Stat | None]]:
+        """(file id, relative path, blob key, stat) for every file."""
+        for fid in range(self.file_count):
+            row = self._file_row(fid)
+            stat = None if row[3] == _UNKNOWN_SIZE else (row[2], row[3])
+            yield fid, self.string(row[0]), self.string(row[1]), stat
+
+    def file_size(self, fid: int) -> tuple[int, int]:
+        """(declaration count, signature characters) of a file."""
+        row = self._file_row(fid)
+        return row[5], row[12]
+
+    def entry(self, fid: int) -> FileEntry:
+        row = self._file_row(fid)
+        return FileEntry(self.string(row[0]), self.string(row[1]), self._strings_at(row[6], row[7]),
+                         self._strings_at(row[8], row[9]), list(self.declarations(fid)))
+
+    def declarations(self, fid: int) -> _LazyDeclarations:
+        row = self._file_row(fid)
+        return _LazyDeclarations(self, row[4], row[5])
+
+    def _corpus_bytes(self, fid: int) -> bytes:
+        row = self._file_row(fid)
+        base = self._sections[b"CORP"][0] + row[10]
+        return self._mm[base : base + row[11]]
+
+    def corpus_text(self, fid: int) -> str:
+        """A file's corpus lines, decoded from the map on every call."""
+        return self._corpus_bytes(fid).decode()
+
+    def chunk(self, fid: int) -> tuple[Callable[[], str], Sequence[int], _LazyDeclarations]:
+        """A loader of a file's corpus text, its line starts, and its declarations."""
+        row = self._file_row(fid)
+        return partial(self.corpus_text, fid), self._line[row[4] : row[4] + row[5]], _LazyDeclarations(
+            self, row[4], row[5])
+
+    # --- declarations ----------------------------------------------------------
+
+    def decl_file(self, did: int) -> int:
+        return bisect_right(self._decl_starts, did) - 1
+
+    def declaration(self, did: int) -> Declaration:
+        _, kind, name, parent, sig, line, offset, length, access, inh, inh_count = self._decl_row(did)
+        return Declaration(self.string(kind), self.string(name), self.string(parent), self.string(sig),
+                           line, offset, length, self._opt_string(access), self._strings_at(inh, inh_count))
+
+    def names(self) -> Iterator[tuple[str, Sequence[int]]]:
+        """Every declared name with the ids of its declarations, in name order."""
+        offset, length = self._sections[b"NAME"]
+        for i in range(length // _POSTING.size):
+            sid, start, count = _POSTING.unpack_from(self._mm, offset + i * _POSTING.size)
+            yield self.string(sid), self._npst[start : start + count]
+
+    def referencing_files(self, type_name: str) -> list[int]:
+        """Ids of files that reference `type_name` (declared elsewhere)."""
+        offset, length = self._sections[b"REFS"]
+        lo, hi = 0, length // _POSTING.size
+        while lo < hi:
+            mid = (lo + hi) // 2
+            sid, start, count = _POSTING.unpack_from(self._mm, offset + mid * _POSTING.size)
+            name = self.string(sid)
+            if name == type_name:
+                return list(self._rpst[start : start + count])
+            if name < type_name:
+                lo = mid + 1
+            else:
+                hi = mid
+        return []
+
+    def close(self) -> None:
+        for view in (self._soff, self._list, self._line, self._npst, self._rpst):
+            view.release()
+        self._mm.close()
+
+
+class SnapshotWriter:
+    """Builds a snapshot from index entries and/or files of an older snapshot.
+
+    `copy_file` re-emits a file of the previous snapshot from its raw rows,
+    remapping string ids, without decoding its declarations.
+    """
+
+    def __init__(self, root: str) -> None:
+        self._ids: dict[str, int] = {}
+        self._strings: list[bytes] = []
+        self._files = bytearray()
+        self._decls = bytearray()
+        self._list = array("I")
+        self._corpus: list[bytes] = []
+        self._corpus_len = 0
+        self._lines = array("I")
+        self._names: dict[int, list[int]] = {}
+        self._refs: dict[int, list[int]] = {}
+        self._remap: dict[int, int] = {}
+        self._source: Snapshot | None = None
+        self.file_count = 0
+        self.decl_count = 0
+        self.intern(root)
+
+    def intern(self, s: str) -> int:
+        sid = self._ids.get(s)
+        if sid is None:
+            sid = self._ids[s] = len(self._strings)
+            self._strings.append(s.encode())
+        return sid
+
+    def _strs(self, values: Sequence[str]) -> tuple[int, int]:
+        start = len(self._list)
+        self._list.extend(self.intern(v) for v in values)
+        return start, len(values)
+
+    def _file(self, rel: int, key: int, stat: Stat | None, imports: tuple[int, int], refs: tuple[int, int],
+              decl_start: int, text: bytes, sig_chars: int) -> None:
+        if stat is None:
+            stat = (0, _UNKNOWN_SIZE)
+        for sid in self._list[refs[0] : refs[0] + refs[1]]:
+            self._refs.setdefault(sid, []).append(self.file_count)
+        self._files += _FILE.pack(rel, key, stat[0], stat[1], decl_start, self.decl_count - decl_start,
+                                  *imports, *refs, self._corpus_len, len(text), sig_chars)
+        self._corpus.append(text)
+        self._corpus.append(b"\n")
+        self._corpus_len += len(text) + 1
+        self.file_count += 1
+
+    def add_entry(self, entry: FileEntry, stat: Stat | None) -> None:
+        decl_start = self.decl_count
+        lines: list[str] = []
+        pos = sig_chars = 0
+        for d in entry.declarations:
+            line = corpus_line(d.signature)
+            self._lines.append(pos)
+            pos += len(line) + 1
+            lines.append(line)
+            sig_chars += len(d.signature)
+            name = self.intern(d.name)
+            self._names.setdefault(name, []).append(self.decl_count)
+            access = _NONE if d.access is None else self.intern(d.access)
+            self._decls += _DECL.pack(self.file_count, self.intern(d.kind), name, self.intern(d.parent),
+                                      self.intern(d.signature), d.line, d.offset, d.length, access,
+                                      *self._strs(d.inherits))
+            self.decl_count += 1
+        self._file(self.intern(entry.path), self.intern(entry.key), stat, self._strs(entry.imports),
+                   self._strs(entry.references), decl_start, "\n".join(lines).encode(), sig_chars)
+
+    def _copy_sid(self, sid: int) -> int:
+        new = self._remap.get(sid)
+        if new is None:
+            new = self._remap[sid] = self.intern(self._source.string(sid))
+        return new
+
+    def _copy_list(self, start: int, count: int) -> tuple[int, int]:
+        new_start = len(self._list)
+        self._list.extend(self._copy_sid(sid) for sid in self._source._list[start : start + count])
+        return new_start, count
+
+    def copy_file(self, source: Snapshot, fid: int, stat: Stat | None) -> None:
+        if self._source is not source:
+            self._source, self._remap = source, {}
+        row = source._file_row(fid)
+        decl_start = self.decl_count
+        for did in range(row[4], row[4] + row[5]):
+            _, kind, name, parent, sig, line, offset, length, access, inh, inh_count = source._decl_row(did)
+            name = self._copy_sid(name)
+            self._names.setdefault(name, []).append(self.decl_count)
+            self._decls += _DECL.pack(self.file_count, self._copy_sid(kind), name, self._copy_sid(parent),
+                                      self._copy_sid(sig), line, offset, length,
+                                      _NONE if access == _NONE else self._copy_sid(access),
+                                      *self._copy_list(inh, inh_count))
+            self.decl_count += 1
+        self._lines.extend(source._line[row[4] : row[4] + row[5]])
+        self._file(self._copy_sid(row[0]), self._copy_sid(row[1]), stat, self._copy_list(row[6], row[7]),
+                   self._copy_list(row[8], row[9]), decl_start, source._corpus_bytes(fid), row[12])
+
+    def _postings(self, table: dict[int, list[int]]) -> tuple[bytes, bytes]:
+        rows = bytearray()
+        postings = array("I")
+        for sid in sorted(table, key=lambda sid: self._strings[sid]):
+            rows += _POSTING.pack(sid, len(postings), len(table[sid]))
+            postings.extend(table[sid])
+        return bytes(rows), postings.tobytes()
+
+    def to_bytes(self) -> bytes:
+        offsets = array("I", [0])
+        for s in self._strings:
+            offsets.append(offsets[-1] + len(s))
+        names, name_postings = self._postings(self._names)
+        refs, ref_postings = self._postings(self._refs)
+        bodies = [b"".join(self._strings), offsets.tobytes(), bytes(self._files), bytes(self._decls),
+                  self._list.tobytes(), b"".join(self._corpus), self._lines.tobytes(),
+                  names, name_postings, refs, ref_postings]
+        out = bytearray(_HEADER.pack(MAGIC, FORMAT_VERSION, INDEX_VERSION, len(_SECTIONS)))
+        toc_at = len(out)
+        out += bytes(_TOC.size * len(_SECTIONS))
+        for i, (name, body) in enumerate(zip(_SECTIONS, bodies)):
+            out += bytes(-len(out) % 8)
+            _TOC.pack_into(out, toc_at + i * _TOC.size, name, len(out), len(body))
+            out += body
+        return bytes(out)
+
+    def write(self, path: Path) -> None:
+        """Write atomically (temp file + rename), so a mapped reader never sees a partial file."""
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(self.to_bytes())
+            os.replace(tmp, path)
+        except BaseException:
+            Path(tmp).unlink(missing_ok=True)
+            raise
@@ -30,13 +30,21 @@ file's mtime; editing the source makes the source newer and invalidates it.
 
 **off** never touches the filesystem: every call regenerates the summary and
 returns it without caching.
+
+Both stores are written atomically (temp file + rename), so a concurrent
+reader sees the old file or the new one, never a partial write. Servers
+running side by side coordinate through a lease on the file (see lease.py):
+while one regenerates a summary, another asking for it waits and returns
+the stored result instead of regenerating it too.
 """
 
 from __future__ import annotations
 
+import hashlib
 import os
 import re
 import sys
+import tempfile
 from datetime import datetime, timezone
 from enum import Enum
 from pathlib import Path
@@ -47,7 +55,8 @@ from swift_project_assistant.analyzer import (
     analyze_structure,
     run_sourcekitten,
 )
-from swift_project_assistant.llm import generate_overview
+from swift_project_assistant import lease
+from swift_project_assistant.cache import cached_structure, default_cache
 
 BLOCK_START = "/* swift-project-assistant:summary"
 BLOCK_END = "*/"
@@ -231,15 +240,25 @@ def _insert_overview(markdown: str, overview: str) -> str:
     return f"{head}\n\n## Overview\n\n{overview.strip()}\n\n{rest}"
 
 
-def _generate_markdown(path: Path) -> str:
+def generate_overview(outline_markdown: str, source: str) -> str | None:
+    """llm.generate_overview, importing the LLM backend only once SUMMARY_LLM enables one."""
+    if os.getenv("SUMMARY_LLM", "").strip().lower() in ("", "none"):
+        return None
+    from swift_project_assistant import llm
+
+    return llm.generate_overview(outline_markdown, source)
+
+
+def _generate_markdown(path: Path, use_cache: bool = True) -> str:
     """Run SourceKitten and render the markdown summary, with optional overview.
 
-    When SUMMARY_LLM is configured, an LLM-written prose overview is added to
-    the structural summary; LLM failures are logged and skipped so the
-    structural summary always succeeds.
+    The SourceKitten structure comes from the shared analysis cache (keyed by
+    git blob id) unless `use_cache` is False. When SUMMARY_LLM is configured,
+    an LLM-written prose overview is added to the structural summary; LLM
+    failures are logged and skipped so the structural summary always succeeds.
     """
-    structure = run_sourcekitten(str(path))
     source_bytes = path.read_bytes()
+    structure = cached_structure(path, source_bytes, run=run_sourcekitten, refresh=not use_cache)
     analysis = analyze_structure(source_bytes, structure)
     markdown = render_markdown(analysis, path.name)
 
@@ -255,14 +274,30 @@ def _generate_markdown(path: Path) -> str:
     return markdown
 
 
+def _replace(path: Path, text: str, like: Path, mtime: float | None = None) -> None:
+    """Write `text` to `path` atomically, with the permissions of `like` and optionally an mtime."""
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8", newline="") as f:
+            f.write(text)
+        os.chmod(tmp, like.stat().st_mode & 0o7777)
+        if mtime is not None:
+            os.utime(tmp, (mtime, mtime))
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.unlink(tmp)
+        except OSError:
+            pass
+        raise
+
+
 def _write_same_file(path: Path, markdown: str) -> None:
     body = strip_block(path.read_bytes().decode("utf-8", errors="replace"))
     generated = datetime.now(timezone.utc)
-    path.write_text(build_block(markdown, generated) + body, encoding="utf-8")
     # Pin the mtime to the generated timestamp so the freshly written cache
     # validates as current ("generated >= mtime") until the file is edited.
-    timestamp = generated.timestamp()
-    os.utime(path, (timestamp, timestamp))
+    _replace(path, build_block(markdown, generated) + body, path, mtime=generated.timestamp())
 
 
 def _write_standalone(path: Path, markdown: str) -> None:
@@ -271,14 +306,18 @@ def _write_standalone(path: Path, markdown: str) -> None:
         f"{_STANDALONE_HEADER} generated {generated.isoformat()}; "
         f"auto-generated from {path.name}, do not edit -->\n\n"
     )
-    sidecar_path(path).write_text(header + markdown, encoding="utf-8")
+    _replace(sidecar_path(path), header + markdown, path)
+
 
+def update_summary(path: Path, storage: SummaryStorage | None = None, refresh: bool = False) -> str:
+    """Regenerate the summary and persist it according to the storage mode.
 
-def update_summary(path: Path, storage: SummaryStorage | None = None) -> str:
-    """Regenerate the summary and persist it according to the storage mode."""
+    `refresh` (and storage "off", which never caches anything) re-runs
+    SourceKitten instead of reusing a cached analysis of the same content.
+    """
     if storage is None:
         storage = configured_storage()
-    markdown = _generate_markdown(path)
+    markdown = _generate_markdown(path, use_cache=not refresh and storage is not SummaryStorage.OFF)
     if storage is SummaryStorage.SAME_FILE:
         _write_same_file(path, markdown)
     elif storage is SummaryStorage.STANDALONE:
@@ -293,4 +332,12 @@ def get_summary(path: Path, refresh: bool = False) -> str:
         cached = cached_summary(path, storage)
         if cached is not None:
             return cached
-    return update_summary(path, storage)
+    if storage is SummaryStorage.OFF:
+        return update_summary(path, storage, refresh=refresh)
+    name = "summary-" + hashlib.sha1(str(path.resolve()).encode()).hexdigest()
+    stored = lambda: not refresh and cached_summary(path, storage) is not None  # noqa: E731
+    with lease.held(default_cache().directory, name, stored):
+        # Another server may have regenerated it while we waited.
+        if not refresh and (cached := cached_summary(path, storage)) is not None:
+            return cached
+        return update_summary(path, storage, refresh=refresh)
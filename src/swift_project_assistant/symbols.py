@@ -0,0 +1,268 @@
+"""Ranked prefix, camel-hump and fuzzy lookup of declared names.
+
+find_symbol only matches exact names; when an agent guesses `MovieVM` or
+`fetchMovie` it needs something forgiving but still cheap. SymbolIndex keeps,
+for every distinct declared name:
+
+- a sorted array of lowercased names, so a prefix is one bisect range (the
+  flat-array equivalent of a prefix trie, at a fraction of the memory);
+- a sorted array of camel-hump initials ("MovieViewModel" -> "mvm"), so
+  `MovieVM` or `fetchMov` narrow to a bisect range before being verified;
+- trigram postings, for substring matches and typo-tolerant similarity.
+
+Matches are ranked exact > case-insensitive exact > prefix > camel humps >
+substring > fuzzy, then by shorter name; each name expands to its
+declarations (types first). The arrays are rebuilt lazily after files change,
+and postings are maintained incrementally per file.
+
+Names loaded from a mapped index snapshot are registered with declaration
+ids (`add_mapped`); a declaration is decoded through `resolve` only when its
+name matches a query.
+"""
+
+from __future__ import annotations
+
+import heapq
+import re
+from bisect import bisect_left
+from collections import Counter
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Callable, Iterator
+
+if TYPE_CHECKING:
+    from swift_project_assistant.index import Declaration
+
+_HUMP_RE = re.compile(r"[A-Za-z][a-z0-9]*")
+
+# Candidates examined per tier; keeps pathological one-letter queries cheap.
+_TIER_CANDIDATES = 2000
+_FUZZY_THRESHOLD = 0.35
+_FUZZY_BUDGET = 20_000  # posting entries counted exactly per fuzzy lookup
+_FUZZY_CANDIDATES = 200
+
+MATCH_TIERS = ("exact", "exact-ci", "prefix", "camel", "substring", "fuzzy")
+
+
+@dataclass
+class SymbolMatch:
+    rel: str
+    declaration: "Declaration"
+    match: str  # one of MATCH_TIERS
+    score: float  # 1.0 for exact; similarity for fuzzy matches
+
+
+def humps(name: str) -> list[str]:
+    """Camel-case humps: "fetchMovies" -> ["fetch", "Movies"], "URLSession" -> [U, R, L, Session]."""
+    return _HUMP_RE.findall(name)
+
+
+def _initials(name: str) -> str:
+    return "".join(h[0] for h in humps(name)).lower()
+
+
+def _trigrams(text: str) -> set[str]:
+    return {text[i : i + 3] for i in range(len(text) - 2)}
+
+
+def _hump_regex(query: str) -> re.Pattern[str] | None:
+    parts = humps(query)
+    if len(parts) < 2:
+        return None
+    body = f"(?i:{re.escape(parts[0])})" + "".join(f"[a-z0-9_]*{re.escape(p)}" for p in parts[1:])
+    return re.compile(f"_*{body}")
+
+
+def _prefix_range(keys: list[str], prefix: str) -> range:
+    lo = bisect_left(keys, prefix)
+    hi = bisect_left(keys, prefix + "\uffff")
+    return range(lo, hi)
+
+
+class SymbolIndex:
+    """Declarations grouped by name, with prefix, hump and trigram lookup."""
+
+    def __init__(self, resolve: Callable[[int], "Declaration"] | None = None) -> None:
+        self._resolve = resolve
+        self._by_name: dict[str, list[tuple[str, "Declaration | int"]]] = {}
+        self._by_file: dict[str, list[str]] = {}  # declared names, one per declaration
+        self._postings: dict[str, set[str]] = {}
+        self._trigram_counts: dict[str, int] = {}
+        self._sorted: tuple[list[str], list[str], list[str], list[str]] | None = None
+
+    def __len__(self) -> int:
+        return sum(len(v) for v in self._by_file.values())
+
+    def _add_name(self, name: str) -> None:
+        grams = _trigrams(f"^{name.lower()}$")
+        self._trigram_counts[name] = len(grams)
+        for g in grams:
+            self._postings.setdefault(g, set()).add(name)
+        self._sorted = None
+
+    def _drop_name(self, name: str) -> None:
+        for g in _trigrams(f"^{name.lower()}$"):
+            names = self._postings.get(g)
+            if names is not None:
+                names.discard(name)
+                if not names:
+                    del self._postings[g]
+        self._trigram_counts.pop(name, None)
+        self._sorted = None
+
+    def remove_file(self, rel: str) -> None:
+        for name in set(self._by_file.pop(rel, ())):
+            owners = self._by_name.get(name)
+            if owners is None:
+                continue
+            owners[:] = [o for o in owners if o[0] != rel]
+            if not owners:
+                del self._by_name[name]
+                self._drop_name(name)
+
+    def _add(self, rel: str, name: str, declaration: "Declaration | int") -> None:
+        if name not in self._by_name:
+            self._by_name[name] = []
+            self._add_name(name)
+        self._by_name[name].append((rel, declaration))
+        self._by_file.setdefault(rel, []).append(name)
+
+    def set_file(self, rel: str, declarations: list["Declaration"]) -> None:
+        self.remove_file(rel)
+        self._by_file[rel] = []
+        for d in declarations:
+            self._add(rel, d.name, d)
+
+    def add_mapped(self, rel: str, name: str, did: int) -> None:
+        """Register declaration `did` of a mapped snapshot, decoded via `resolve` on demand."""
+        self._add(rel, name, did)
+
+    def files_declaring(self, name: str) -> set[str]:
+        """Files with a declaration named exactly `name` (nothing is decoded)."""
+        return {rel for rel, _ in self._by_name.get(name, ())}
+
+    def _owners(self, name: str) -> list[tuple[str, "Declaration"]]:
+        owners = self._by_name[name]
+        for i, (rel, d) in enumerate(owners):
+            if isinstance(d, int):
+                owners[i] = (rel, self._resolve(d))  # type: ignore[misc]
+        return owners  # type: ignore[return-value]
+
+    def _arrays(self) -> tuple[list[str], list[str], list[str], list[str]]:
+        if self._sorted is None:
+            by_lower = sorted((n.lower(), n) for n in self._by_name)
+            by_initials = sorted((_initials(n), n) for n in self._by_name)
+            self._sorted = ([k for k, _ in by_lower], [n for _, n in by_lower],
+                            [k for k, _ in by_initials], [n for _, n in by_initials])
+        return self._sorted
+
+    def _rank_names(
+        self, query: str, limit: int, keep: Callable[[str, "Declaration"], bool] | None = None
+    ) -> Iterator[tuple[str, str, float]]:
+        """(name, tier, score) for matching names, best first, ranked lazily as they are taken.
+
+        The slower tiers are skipped once the names found so far declare
+        `limit` declarations (that `keep` accepts, if given: checked best name
+        first, stopping at `limit`, so few declarations are decoded).
+        """
+        lower_keys, lower_names, initial_keys, initial_names = self._arrays()
+        ql = query.lower()
+        found: dict[str, tuple[int, float]] = {}
+
+        def add(name: str, tier: int, score: float = 1.0) -> None:
+            best = found.get(name)
+            if best is None or (tier, -score) < (best[0], -best[1]):
+                found[name] = (tier, score)
+
+        for i in _prefix_range(lower_keys, ql)[:_TIER_CANDIDATES]:
+            name = lower_names[i]
+            if name == query:
+                add(name, 0)
+            elif lower_keys[i] == ql:
+                add(name, 1)
+            else:
+                add(name, 2)
+
+        hump_re = _hump_regex(query)
+        if hump_re is not None:
+            for i in _prefix_range(initial_keys, _initials(query))[:_TIER_CANDIDATES]:
+                if hump_re.match(initial_names[i]):
+                    add(initial_names[i], 3)
+
+        def best_first() -> Iterator[tuple[int, float, str]]:
+            heap = [(tier, -score, len(name), name) for name, (tier, score) in found.items()]
+            heapq.heapify(heap)  # no full sort: callers stop after a few names
+            while heap:
+                tier, score, _, name = heapq.heappop(heap)
+                yield tier, -score, name
+
+        def enough() -> bool:
+            owners = sum(len(self._by_name[n]) for n in found)
+            if keep is None or owners < limit:
+                return owners >= limit
+            kept = 0
+            for _, _, name in best_first():
+                for rel, d in self._owners(name):
+                    if keep(rel, d):
+                        kept += 1
+                        if kept >= limit:
+                            return True
+            return False
+
+        if len(ql) >= 3 and not enough():
+            postings = sorted((self._postings.get(g, set()) for g in _trigrams(ql)), key=len)
+            if postings and postings[0]:
+                candidates = set(postings[0]).intersection(*postings[1:])
+                for name in list(candidates)[:_TIER_CANDIDATES]:
+                    if ql in name.lower():
+                        add(name, 4)
+
+        if len(ql) >= 2 and not enough():
+            # Count shared trigrams over the rarest postings first, within a
+            # budget; the common trigrams left over are only checked for the
+            # leading candidates, which keeps typo lookups bounded.
+            grams = sorted(_trigrams(f"^{ql}$"), key=lambda g: len(self._postings.get(g, ())))
+            shared: Counter[str] = Counter()
+            deferred: list[set[str]] = []
+            counted = 0
+            for g in grams:
+                names = self._postings.get(g)
+                if not names:
+                    continue
+                if shared and counted + len(names) > _FUZZY_BUDGET:
+                    deferred.append(names)
+                    continue
+                shared.update(names)
+                counted += len(names)
+            for name, common in shared.most_common(_FUZZY_CANDIDATES):
+                common += sum(1 for names in deferred if name in names)
+                score = common / (len(grams) + self._trigram_counts[name] - common)
+                if score >= _FUZZY_THRESHOLD:
+                    add(name, 5, score)
+
+        return ((name, MATCH_TIERS[tier], score) for tier, score, name in best_first())
+
+    def search(
+        self,
+        query: str,
+        limit: int = 20,
+        accept: Callable[[str, "Declaration"], bool] | None = None,
+    ) -> list[SymbolMatch]:
+        """The best `limit` declarations for `query`; `accept` filters candidates."""
+        # "Type.member" narrows member matches to parents containing "Type".
+        parent_hint, _, query = query.strip().split("(")[0].rpartition(".")
+        parent_hint = parent_hint.lower()
+        if not query or limit <= 0:
+            return []
+
+        def keep(rel: str, d: "Declaration") -> bool:
+            return (not parent_hint or parent_hint in d.parent.lower()) and (accept is None or accept(rel, d))
+
+        out: list[SymbolMatch] = []
+        for name, tier, score in self._rank_names(query, limit, keep if parent_hint or accept else None):
+            owners = sorted(self._owners(name), key=lambda o: (not o[1].is_type, o[0], o[1].line))
+            for rel, d in owners:
+                if keep(rel, d):
+                    out.append(SymbolMatch(rel, d, tier, round(score, 2)))
+                    if len(out) >= limit:
+                        return out
+        return out
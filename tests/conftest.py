@@ -0,0 +1,18 @@
+import pytest
+
+from swift_project_assistant import index, memo
+
+
+@pytest.fixture(autouse=True)
+def isolated_cache(tmp_path, monkeypatch):
+    """Keep the persistent analysis cache out of the user's home directory.
+
+    Speculative prefetching is off unless a test turns it on, and pending
+    snapshot saves are written before the test ends, so no background work
+    outlives the test that started it.
+    """
+    monkeypatch.setenv("SWIFT_ASSISTANT_CACHE", str(tmp_path / "cache"))
+    monkeypatch.setenv("SWIFT_ASSISTANT_PREFETCH", "off")
+    memo.engine.clear()
+    yield
+    index.flush_saves()
@@ -0,0 +1,88 @@
+"""Tests for the per-project access log and hot-file warming."""
+
+import json
+import os
+from pathlib import Path
+
+import pytest
+
+from swift_project_assistant import accesslog, cache, files, mcp_server
+from swift_project_assistant.accesslog import HALF_LIFE, AccessLog, AccessLogs, configured_hot_files
+from tests.test_analyzer import SOURCE, STRUCTURE
+
+
+def test_counts_decay_and_persist(tmp_path):
+    now = [1_000_000.0]
+    log = AccessLog(tmp_path / "log.json", clock=lambda: now[0])
+    for _ in range(3):
+        log.record("files", "Old.swift")
+    now[0] += 2 * HALF_LIFE  # three accesses two half-lives ago count as 0.75
+    log.record("files", "New.swift")
+    log.record("symbols", "MovieViewModel")
+    assert log.hottest("files", 5) == ["New.swift", "Old.swift"]
+    assert log.hottest("files", 1) == ["New.swift"]
+
+    log.save()
+    reloaded = AccessLog(tmp_path / "log.json", clock=lambda: now[0])
+    assert reloaded.hottest("files", 5) == ["New.swift", "Old.swift"]
+    assert reloaded.hottest("symbols", 5) == ["MovieViewModel"]
+
+
+def test_log_is_bounded(monkeypatch):
+    monkeypatch.setattr(accesslog, "_MAX_ENTRIES", 20)
+    log = AccessLog(None)
+    for i in range(50):
+        log.record("files", f"F{i}.swift")
+    assert len(log) <= 20
+    assert "F49.swift" in log.hottest("files", 20)
+
+
+def test_access_log_setting(monkeypatch):
+    assert configured_hot_files() == accesslog.DEFAULT_HOT_FILES
+    monkeypatch.setenv("SWIFT_ASSISTANT_ACCESS_LOG", "off")
+    assert configured_hot_files() is None
+    logs = AccessLogs()
+    logs.add_root(Path("/p"))
+    logs.record_file(Path("/p/A.swift"))
+    assert logs.stats()["logged_files"] == {}
+    monkeypatch.setenv("SWIFT_ASSISTANT_ACCESS_LOG", "many")
+    with pytest.raises(ValueError):
+        configured_hot_files()
+
+
+@pytest.fixture
+def project(tmp_path, monkeypatch):
+    calls = []
+    monkeypatch.setattr(cache, "run_sourcekitten", lambda p: calls.append(os.path.basename(p)) or STRUCTURE)
+    monkeypatch.setattr(mcp_server, "_access_logs", AccessLogs())
+    monkeypatch.setattr(mcp_server, "_prewarmer", None)
+    files.clear_cache()
+    mcp_server._projects.clear()
+    root = tmp_path / "App"
+    root.mkdir()
+    for i in range(6):
+        (root / f"F{i}.swift").write_text(SOURCE + f"\n// {i}\n")
+    return root.resolve(), calls
+
+
+def test_startup_warms_the_hottest_files_first(project, monkeypatch):
+    root, calls = project
+    # A previous session touched F4 most, then F2.
+    previous = AccessLogs()
+    previous.add_root(root)
+    for name in ("F4.swift", "F4.swift", "F2.swift"):
+        previous.record_file(root / name)
+    previous.save_all()
+
+    monkeypatch.setenv("SWIFT_ASSISTANT_ACCESS_LOG", "2")
+    mcp_server.start_prewarm([str(root)]).join(5)
+    assert calls[:2] == ["F4.swift", "F2.swift"]
+    assert sorted(calls) == [f"F{i}.swift" for i in range(6)]
+
+    mcp_server.get_file_outline(str(root / "F4.swift"))
+    mcp_server.get_file_outline(str(root / "F0.swift"))
+    stats = json.loads(mcp_server.get_server_stats())["access_log"]
+    assert stats["warmed_from_log"] == 2
+    assert stats["first_touch"]["warmed"]["count"] == 1
+    assert stats["first_touch"]["cold"]["count"] == 1
+    assert stats["logged_files"] == {str(root): 3}  # F4, F2 and now F0
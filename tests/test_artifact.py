@@ -0,0 +1,96 @@
+"""Tests for shareable index artifacts and the --index cache tier."""
+
+import json
+import subprocess
+import zipfile
+
+import pytest
+
+from swift_project_assistant import cache, files, mcp_server
+from swift_project_assistant.artifact import IndexArtifact, build_artifact
+from tests.test_analyzer import SOURCE, STRUCTURE
+
+
+@pytest.fixture
+def project(tmp_path, monkeypatch):
+    """A committed two-file project analyzed by a counting fake SourceKitten."""
+    calls = []
+    monkeypatch.setattr(cache, "run_sourcekitten", lambda p: calls.append(p) or STRUCTURE)
+    monkeypatch.setattr(cache, "_readonly_tiers", [])
+    monkeypatch.setattr(mcp_server, "_artifacts", [])
+    files.clear_cache()
+    mcp_server._projects.clear()
+    root = tmp_path / "App"
+    (root / "Views").mkdir(parents=True)
+    (root / "A.swift").write_text(SOURCE)
+    (root / "Views" / "B.swift").write_text(SOURCE.replace("MovieViewModel", "ShowViewModel"))
+    git = ["git", "-C", str(root), "-c", "user.name=t", "-c", "user.email=t@t"]
+    subprocess.run(git + ["init", "-q"], check=True)
+    subprocess.run(git + ["add", "."], check=True)
+    subprocess.run(git + ["commit", "-q", "-m", "init"], check=True)
+    return root, calls
+
+
+def fresh_machine(tmp_path, monkeypatch, name):
+    """Point the local cache at an empty directory, as on another machine."""
+    monkeypatch.setenv("SWIFT_ASSISTANT_CACHE", str(tmp_path / name))
+    files.clear_cache()
+    mcp_server._projects.clear()
+
+
+def test_build_artifact(project, tmp_path):
+    root, calls = project
+    out = tmp_path / "App.spaindex"
+    manifest = build_artifact(root, out, jobs=2)
+    assert len(calls) == 2
+    assert sorted(manifest["files"]) == ["A.swift", "Views/B.swift"]
+    assert manifest["commit"] == subprocess.run(
+        ["git", "-C", str(root), "rev-parse", "HEAD"], capture_output=True, text=True
+    ).stdout.strip()
+    assert manifest["dirty"] is False
+    assert manifest["errors"] == {}
+
+    artifact = IndexArtifact(out)
+    assert artifact.get(manifest["files"]["A.swift"]) == STRUCTURE
+    assert artifact.get("0" * 40) is None
+
+
+def test_server_serves_from_artifact_without_sourcekitten(project, tmp_path, monkeypatch):
+    root, calls = project
+    out = tmp_path / "App.spaindex"
+    build_artifact(root, out)
+    fresh_machine(tmp_path, monkeypatch, "other-cache")
+    calls.clear()
+
+    mcp_server.load_artifacts([str(out)])
+    outline = json.loads(mcp_server.get_file_outline(str(root / "A.swift")))
+    assert outline["types"][0]["name"] == "MovieViewModel"
+    matches = json.loads(mcp_server.search_symbols(str(root), "MovieVM"))["matches"]
+    assert {m["file"] for m in matches} == {"A.swift", "Views/B.swift"}
+    assert calls == []
+
+    # Edited content is not in the artifact and is analyzed locally.
+    (root / "A.swift").write_text(SOURCE + "\n// edited\n")
+    mcp_server.get_file_outline(str(root / "A.swift"))
+    assert calls == [str(root / "A.swift")]
+
+
+def test_invalid_artifact_is_rejected(tmp_path):
+    bogus = tmp_path / "bogus.spaindex"
+    bogus.write_text("not a zip")
+    with pytest.raises(ValueError, match="Not an index artifact"):
+        IndexArtifact(bogus)
+
+    other = tmp_path / "other.spaindex"
+    with zipfile.ZipFile(other, "w") as z:
+        z.writestr("manifest.json", json.dumps({"format": "something-else", "version": 1}))
+    with pytest.raises(ValueError, match="Unsupported"):
+        IndexArtifact(other)
+
+
+def test_index_command(project, tmp_path, capsys):
+    root, _ = project
+    out = tmp_path / "dist" / "App.spaindex"
+    mcp_server.main(["index", str(root), "--out", str(out), "--exclude", "Views"])
+    assert sorted(IndexArtifact(out).manifest["files"]) == ["A.swift"]
+    assert "Indexed 1 files" in capsys.readouterr().err
@@ -0,0 +1,50 @@
+"""Tests for the batch symbol tools: one call, one analysis per file."""
+
+import json
+
+from swift_project_assistant import mcp_server
+from swift_project_assistant.analyzer import analyze_structure, find_symbol_source
+from tests.test_analyzer import SOURCE, SOURCE_BYTES, STRUCTURE
+from tests.test_ranges import project  # noqa: F401 - a fixture
+
+SYMBOLS = ["MovieViewModel.fetchMovies", "Category", "makeDefaultViewModel", "MovieViewModel.missing"]
+
+
+def test_symbol_sources_analyze_the_file_once(project):
+    root, calls = project
+    path = str(root / "A.swift")
+    sources = json.loads(mcp_server.get_symbol_sources(path, SYMBOLS + ["Category"]))
+    assert list(sources) == SYMBOLS
+    assert calls == [path]
+    analysis = analyze_structure(SOURCE_BYTES, STRUCTURE)
+    for symbol in SYMBOLS[:3]:
+        assert sources[symbol] == find_symbol_source(analysis, symbol)
+    assert sources["MovieViewModel.missing"] == mcp_server.get_symbol_source(path, "MovieViewModel.missing")
+
+
+def test_implementations_reanalyze_a_changed_file_once(project):
+    root, calls = project
+    mcp_server.get_implementation(str(root), "Category")  # builds the index
+    (root / "A.swift").write_text(SOURCE + "\n")
+    calls.clear()
+    batch = json.loads(mcp_server.get_implementations(str(root), SYMBOLS))
+    assert calls.count(str(root / "A.swift")) == 1
+    for symbol in SYMBOLS:
+        assert batch[symbol] == mcp_server.get_implementation(str(root), symbol)
+    assert batch["MovieViewModel.missing"].startswith("Symbol 'MovieViewModel.missing' not found")
+
+
+def test_find_symbols_scans_once(project):
+    root, calls = project
+    (root / "Views" / "B.swift").write_text(SOURCE + "\n// B\n")  # content of its own, so analyzed on its own
+    names = ["MovieViewModel", "fetchMovies", "Missing"]
+    batch = json.loads(mcp_server.find_symbols(str(root), names))
+    assert len(calls) == 2  # each file analyzed once for all three names
+    for name in names:
+        assert batch["symbols"][name]["matches"] == json.loads(mcp_server.find_symbol(str(root), name))["matches"]
+    assert batch["symbols"]["Missing"] == {"matches": []}
+
+    limited = json.loads(mcp_server.find_symbols(str(root), ["Category"], limit=1))
+    assert limited["symbols"]["Category"] == {"matches": [{"file": "A.swift", "line": 16, "kind": "enum",
+                                                           "name": "MovieViewModel.Category"}],
+                                              "truncated": "stopped at 1 matches"}
@@ -0,0 +1,142 @@
+"""Tests for the git blob id keyed analysis cache."""
+
+import subprocess
+import threading
+
+from swift_project_assistant import cache
+from tests.test_analyzer import SOURCE, STRUCTURE
+
+
+def git(root, *args):
+    subprocess.run(
+        ["git", "-c", "user.name=t", "-c", "user.email=t@t", "-C", str(root), *args],
+        check=True, capture_output=True,
+    )
+
+
+def make_repo(tmp_path):
+    root = tmp_path / "repo"
+    (root / "Sources").mkdir(parents=True)
+    (root / "Sources" / "Clean.swift").write_text("struct Clean {}\n")
+    (root / "Sources" / "Dirty.swift").write_text("struct Dirty {}\n")
+    (root / "README.md").write_text("not swift\n")
+    git(root, "init", "-q")
+    git(root, "add", ".")
+    git(root, "commit", "-q", "-m", "init")
+    (root / "Sources" / "Dirty.swift").write_text("struct Dirty { var x: Int }\n")
+    (root / "New.swift").write_text("struct New {}\n")
+    return root
+
+
+def test_blob_id_matches_git(tmp_path):
+    path = tmp_path / "A.swift"
+    path.write_bytes(b"struct A {}\n")
+    expected = subprocess.run(["git", "hash-object", str(path)], capture_output=True, text=True).stdout.strip()
+    assert cache.blob_id(b"struct A {}\n") == expected
+    assert cache.file_blob_id(path) == expected
+
+
+def test_git_listing_classifies_files(tmp_path):
+    root = make_repo(tmp_path)
+    listing = cache.git_listing(root)
+    assert set(listing.blob_ids) == {"Sources/Clean.swift"}
+    assert listing.dirty == ["Sources/Dirty.swift"]
+    assert listing.untracked == ["New.swift"]
+    assert listing.paths == ["New.swift", "Sources/Clean.swift", "Sources/Dirty.swift"]
+
+
+def test_git_listing_outside_repo(tmp_path):
+    assert cache.git_listing(tmp_path) is None
+
+
+def test_content_keys_are_blob_ids(tmp_path):
+    root = make_repo(tmp_path)
+    files = sorted(root.rglob("*.swift"))
+    keys = cache.content_keys(root, files)
+    assert keys == {f: cache.blob_id(f.read_bytes()) for f in files}
+    # Plain directories hash in-process and agree with git.
+    plain = tmp_path / "plain"
+    plain.mkdir()
+    copy = plain / "Clean.swift"
+    copy.write_bytes((root / "Sources" / "Clean.swift").read_bytes())
+    assert cache.content_keys(plain, [copy]) == {copy: keys[root / "Sources" / "Clean.swift"]}
+
+
+def test_analysis_cache_persists(tmp_path):
+    store = cache.AnalysisCache(tmp_path / "store")
+    assert store.get("ab" * 20) is None
+    store.put("ab" * 20, STRUCTURE)
+    fresh = cache.AnalysisCache(tmp_path / "store")
+    assert fresh.get("ab" * 20) == STRUCTURE
+    assert (fresh.hits, fresh.misses) == (1, 0)
+
+
+def test_identical_content_analyzed_once(tmp_path, monkeypatch):
+    calls = []
+    monkeypatch.setattr(cache, "run_sourcekitten", lambda p: calls.append(p) or STRUCTURE)
+    # Two worktrees (or branches) holding the same file content.
+    a = tmp_path / "wt1" / "MovieViewModel.swift"
+    b = tmp_path / "wt2" / "MovieViewModel.swift"
+    for path in (a, b):
+        path.parent.mkdir()
+        path.write_text(SOURCE)
+    assert cache.analyze_cached(a).types[0].name == "MovieViewModel"
+    assert cache.analyze_cached(b).types[0].name == "MovieViewModel"
+    assert calls == [str(a)]
+
+
+def test_cache_off_writes_nothing(tmp_path, monkeypatch):
+    monkeypatch.setenv("SWIFT_ASSISTANT_CACHE", "off")
+    assert cache.configured_cache_dir() is None
+    assert cache.default_cache().directory is None
+
+
+def test_concurrent_misses_share_one_run(tmp_path):
+    started, release = threading.Event(), threading.Event()
+    calls = []
+
+    def slow_run(path):
+        calls.append(path)
+        started.set()
+        release.wait(5)
+        return STRUCTURE
+
+    path = tmp_path / "A.swift"
+    path.write_text(SOURCE)
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(
+        cache.cached_structure(path, SOURCE.encode(), run=slow_run))) for _ in range(3)]
+    threads[0].start()
+    started.wait(5)
+    for t in threads[1:]:
+        t.start()
+    release.set()
+    for t in threads:
+        t.join(5)
+    assert len(calls) == 1
+    assert results == [STRUCTURE] * 3
+
+
+def test_file_edited_after_keying_is_stored_under_its_new_id(tmp_path, monkeypatch):
+    root = make_repo(tmp_path)
+    path = root / "Sources" / "Clean.swift"
+    old = cache.content_keys(root, [path])[path]
+    path.write_text(SOURCE)  # saved while a scan was under way
+    monkeypatch.setattr(cache, "run_sourcekitten", lambda p: STRUCTURE)
+    assert cache.analyze_cached(path, old).types[0].name == "MovieViewModel"
+    store = cache.default_cache()
+    assert not store.stored(old)
+    assert store.get(cache.blob_id(SOURCE.encode())) == STRUCTURE
+
+
+def test_file_edited_during_the_run_is_not_stored(tmp_path, monkeypatch):
+    path = tmp_path / "A.swift"
+    path.write_text(SOURCE)
+
+    def run(p):
+        path.write_text(SOURCE + "// saved meanwhile\n")
+        return STRUCTURE
+
+    monkeypatch.setattr(cache, "run_sourcekitten", run)
+    cache.cached_structure(path, SOURCE.encode())
+    assert not cache.default_cache().stored(cache.blob_id(SOURCE.encode()))
@@ -0,0 +1,78 @@
+"""Tests for `since` delta answers from get_project_map and find_types."""
+
+import json
+
+from swift_project_assistant import mcp_server
+from swift_project_assistant.index import ChangeJournal
+from tests.test_rollup import STRUCTURES, decl, project  # noqa: F401 - project is a fixture
+
+
+def test_journal_tokens():
+    journal = ChangeJournal()
+    journal.record(1, {"A.swift"})
+    journal.record(2, {"B.swift"})
+    listing = journal.listing(["A.swift", "B.swift"])
+    assert journal.listing(["A.swift"]) != listing == journal.listing(["A.swift", "B.swift"])
+    assert journal.since(journal.token(0, listing), 2) == ({"A.swift", "B.swift"}, ("A.swift", "B.swift"))
+    assert journal.since(journal.token(1, listing), 2) == ({"B.swift"}, ("A.swift", "B.swift"))
+    assert journal.since(journal.token(2, listing), 2) == (set(), ("A.swift", "B.swift"))
+    assert journal.since(ChangeJournal().token(1, 0), 2) is None  # another index's token
+    assert journal.since(journal.token(3, listing), 2) is None
+    assert journal.since(journal.token(2, 99), 2) is None  # a listing never seen (or forgotten)
+    assert journal.since("garbage", 2) is None
+
+
+def test_map_refresh_returns_only_changes(project, monkeypatch):
+    first = json.loads(mcp_server.get_project_map(str(project), since=""))
+    assert first["full"] and len(first["changed"]) == 4
+    token = first["generation"]
+
+    unchanged = mcp_server.get_project_map(str(project), since=token, format="min")
+    assert json.loads(unchanged) == {"generation": token, "since": token, "changed": {}, "removed": []}
+    assert len(unchanged) < 100
+
+    monkeypatch.setitem(STRUCTURES, "Row.swift", [decl("enum", "Row")])
+    (project / "Views" / "Rows" / "Row.swift").write_text("// edited\n")
+    (project / "Services" / "MovieService.swift").unlink()
+    delta = json.loads(mcp_server.get_project_map(str(project), since=token))
+    assert delta["changed"] == {"Views/Rows/Row.swift": {"types": [{"kind": "enum", "name": "Row"}]}}
+    assert delta["removed"] == ["Services/MovieService.swift"]
+    assert delta["generation"] != token and "full" not in delta
+
+    again = json.loads(mcp_server.get_project_map(str(project), since=delta["generation"], path="Views"))
+    assert again["changed"] == {} and again["removed"] == []
+
+    mcp_server._projects.clear()  # a reloaded index doesn't know the old token
+    assert json.loads(mcp_server.get_project_map(str(project), since=delta["generation"]))["full"]
+
+
+def test_type_refresh(project, monkeypatch):
+    first = json.loads(mcp_server.find_types(str(project), inherits="View", since=""))
+    assert [m["name"] for m in first["matches"]] == ["MovieList", "Row"]
+    monkeypatch.setitem(STRUCTURES, "Row.swift", [decl("enum", "Row")])
+    (project / "Views" / "Rows" / "Row.swift").write_text("// edited\n")
+    delta = json.loads(mcp_server.find_types(str(project), inherits="View", since=first["generation"]))
+    assert delta["matches"] == [] and delta["changed_files"] == ["Views/Rows/Row.swift"]
+
+    text = mcp_server.find_types(str(project), inherits="View", since=delta["generation"], format="compact")
+    assert text.splitlines() == [f"// generation {delta['generation']} (since {delta['generation']})",
+                                 "// inherits=View: 0 matches"]
+
+
+def test_other_exclude_sets_do_not_show_up_in_a_refresh(project):
+    everything = json.loads(mcp_server.get_project_map(str(project), since=""))
+    without = json.loads(mcp_server.get_project_map(str(project), ["Services"], since=""))
+    assert not any(rel.startswith("Services/") for rel in without["changed"])
+
+    # Calls with the other exclude set in between change nothing for either caller.
+    for token, exclude in ((everything["generation"], None), (without["generation"], ["Services"])):
+        mcp_server.get_project_map(str(project), ["Views"] if exclude is None else None, since="")
+        delta = json.loads(mcp_server.get_project_map(str(project), exclude, since=token))
+        assert delta == {"generation": token, "since": token, "changed": {}, "removed": []}
+
+    # A token for one listing, refreshed with another, reports the difference.
+    delta = json.loads(mcp_server.get_project_map(str(project), ["Services"], since=everything["generation"]))
+    assert delta["changed"] == {}
+    assert delta["removed"] == sorted(rel for rel in everything["changed"] if rel.startswith("Services/"))
+    back = json.loads(mcp_server.get_project_map(str(project), since=delta["generation"]))
+    assert sorted(back["changed"]) == delta["removed"] and back["removed"] == []
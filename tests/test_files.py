@@ -0,0 +1,154 @@
+"""Tests for cached, gitignore-aware Swift file enumeration."""
+
+import re
+import subprocess
+
+import pytest
+
+from swift_project_assistant import files
+from swift_project_assistant.files import ExcludeMatcher, glob_to_regex, is_ignored, parse_gitignore, swift_files
+
+
+@pytest.fixture(autouse=True)
+def fresh_cache():
+    files.clear_cache()
+    yield
+    files.clear_cache()
+
+
+def touch(root, *rels):
+    for rel in rels:
+        path = root / rel
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text("struct X {}\n")
+
+
+def rels(root, paths):
+    return [p.relative_to(root).as_posix() for p in paths]
+
+
+def test_glob_to_regex():
+    assert re.fullmatch(glob_to_regex("*.xcassets"), "Images.xcassets")
+    assert not re.fullmatch(glob_to_regex("*.xcassets"), "a/Images.xcassets")
+    assert re.fullmatch(glob_to_regex("App/**"), "App/a/b")
+    assert re.fullmatch(glob_to_regex("**/Tests"), "Tests")
+    assert re.fullmatch(glob_to_regex("**/Tests"), "Modules/A/Tests")
+    assert re.fullmatch(glob_to_regex("Gen[0-9]"), "Gen3")
+
+
+def test_exclude_matcher_names_paths_and_defaults():
+    matcher = ExcludeMatcher(["Generated*", "Modules/*/Tests"])
+    assert matcher.excludes("Pods")
+    assert matcher.excludes("App/.hidden")
+    assert matcher.excludes("App/GeneratedCode")
+    assert matcher.excludes("Modules/Core/Tests")
+    assert not matcher.excludes("Tests")
+    assert not matcher.excludes("App/Views")
+
+
+def test_gitignore_rules():
+    rules = parse_gitignore("# comment\nbuild/\n*.generated.swift\n!Keep.generated.swift\n/Root.swift\n")
+    assert is_ignored(rules, "build", True)
+    assert not is_ignored(rules, "build", False)  # dir-only rule
+    assert is_ignored(rules, "App/Model.generated.swift", False)
+    assert not is_ignored(rules, "App/Keep.generated.swift", False)
+    assert is_ignored(rules, "Root.swift", False)
+    assert not is_ignored(rules, "App/Root.swift", False)  # anchored
+
+
+def test_scandir_walk_honours_gitignore_and_globs(tmp_path):
+    touch(
+        tmp_path,
+        "App/View.swift",
+        "App/Model.generated.swift",
+        "Assets.xcassets/Thing.swift",
+        "Pods/Lib/Lib.swift",
+        "Vendor/Sub/Ignored.swift",
+        "Vendor/Keep.swift",
+        "README.md",
+    )
+    (tmp_path / ".gitignore").write_text("*.generated.swift\n")
+    (tmp_path / "Vendor" / ".gitignore").write_text("Sub/\n")
+    result = swift_files(str(tmp_path), ["*.xcassets"])
+    assert rels(tmp_path, result) == ["App/View.swift", "Vendor/Keep.swift"]
+
+
+def test_listing_is_cached_and_revalidated(tmp_path, monkeypatch):
+    touch(tmp_path, "App/A.swift")
+    assert rels(tmp_path, swift_files(str(tmp_path))) == ["App/A.swift"]
+
+    walks = []
+    original = files._scandir_enumerate
+    monkeypatch.setattr(files, "_scandir_enumerate", lambda *a: walks.append(a) or original(*a))
+    assert rels(tmp_path, swift_files(str(tmp_path))) == ["App/A.swift"]
+    assert walks == []  # served from the cache
+
+    touch(tmp_path, "App/B.swift")  # changes App's mtime
+    assert rels(tmp_path, swift_files(str(tmp_path))) == ["App/A.swift", "App/B.swift"]
+    assert len(walks) == 1
+
+
+def test_git_enumeration(tmp_path):
+    touch(tmp_path, "App/A.swift", "Legacy/Untracked.swift", "Build/Out.swift", "Pods/P.swift")
+    (tmp_path / ".gitignore").write_text("Build/\n")
+    subprocess.run(["git", "init", "-q", str(tmp_path)], check=True)
+    subprocess.run(["git", "-C", str(tmp_path), "add", "App/A.swift", ".gitignore"], check=True)
+    assert rels(tmp_path, swift_files(str(tmp_path))) == ["App/A.swift", "Legacy/Untracked.swift"]
+    assert rels(tmp_path, swift_files(str(tmp_path), ["Leg*"])) == ["App/A.swift"]
+
+    (tmp_path / "App" / "A.swift").unlink()  # tracked but deleted
+    assert rels(tmp_path, swift_files(str(tmp_path))) == ["Legacy/Untracked.swift"]
+
+
+def test_git_listing_revalidation(tmp_path, monkeypatch):
+    touch(tmp_path, "App/A.swift", "Sub/README.md")
+    subprocess.run(["git", "init", "-q", str(tmp_path)], check=True)
+    subprocess.run(["git", "-C", str(tmp_path), "add", "."], check=True)
+    assert rels(tmp_path, swift_files(str(tmp_path))) == ["App/A.swift"]
+
+    runs = []
+    original = subprocess.run
+    monkeypatch.setattr(subprocess, "run", lambda *a, **k: runs.append(a) or original(*a, **k))
+    touch(tmp_path, "App/Feature/B.swift")  # a new folder in a stamped one
+    assert rels(tmp_path, swift_files(str(tmp_path))) == ["App/A.swift", "App/Feature/B.swift"]
+    assert len(runs) == 1
+    assert rels(tmp_path, swift_files(str(tmp_path))) == ["App/A.swift", "App/Feature/B.swift"]
+    assert len(runs) == 1  # a hit only stats what was stamped
+
+    # The trade-off: a folder with no Swift file isn't stamped, so a file
+    # created there shows up once the git index changes.
+    touch(tmp_path, "Sub/New.swift")
+    assert rels(tmp_path, swift_files(str(tmp_path))) == ["App/A.swift", "App/Feature/B.swift"]
+    original(["git", "-C", str(tmp_path), "add", "Sub/New.swift"], check=True)
+    assert rels(tmp_path, swift_files(str(tmp_path))) == ["App/A.swift", "App/Feature/B.swift", "Sub/New.swift"]
+
+    (tmp_path / "App" / ".gitignore").write_text("Feature/\n")  # a nested .gitignore edit
+    assert rels(tmp_path, swift_files(str(tmp_path))) == ["App/A.swift", "Sub/New.swift"]
+
+
+def test_git_listing_walks_submodules_and_nested_repositories(tmp_path):
+    def git(root, *args):
+        subprocess.run(["git", "-c", "user.name=t", "-c", "user.email=t@t", "-c", "protocol.file.allow=always",
+                        "-C", str(root), *args], check=True, capture_output=True)
+
+    dep = tmp_path / "dep"
+    touch(dep, "Dep.swift")
+    git(dep, "init", "-q")
+    git(dep, "add", ".")
+    git(dep, "commit", "-q", "-m", "init")
+    app = tmp_path / "app"
+    touch(app, "App.swift", "Nested/N.swift", "Ignored/Nested/I.swift")
+    (app / ".gitignore").write_text("Ignored/\n")
+    for repo in (app / "Nested", app / "Ignored" / "Nested", app):
+        git(repo, "init", "-q")
+    git(app, "submodule", "add", "-q", str(dep), "Vendor/Dep")
+    assert rels(app, swift_files(str(app))) == ["App.swift", "Nested/N.swift", "Vendor/Dep/Dep.swift"]
+    assert rels(app, swift_files(str(app), ["Vendor"])) == ["App.swift", "Nested/N.swift"]
+
+    touch(app, "Vendor/Dep/More.swift")  # walked trees are stamped throughout
+    assert "Vendor/Dep/More.swift" in rels(app, swift_files(str(app)))
+
+
+def test_not_a_directory(tmp_path):
+    with pytest.raises(ValueError, match="Not a directory"):
+        swift_files(str(tmp_path / "missing"))
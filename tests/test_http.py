@@ -0,0 +1,161 @@
+"""Load test of the shared HTTP transport: eight simulated agents on one server."""
+
+import json
+import socket
+import statistics
+import threading
+import time
+
+import anyio
+import pytest
+import uvicorn
+from mcp import ClientSession
+from mcp.client.streamable_http import streamable_http_client
+
+from swift_project_assistant import admission, cache, files, mcp_server, scheduler
+from swift_project_assistant.admission import CallLimits, configured_calls_per_client
+from swift_project_assistant.index import ProjectIndex
+from swift_project_assistant.scheduler import Scheduler
+from tests.test_analyzer import SOURCE, STRUCTURE
+
+AGENTS = 8
+FILES_PER_AGENT = 6
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+@pytest.fixture
+def http_server(tmp_path, monkeypatch):
+    port = free_port()
+    monkeypatch.setattr(mcp_server.mcp, "_session_manager", None)  # one run per manager; each test gets its own
+    server = uvicorn.Server(uvicorn.Config(mcp_server.mcp.streamable_http_app(), host="127.0.0.1", port=port,
+                                           log_level="warning"))
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    deadline = time.monotonic() + 10
+    while not server.started:
+        assert time.monotonic() < deadline and thread.is_alive(), "server did not start"
+        time.sleep(0.01)
+    yield f"http://127.0.0.1:{port}/mcp"
+    server.should_exit = True
+    thread.join(5)
+
+
+def test_calls_per_client_setting(monkeypatch):
+    monkeypatch.setenv("SWIFT_ASSISTANT_CALLS_PER_CLIENT", "2")
+    assert configured_calls_per_client() == 2
+    monkeypatch.setenv("SWIFT_ASSISTANT_CALLS_PER_CLIENT", "some")
+    with pytest.raises(ValueError):
+        configured_calls_per_client()
+
+
+def test_eight_agents_share_one_warm_server(http_server, tmp_path, monkeypatch):
+    limits = CallLimits(total=6, per_client=2)
+    monkeypatch.setattr(admission, "_default", limits)
+    monkeypatch.setattr(scheduler, "_default", Scheduler(limit=4, load=lambda: None))
+    runs = []
+    peak = [0]
+
+    def sourcekitten(path):
+        runs.append(path)
+        peak[0] = max(peak[0], limits.stats()["running"])
+        time.sleep(0.02)  # a quick SourceKitten run
+        return STRUCTURE
+
+    monkeypatch.setattr(cache, "run_sourcekitten", sourcekitten)
+    files.clear_cache()
+    mcp_server._projects.clear()
+    project = tmp_path / "App"
+    project.mkdir()
+    for i in range(AGENTS * FILES_PER_AGENT):
+        (project / f"F{i}.swift").write_text(SOURCE + f"\n// {i}\n")
+    latencies = []
+    failures = []
+
+    async def agent(n):
+        async with streamable_http_client(http_server) as (read, write, _):
+            async with ClientSession(read, write) as session:
+                await session.initialize()
+
+                async def call(name, args):
+                    started = time.monotonic()
+                    result = await session.call_tool(name, args)
+                    latencies.append(time.monotonic() - started)
+                    if result.isError:
+                        failures.append(result.content)
+
+                # Each agent works on its own files, then on what everyone shares.
+                async with anyio.create_task_group() as tasks:
+                    for i in range(n * FILES_PER_AGENT, (n + 1) * FILES_PER_AGENT):
+                        tasks.start_soon(call, "get_file_outline", {"file_path": str(project / f"F{i}.swift")})
+                await call("get_project_map", {"project_path": str(project)})
+                await call("find_types", {"project_path": str(project), "inherits": "ObservableObject"})
+
+    started = time.monotonic()
+
+    async def main():
+        async with anyio.create_task_group() as tasks:
+            for n in range(AGENTS):
+                tasks.start_soon(agent, n)
+
+    anyio.run(main)
+    elapsed = time.monotonic() - started
+
+    assert not failures
+    calls = AGENTS * (FILES_PER_AGENT + 2)
+    assert len(latencies) == calls and limits.admitted == calls
+    assert sorted(runs) == sorted(set(runs)), "every file is analyzed once, whichever agent asks"
+    assert len(runs) == AGENTS * FILES_PER_AGENT
+    assert peak[0] <= limits.total
+    stats = json.loads(mcp_server.get_server_stats())["calls"]
+    assert stats["running"] == 0 and stats["waiting"] == 0
+    latencies.sort()
+    print(f"\n{AGENTS} agents, {calls} calls in {elapsed:.2f}s ({calls / elapsed:.0f} calls/s); latency "
+          f"p50 {1000 * statistics.median(latencies):.0f} ms, "
+          f"p95 {1000 * latencies[int(0.95 * len(latencies))]:.0f} ms")
+
+
+def test_clients_with_different_excludes_get_their_own_file_sets(http_server, tmp_path, monkeypatch):
+    monkeypatch.setattr(cache, "run_sourcekitten", lambda p: STRUCTURE)
+    update = ProjectIndex.update
+
+    def yielding_update(self, *args, **kwargs):
+        view = update(self, *args, **kwargs)
+        time.sleep(0.005)  # let another call's update run between this one and its queries
+        return view
+
+    monkeypatch.setattr(ProjectIndex, "update", yielding_update)
+    files.clear_cache()
+    mcp_server._projects.clear()
+    project = tmp_path / "App"
+    for folder in ("Core", "Legacy"):
+        (project / folder).mkdir(parents=True)
+        for i in range(10):
+            (project / folder / f"{folder}{i}.swift").write_text(SOURCE + f"\n// {folder} {i}\n")
+    wrong = []
+
+    async def client(exclude):
+        async with streamable_http_client(http_server) as (read, write, _):
+            async with ClientSession(read, write) as session:
+                await session.initialize()
+                args = {"project_path": str(project), "exclude_folders": exclude}
+                for n in range(10):  # distinct arguments each round, so nothing is served memoized
+                    for name, extra in (("search_symbols", {"query": "MovieViewModel", "limit": 50 + n}),
+                                        ("search_declarations", {"pattern": f"^class|^round{n}"}),
+                                        ("get_implementation", {"symbol": "MovieViewModel.fetchMovies"})):
+                        result = await session.call_tool(name, {**args, **extra})
+                        text = result.content[0].text
+                        if ("Legacy/" in text) != (not exclude) or "Core/" not in text:
+                            wrong.append((name, exclude, n))
+
+    async def main():
+        async with anyio.create_task_group() as tasks:
+            for exclude in ([], ["Legacy"], [], ["Legacy"]):
+                tasks.start_soon(client, exclude)
+
+    anyio.run(main)
+    assert not wrong
@@ -0,0 +1,147 @@
+"""Tests for the project declaration index and its signature corpus."""
+
+import json
+import re
+
+import pytest
+
+from swift_project_assistant import cache, files, mcp_server
+from swift_project_assistant.analyzer import analyze_structure
+from swift_project_assistant.index import Declaration, DeclarationCorpus, ProjectIndex, file_declarations, flush_saves
+from tests.test_analyzer import SOURCE, SOURCE_BYTES, STRUCTURE
+
+
+@pytest.fixture
+def project(tmp_path, monkeypatch):
+    """A two-file project analyzed by a counting fake SourceKitten."""
+    calls = []
+    monkeypatch.setattr(cache, "run_sourcekitten", lambda p: calls.append(p) or STRUCTURE)
+    files.clear_cache()
+    mcp_server._projects.clear()
+    root = tmp_path / "App"
+    (root / "Views").mkdir(parents=True)
+    (root / "A.swift").write_text(SOURCE)
+    (root / "Views" / "B.swift").write_text(SOURCE)
+    return root, calls
+
+
+def test_file_declarations_outline_order():
+    decls = file_declarations(analyze_structure(SOURCE_BYTES, STRUCTURE))
+    assert [(d.kind, d.qualified) for d in decls] == [
+        ("class", "MovieViewModel"),
+        ("property", "MovieViewModel.movies"),
+        ("property", "MovieViewModel.service"),
+        ("initializer", "MovieViewModel.init"),
+        ("method", "MovieViewModel.fetchMovies"),
+        ("enum", "MovieViewModel.Category"),
+        ("case", "MovieViewModel.Category.nowPlaying"),
+        ("case", "MovieViewModel.Category.upcoming"),
+        ("function", "makeDefaultViewModel"),
+    ]
+    assert decls[0].signature == "class MovieViewModel: ObservableObject"
+    assert decls[5].signature == "enum MovieViewModel.Category: String"
+    assert (decls[0].line, decls[4].line) == (4, 12)
+
+
+def decl(signature):
+    return Declaration("method", signature, "", signature, 1, 0, 0)
+
+
+def test_corpus_search_anchors_and_order():
+    corpus = DeclarationCorpus()
+    corpus.set_file("b", [decl("func load() -> [Workout]"), decl("var count: Int")])
+    corpus.set_file("a", [decl("func save(_ w: Workout)")])
+    corpus.set_order(["a", "b"])
+    hits = corpus.search(re.compile(r"Workout", re.MULTILINE))
+    assert [(rel, d.signature) for rel, d in hits] == [
+        ("a", "func save(_ w: Workout)"), ("b", "func load() -> [Workout]"),
+    ]
+    assert [d.signature for _, d in corpus.search(re.compile(r"^var", re.MULTILINE))] == ["var count: Int"]
+    assert [d.signature for _, d in corpus.search(re.compile(r"\]$", re.MULTILINE))] == ["func load() -> [Workout]"]
+    # A match may not span two signatures.
+    assert list(corpus.search(re.compile(r"Workout\]\s+var", re.MULTILINE))) == []
+
+    corpus.remove_file("a")
+    assert len(corpus) == 2
+
+
+def test_index_updates_incrementally_and_persists(project):
+    root, calls = project
+    index = ProjectIndex.load(root)
+    index.update(files.swift_files(str(root)))
+    # Identical content is analyzed once, thanks to the blob id cache.
+    assert len(calls) == 1
+    assert index.order == ["A.swift", "Views/B.swift"]
+    assert index.entries["A.swift"].references == ["Movie", "MovieService", "ObservableObject"]
+
+    (root / "A.swift").write_text(SOURCE + "\n// edited\n")
+    index.update(files.swift_files(str(root)))
+    assert len(calls) == 2
+
+    flush_saves()
+    reloaded = ProjectIndex.load(root)
+    assert set(reloaded.entries) == {"A.swift", "Views/B.swift"}
+    reloaded.update(files.swift_files(str(root)))
+    assert len(calls) == 2  # nothing changed since the save
+
+    (root / "Views" / "B.swift").unlink()
+    reloaded.update(files.swift_files(str(root)))
+    assert set(reloaded.entries) == {"A.swift"}
+
+
+def test_search_declarations_tool(project):
+    root, _ = project
+    result = json.loads(mcp_server.search_declarations(str(root), r"-> \[Movie\]|^enum"))
+    assert result["match_count"] == 4
+    assert result["matches"][:2] == [
+        {"file": "A.swift", "name": "MovieViewModel.fetchMovies",
+         "declaration": "func fetchMovies(for category: Category) -> [Movie]"},
+        {"file": "A.swift", "line": 16, "declaration": "enum MovieViewModel.Category: String"},
+    ]
+    assert json.loads(mcp_server.search_declarations(str(root), "("))["error"].startswith("invalid regex")
+
+
+def test_registry_evicts_least_recently_used_to_snapshot(project, tmp_path):
+    root, calls = project
+    other = tmp_path / "Other"
+    other.mkdir()
+    (other / "C.swift").write_text(SOURCE + "\n// other\n")
+    registry = mcp_server.ProjectRegistry(budget_bytes=1)
+    a = registry.get(root.resolve())
+    a.update(files.swift_files(str(root)))
+    b = registry.get(other.resolve())
+    b.update(files.swift_files(str(other)))
+    registry.enforce_budget()
+    # Only the most recently used project stays in memory.
+    assert [p["root"] for p in registry.stats()["projects"]] == [str(other.resolve())]
+    assert registry.evictions == 1
+
+    reloaded = registry.get(root.resolve())
+    assert reloaded is not a and set(reloaded.entries) == {"A.swift", "Views/B.swift"}
+    analyzed = len(calls)
+    reloaded.update(files.swift_files(str(root)))
+    assert len(calls) == analyzed  # served from the snapshot, nothing re-analyzed
+
+
+def test_memory_budget_setting(monkeypatch):
+    monkeypatch.setenv("SWIFT_ASSISTANT_MEMORY_MB", "0.5")
+    assert mcp_server.configured_memory_budget() == 512 * 1024
+    monkeypatch.setenv("SWIFT_ASSISTANT_MEMORY_MB", "lots")
+    with pytest.raises(ValueError, match="SWIFT_ASSISTANT_MEMORY_MB"):
+        mcp_server.configured_memory_budget()
+
+
+def test_each_update_queries_its_own_file_set(project):
+    root, _ = project
+    index = ProjectIndex.load(root)
+    everything = index.update(files.swift_files(str(root)))
+    no_views = index.update(files.swift_files(str(root), ["Views"]))  # e.g. a concurrent call's exclude_folders
+    assert everything.order == ["A.swift", "Views/B.swift"] and no_views.order == ["A.swift"]
+    assert everything.files_declaring("MovieViewModel") == ["A.swift", "Views/B.swift"]
+    assert no_views.files_declaring("MovieViewModel") == ["A.swift"]
+    assert {m.rel for m in everything.search_symbols("MovieViewModel")} == {"A.swift", "Views/B.swift"}
+    assert [rel for rel, _ in everything.search_declarations(re.compile("^class", re.M))] == ["A.swift",
+                                                                                              "Views/B.swift"]
+    assert [rel for rel, _ in no_views.search_declarations(re.compile("^class", re.M))] == ["A.swift"]
+    assert everything.dependents("MovieService") == ["A.swift", "Views/B.swift"]
+    assert everything.entries is index.entries and everything.generation == index.generation
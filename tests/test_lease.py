@@ -0,0 +1,98 @@
+"""Tests for cross-process leases: servers sharing a cache do each piece of work once."""
+
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+
+import pytest
+
+from swift_project_assistant import lease
+from tests.test_analyzer import SOURCE, STRUCTURE
+
+pytestmark = pytest.mark.skipif(lease.fcntl is None, reason="leases need flock")
+
+SERVERS = 4
+FILES = 12
+
+# Stands in for `sourcekitten structure --file <path>`: logs each run, takes a while.
+FAKE_SOURCEKITTEN = """\
+import os, sys, time
+with open(os.environ["RUNS_LOG"], "a") as log:
+    log.write(sys.argv[-1] + "\\n")
+time.sleep(0.1)
+sys.stdout.write(os.environ["STRUCTURE"])
+"""
+
+# One stdio server's worth of work: analyze every file of the project.
+SERVER = """\
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from swift_project_assistant.cache import analyze_cached
+paths = sorted(Path(sys.argv[1]).glob("*.swift"))
+with ThreadPoolExecutor(4) as pool:
+    assert all(a.types for a in pool.map(analyze_cached, paths))
+"""
+
+
+def test_lease_waits_for_holder_then_reuses_result(tmp_path):
+    finished = threading.Event()
+    outcome = []
+
+    def other():
+        with lease.held(tmp_path, "k", finished.is_set) as owner:
+            outcome.append(owner)
+
+    with lease.held(tmp_path, "k", lambda: False) as owner:
+        assert owner
+        thread = threading.Thread(target=other)
+        thread.start()
+        time.sleep(0.1)
+        assert thread.is_alive()  # flock conflicts between separate opens, even within a process
+        finished.set()
+        thread.join(2)
+    assert outcome == [False]
+    assert lease.stats()["reused"] >= 1
+    assert not (tmp_path / "leases" / "k.lock").exists()
+
+
+def test_abandoned_lock_file_does_not_block(tmp_path):
+    (tmp_path / "leases").mkdir()
+    (tmp_path / "leases" / "k.lock").touch()  # left by a process that crashed mid-analysis
+    with lease.held(tmp_path, "k", lambda: False) as owner:
+        assert owner
+
+
+def test_no_directory_grants_at_once():
+    with lease.held(None, "k", lambda: False) as owner:
+        assert owner
+
+
+def test_concurrent_servers_analyze_each_file_once(tmp_path):
+    bin_dir = tmp_path / "bin"
+    bin_dir.mkdir()
+    fake = bin_dir / "sourcekitten"
+    fake.write_text(f"#!{sys.executable}\n{FAKE_SOURCEKITTEN}")
+    fake.chmod(0o755)
+    project = tmp_path / "App"
+    project.mkdir()
+    for i in range(FILES):
+        (project / f"F{i}.swift").write_text(SOURCE + f"\n// {i}\n")
+    runs = tmp_path / "runs.log"
+    src = os.path.join(os.path.dirname(__file__), os.pardir, "src")
+    env = {**os.environ, "PATH": f"{bin_dir}{os.pathsep}{os.environ['PATH']}", "RUNS_LOG": str(runs),
+           "STRUCTURE": json.dumps(STRUCTURE), "PYTHONPATH": os.path.abspath(src),
+           "SWIFT_ASSISTANT_CACHE": str(tmp_path / "shared-cache")}
+
+    started = time.monotonic()
+    servers = [subprocess.Popen([sys.executable, "-c", SERVER, str(project)], env=env) for _ in range(SERVERS)]
+    assert [s.wait(60) for s in servers] == [0] * SERVERS
+    elapsed = time.monotonic() - started
+
+    analyzed = runs.read_text().splitlines()
+    assert sorted(analyzed) == sorted(set(analyzed)), "no file is analyzed by two servers"
+    assert len(analyzed) == FILES
+    print(f"\n{SERVERS} servers, {FILES} shared files: {len(analyzed)} SourceKitten runs in {elapsed:.2f}s")
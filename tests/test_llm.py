@@ -1,5 +1,3 @@
-import subprocess
-
 import pytest
 
 from swift_project_assistant import llm
@@ -65,16 +63,26 @@ def test_ollama_host_without_scheme(monkeypatch):
     assert llm._ollama_host() == "http://0.0.0.0:11434"
 
 
+class FakeClaude:
+    """Stands in for subprocess.Popen running `claude -p`."""
+
+    def __init__(self, returncode, stdout="", stderr="", captured=None):
+        self.returncode, self.stdout, self.stderr = returncode, stdout, stderr
+        self.captured = captured if captured is not None else {}
+
+    def __call__(self, cmd, **kwargs):
+        self.captured["cmd"] = cmd
+        return self
+
+    def communicate(self, input, timeout):
+        self.captured["input"] = input
+        return self.stdout, self.stderr
+
+
 def test_claude_cli_backend(monkeypatch):
     monkeypatch.setenv("SUMMARY_LLM", "claude-cli:haiku")
     captured = {}
-
-    def fake_run(cmd, input, capture_output, text, timeout):
-        captured["cmd"] = cmd
-        captured["input"] = input
-        return subprocess.CompletedProcess(cmd, 0, stdout="Handles movie fetching.\n", stderr="")
-
-    monkeypatch.setattr(llm.subprocess, "run", fake_run)
+    monkeypatch.setattr(llm.subprocess, "Popen", FakeClaude(0, stdout="Handles movie fetching.\n", captured=captured))
     overview = llm.generate_overview("# Outline", "class B {}")
     assert overview == "Handles movie fetching."
     assert captured["cmd"] == ["claude", "-p", "--model", "haiku"]
@@ -83,11 +91,7 @@ def test_claude_cli_backend(monkeypatch):
 
 def test_claude_cli_failure_raises(monkeypatch):
     monkeypatch.setenv("SUMMARY_LLM", "claude-cli")
-
-    def fake_run(cmd, **kwargs):
-        return subprocess.CompletedProcess(cmd, 1, stdout="", stderr="not logged in")
-
-    monkeypatch.setattr(llm.subprocess, "run", fake_run)
+    monkeypatch.setattr(llm.subprocess, "Popen", FakeClaude(1, stderr="not logged in"))
     with pytest.raises(RuntimeError, match="not logged in"):
         llm.generate_overview("# Outline", "code")
 
@@ -95,10 +99,10 @@ def test_claude_cli_failure_raises(monkeypatch):
 def test_claude_cli_missing_binary(monkeypatch):
     monkeypatch.setenv("SUMMARY_LLM", "claude-cli")
 
-    def fake_run(cmd, **kwargs):
+    def fake_popen(cmd, **kwargs):
         raise FileNotFoundError("claude")
 
-    monkeypatch.setattr(llm.subprocess, "run", fake_run)
+    monkeypatch.setattr(llm.subprocess, "Popen", fake_popen)
     with pytest.raises(RuntimeError, match="Claude Code CLI"):
         llm.generate_overview("# Outline", "code")
 
@@ -0,0 +1,91 @@
+"""Tests for dependency-tracked memoization of tool results."""
+
+import json
+import os
+
+import pytest
+
+from swift_project_assistant import cache, files, mcp_server, memo
+from swift_project_assistant.memo import QueryEngine, read_file
+from tests.test_analyzer import SOURCE, STRUCTURE
+
+
+@pytest.fixture
+def project(tmp_path, monkeypatch):
+    calls = []
+    monkeypatch.setattr(cache, "run_sourcekitten", lambda p: calls.append(p) or STRUCTURE)
+    files.clear_cache()
+    mcp_server._projects.clear()
+    (tmp_path / "A.swift").write_text(SOURCE)
+    return tmp_path, calls
+
+
+def test_engine_invalidates_on_recorded_file_change(tmp_path):
+    engine = QueryEngine()
+    f = tmp_path / "a.txt"
+    f.write_text("one")
+
+    def compute():
+        read_file(f)
+        return f.read_text()
+
+    assert engine.run("q", "k", compute) == "one"
+    assert engine.run("q", "k", compute) == "one"
+    f.write_text("three")
+    assert engine.run("q", "k", compute) == "three"
+    assert engine.stats()["queries"]["q"] == {
+        "calls": 3, "hits": 1, "misses": 1, "invalidated": 1, "hit_rate": 0.333,
+    }
+
+
+def test_nested_queries_propagate_inputs(tmp_path):
+    engine = QueryEngine()
+    f = tmp_path / "a.txt"
+    f.write_text("one")
+
+    def inner():
+        read_file(f)
+        return f.read_text()
+
+    outer = lambda: engine.run("inner", "", inner).upper()  # noqa: E731
+    assert engine.run("outer", "", outer) == "ONE"
+    f.write_text("two")
+    assert engine.run("outer", "", outer) == "TWO"
+
+
+def test_errors_are_not_memoized(tmp_path):
+    engine = QueryEngine()
+    attempts = []
+
+    def flaky():
+        attempts.append(1)
+        memo.volatile()
+        return "partial"
+
+    engine.run("q", "", flaky)
+    engine.run("q", "", flaky)
+    assert len(attempts) == 2
+
+
+def test_tools_reuse_results_until_inputs_change(project):
+    root, calls = project
+    first = mcp_server.get_project_map(str(root))
+    assert mcp_server.get_project_map(str(root)) == first
+    mcp_server.find_types(str(root), kind="enum")
+    mcp_server.find_types(str(root), kind="enum")
+    stats = json.loads(mcp_server.get_server_stats())
+    assert stats["queries"]["get_project_map"]["hits"] == 1
+    assert stats["queries"]["find_types"]["hits"] == 1
+
+    # A new file changes the listing; an edit changes a recorded file.
+    (root / "B.swift").write_text(SOURCE)
+    assert "B.swift" in json.loads(mcp_server.get_project_map(str(root)))
+    path = root / "A.swift"
+    path.write_text(SOURCE.replace("class MovieViewModel", "class MovieViewModel "))
+    st = path.stat()
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000))
+    mcp_server.get_file_outline(str(path))
+    mcp_server.get_file_outline(str(path), format="min")  # different arguments, separate entry
+    stats = json.loads(mcp_server.get_server_stats())
+    assert stats["queries"]["get_project_map"]["invalidated"] == 1
+    assert stats["queries"]["get_file_outline"]["misses"] == 2
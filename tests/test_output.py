@@ -0,0 +1,82 @@
+"""Tests for the selectable tool output encodings."""
+
+import json
+
+import pytest
+
+from swift_project_assistant import cache, files, mcp_server
+from swift_project_assistant.analyzer import analyze_structure, outline_to_dict
+from swift_project_assistant.output import compact_declaration_matches, compact_outline, dump
+from tests.test_analyzer import SOURCE, SOURCE_BYTES, STRUCTURE
+
+
+@pytest.fixture
+def project(tmp_path, monkeypatch):
+    monkeypatch.setattr(cache, "run_sourcekitten", lambda p: STRUCTURE)
+    files.clear_cache()
+    mcp_server._projects.clear()
+    (tmp_path / "Movies.swift").write_text(SOURCE)
+    return tmp_path
+
+
+def test_dump_formats():
+    data = {"a": [1, 2], "b": "ü"}
+    assert json.loads(dump(data)) == data
+    assert dump(data, "min") == '{"a":[1,2],"b":"ü"}'
+    assert dump({"error": "boom"}, "compact", lambda d: "unused") == "error: boom"
+    with pytest.raises(ValueError, match="format must be one of"):
+        dump(data, "yaml")
+
+
+def test_compact_outline():
+    text = compact_outline(outline_to_dict(analyze_structure(SOURCE_BYTES, STRUCTURE)))
+    assert text == "\n".join([
+        "import Foundation, SwiftUI",
+        "class MovieViewModel: ObservableObject  // L4",
+        "  movies: [Movie]",
+        "  service: MovieService",
+        "  init(service: MovieService)",
+        "  func fetchMovies(for category: Category) -> [Movie]",
+        "  enum Category: String  // L16",
+        "    case nowPlaying",
+        "    case upcoming",
+        "func makeDefaultViewModel() -> MovieViewModel",
+    ])
+
+
+def test_compact_keeps_multi_line_signatures_on_one_line():
+    signature = "func load(\n    completion: @escaping (\n        Result<[Movie], Error>\n    ) -> Void\n)"
+    joined = "func load( completion: @escaping ( Result<[Movie], Error> ) -> Void )"
+    outline = {"types": [{"kind": "class", "name": "Store", "line": 1, "members": [signature]}],
+               "functions": [signature], "globals": []}
+    assert compact_outline(outline).splitlines() == ["class Store  // L1", "  " + joined, joined]
+    result = {"pattern": "load", "match_count": 1,
+              "matches": [{"file": "Store.swift", "line": 3, "declaration": signature}]}
+    assert compact_declaration_matches(result).splitlines()[-1] == f"  {joined}  // L3"
+
+
+def test_tools_compact_and_minified(project):
+    root = str(project)
+    assert mcp_server.get_project_map(root, format="compact") == "\n".join([
+        "Movies.swift",
+        "  class MovieViewModel: ObservableObject",
+        "  enum MovieViewModel.Category: String",
+        "  func makeDefaultViewModel",
+    ])
+    assert mcp_server.find_types(root, kind="enum", format="compact") == "\n".join([
+        "// kind=enum: 1 match",
+        "Movies.swift:16 enum MovieViewModel.Category: String",
+    ])
+    assert mcp_server.search_declarations(root, r"-> \[Movie\]|^enum", format="compact") == "\n".join([
+        "// /-> \\[Movie\\]|^enum/: 2 matches",
+        "Movies.swift",
+        "  func fetchMovies(for category: Category) -> [Movie]  // in MovieViewModel",
+        "  enum MovieViewModel.Category: String  // L16",
+    ])
+    interface = mcp_server.get_public_interface(str(project / "Movies.swift"), format="compact")
+    assert interface.startswith("// min_access: internal\nimport Foundation, SwiftUI\n")
+
+    minified = mcp_server.get_file_outline(str(project / "Movies.swift"), format="min")
+    assert "\n" not in minified
+    assert json.loads(minified) == json.loads(mcp_server.get_file_outline(str(project / "Movies.swift")))
+    assert len(mcp_server.get_project_map(root, format="compact")) < len(mcp_server.get_project_map(root))
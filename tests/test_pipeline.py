@@ -0,0 +1,95 @@
+"""Tests for the streaming scan pipeline and the tools built on it."""
+
+import json
+import threading
+import time
+
+import pytest
+
+from swift_project_assistant import cache, files, mcp_server, memo
+from swift_project_assistant.pipeline import configured_workers, stream
+from tests.test_analyzer import SOURCE, STRUCTURE
+
+
+def test_stream_keeps_order_and_reports_errors():
+    def work(n):
+        time.sleep(0.002 * (5 - n % 5))  # finish out of order
+        if n == 3:
+            raise OSError("unreadable")
+        return n * n
+
+    out = list(stream(work, range(8), workers=4))
+    assert [item for item, _, _ in out] == list(range(8))
+    assert out[2] == (2, 4, None)
+    assert out[3][1] is None and isinstance(out[3][2], OSError)
+
+    with pytest.raises(KeyError):
+        list(stream(lambda n: {}[n], [1], errors=(OSError,)))
+
+
+def test_stream_bounds_work_in_flight_and_cancels_on_close():
+    started = []
+    lock = threading.Lock()
+
+    def work(n):
+        with lock:
+            started.append(n)
+        time.sleep(0.01)
+        return n
+
+    results = stream(work, range(1000), workers=2, window=4)
+    assert next(results)[0] == 0
+    results.close()
+    time.sleep(0.05)
+    assert len(started) <= 6  # the window, plus at most one task per worker already picked up
+
+
+def test_stream_runs_in_callers_context(tmp_path):
+    paths = [tmp_path / f"{i}.swift" for i in range(3)]
+    for p in paths:
+        p.write_text("")
+    engine = memo.QueryEngine()
+    engine.run("q", "", lambda: list(stream(memo.read_file, paths)))
+    assert set(engine._entries[("q", "")].inputs.files) == set(paths)
+
+
+def test_configured_workers(monkeypatch):
+    monkeypatch.setenv("SWIFT_ASSISTANT_WORKERS", "3")
+    assert configured_workers() == 3
+    monkeypatch.setenv("SWIFT_ASSISTANT_WORKERS", "many")
+    with pytest.raises(ValueError):
+        configured_workers()
+    monkeypatch.delenv("SWIFT_ASSISTANT_WORKERS")
+    assert 1 <= configured_workers() <= 8
+
+
+@pytest.fixture
+def project(tmp_path, monkeypatch):
+    """Ten files, analyzed by a counting fake SourceKitten."""
+    calls = []
+    monkeypatch.setattr(cache, "run_sourcekitten", lambda p: calls.append(p) or STRUCTURE)
+    monkeypatch.setenv("SWIFT_ASSISTANT_WORKERS", "1")
+    files.clear_cache()
+    for i in range(10):
+        (tmp_path / f"F{i}.swift").write_text(SOURCE + f"\n// {i}\n")
+    return tmp_path, calls
+
+
+def test_limited_tools_stop_scanning_early(project):
+    root, calls = project
+    found = json.loads(mcp_server.find_symbol(str(root), "MovieViewModel", limit=1))
+    assert [m["file"] for m in found["matches"]] == ["F0.swift"]
+    assert "truncated" in found
+    assert len(calls) <= 3  # the first file plus the read-ahead window
+
+    types = json.loads(mcp_server.find_types(str(root), kind="enum", limit=2))
+    assert [m["file"] for m in types["matches"]] == ["F0.swift", "F1.swift"]
+
+
+def test_scan_tools_cover_every_file(project):
+    root, calls = project
+    assert len(json.loads(mcp_server.get_project_map(str(root)))) == 10
+    assert len(json.loads(mcp_server.find_symbol(str(root), "fetchMovies"))["matches"]) == 10
+    bundle = mcp_server.get_context_bundle(str(root), "MovieViewModel.fetchMovies")
+    assert "// (also declared in: F1.swift" in bundle
+    assert len(calls) == 10
@@ -0,0 +1,109 @@
+"""Tests for speculative prefetching of a served file's neighbors."""
+
+import json
+import os
+import time
+
+import pytest
+
+from swift_project_assistant import cache, files, mcp_server, summary
+from swift_project_assistant.prefetch import Prefetcher, configured_budget
+from tests.test_analyzer import SOURCE, STRUCTURE
+from tests.test_rollup import decl
+
+
+def uses(type_name):
+    return {"key.kind": "source.lang.swift.decl.var.instance", "key.name": "value", "key.typename": type_name}
+
+
+STRUCTURES = {
+    "Model.swift": STRUCTURE,  # MovieViewModel, which references MovieService
+    "Service.swift": {"key.substructure": [decl("protocol", "MovieService")]},
+    "Screen.swift": {"key.substructure": [{**decl("struct", "Screen"), "key.substructure": [uses("MovieViewModel")]}]},
+    "Other.swift": {"key.substructure": [decl("struct", "Other")]},
+}
+
+
+@pytest.fixture
+def project(tmp_path, monkeypatch):
+    """An indexed four-file project whose neighbors of Model.swift have since been edited."""
+    calls = []
+    def run(path):
+        calls.append(os.path.basename(path))
+        return STRUCTURES[os.path.basename(path)]
+
+    monkeypatch.setattr(cache, "run_sourcekitten", run)
+    monkeypatch.setattr(summary, "run_sourcekitten", run)
+    monkeypatch.setenv("SWIFT_ASSISTANT_PREFETCH", "8")
+    monkeypatch.setattr(mcp_server, "_prefetcher", Prefetcher(mcp_server._neighbors))
+    files.clear_cache()
+    mcp_server._projects.clear()
+    root = tmp_path / "App"
+    root.mkdir()
+    (root / "Model.swift").write_text(SOURCE)
+    for name in ("Service.swift", "Screen.swift", "Other.swift"):
+        (root / name).write_text(f"// {name}\n")
+    mcp_server._project_index(str(root))
+    for name in ("Service.swift", "Screen.swift", "Other.swift"):
+        (root / name).write_text(f"// {name}, edited\n")
+    calls.clear()
+    return root, calls
+
+
+def test_outline_prefetches_dependency_neighbors(project):
+    root, calls = project
+    mcp_server.get_file_outline(str(root / "Model.swift"))
+    assert mcp_server._prefetcher.wait_idle(5)
+    assert sorted(calls) == ["Screen.swift", "Service.swift"]  # referenced, then referencing; not Other
+
+    mcp_server.get_file_outline(str(root / "Service.swift"))
+    assert sorted(calls) == ["Screen.swift", "Service.swift"]  # served from the prefetched analysis
+    assert mcp_server._prefetcher.wait_idle(5)
+    stats = json.loads(mcp_server.get_server_stats())["prefetch"]
+    assert (stats["warmed"], stats["analyzed"], stats["hits"], stats["hit_rate"]) == (2, 2, 1, 0.5)
+    assert stats["triggers"] == 2
+
+
+def test_memoized_answers_still_count_as_requests(project, monkeypatch):
+    root, _ = project
+    served, requested = [], []
+    monkeypatch.setattr(mcp_server._prefetcher, "after_serving", served.append)
+    monkeypatch.setattr(mcp_server._access_logs, "record_file", requested.append)
+    path = root / "Model.swift"
+    for _ in range(2):
+        mcp_server.get_file_outline(str(path))
+        mcp_server.get_public_interface(str(path))
+    assert served == [path] * 2  # the second outline is a memo hit
+    assert requested == [path] * 4
+
+
+def test_budget_and_stale_standalone_summaries(project, monkeypatch):
+    root, calls = project
+    monkeypatch.setenv("SUMMARY_STORAGE", "standalone")
+    sidecar = root / "Screen.md"
+    sidecar.write_text("old summary")
+    past = time.time() - 60
+    os.utime(sidecar, (past, past))
+
+    mcp_server.get_file_summary(str(root / "Model.swift"))
+    assert mcp_server._prefetcher.wait_idle(5)
+    assert "# Screen.swift" in sidecar.read_text()
+    assert not (root / "Service.md").exists()  # no summary to refresh: none is created
+    assert json.loads(mcp_server.get_server_stats())["prefetch"]["summaries"] == 1
+
+    monkeypatch.setenv("SWIFT_ASSISTANT_PREFETCH", "1")
+    (root / "Service.swift").write_text("// edited again\n")
+    (root / "Screen.swift").write_text("// edited again\n")
+    calls.clear()
+    mcp_server.get_file_summary(str(root / "Model.swift"), refresh=True)
+    assert mcp_server._prefetcher.wait_idle(5)
+    assert calls.count("Screen.swift") + calls.count("Service.swift") == 1
+
+
+def test_prefetch_setting(monkeypatch):
+    assert configured_budget() is None  # off in tests, see conftest
+    monkeypatch.setenv("SWIFT_ASSISTANT_PREFETCH", "3")
+    assert configured_budget() == 3
+    monkeypatch.setenv("SWIFT_ASSISTANT_PREFETCH", "some")
+    with pytest.raises(ValueError):
+        configured_budget()
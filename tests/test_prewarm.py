@@ -0,0 +1,56 @@
+"""Tests for background pre-warming of configured projects."""
+
+import json
+
+from swift_project_assistant import analyzer, cache, files, mcp_server
+from swift_project_assistant.prewarm import configured_project_paths
+from swift_project_assistant.scheduler import Priority, Scheduler, priority
+from tests.test_analyzer import SOURCE, STRUCTURE
+
+
+def test_configured_project_paths(monkeypatch):
+    monkeypatch.setenv("SWIFT_PROJECT_PATHS", "/a/App: /b/Kit ::")
+    assert configured_project_paths() == ["/a/App", "/b/Kit"]
+    monkeypatch.delenv("SWIFT_PROJECT_PATHS")
+    assert configured_project_paths() == []
+
+
+def test_background_runs_start_niced(monkeypatch):
+    monkeypatch.setattr(analyzer.shutil, "which", lambda name: f"/usr/bin/{name}")
+    plain = ["sourcekitten", "structure", "--file", "A.swift"]
+    assert analyzer._command("A.swift") == plain
+    with priority(Priority.BACKGROUND):
+        assert analyzer._command("A.swift") == ["nice", "-n", str(analyzer.BACKGROUND_NICENESS), *plain]
+        # A queued background run boosted by a tool call is started at full priority.
+        sched = Scheduler(limit=2, load=lambda: None)
+        ticket = sched.ticket()
+        ticket.boost(Priority.INTERACTIVE)
+        with sched.slot(ticket):
+            assert analyzer._command("A.swift") == plain
+    monkeypatch.setattr(analyzer.shutil, "which", lambda name: None if name == "nice" else f"/usr/bin/{name}")
+    with priority(Priority.BACKGROUND):
+        assert analyzer._command("A.swift") == plain
+
+
+def test_prewarm_fills_caches_and_reports_progress(tmp_path, monkeypatch):
+    calls = []
+    monkeypatch.setattr(cache, "run_sourcekitten", lambda p: calls.append(p) or STRUCTURE)
+    monkeypatch.setattr(mcp_server, "_prewarmer", None)
+    files.clear_cache()
+    mcp_server._projects.clear()
+    for i in range(3):
+        (tmp_path / f"F{i}.swift").write_text(SOURCE + f"\n// {i}\n")
+
+    warmer = mcp_server.start_prewarm([str(tmp_path), str(tmp_path / "missing")])
+    warmer.join(timeout=10)
+    assert len(calls) == 3
+
+    stats = json.loads(mcp_server.get_server_stats())["prewarm"]
+    assert stats[0]["state"] == "done"
+    assert (stats[0]["files"], stats[0]["analyzed"]) == (3, 3)
+    assert stats[1]["state"] == "failed"
+
+    # Tool calls are served from the warmed caches.
+    mcp_server.get_project_map(str(tmp_path))
+    mcp_server.search_symbols(str(tmp_path), "MovieVM")
+    assert len(calls) == 3
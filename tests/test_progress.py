@@ -0,0 +1,197 @@
+"""Tests for progress notifications and client cancellation of long-running tools."""
+
+import os
+import stat
+import threading
+import time
+
+import anyio
+import pytest
+from mcp import types
+from mcp.shared.exceptions import McpError
+from mcp.shared.memory import create_connected_server_and_client_session
+
+from swift_project_assistant import analyzer, cache, files, mcp_server, scheduler
+from swift_project_assistant.pipeline import stream
+from swift_project_assistant.progress import CallControl, Cancelled, on_cancel, report_progress
+from swift_project_assistant.scheduler import Priority, Scheduler
+from tests.test_analyzer import SOURCE, STRUCTURE
+from tests.test_quarantine import alive
+
+
+def in_thread(call, fn, *args):
+    """Run fn under `call` on a thread; returns the thread and a list that receives its outcome."""
+    outcome = []
+
+    def run():
+        try:
+            outcome.append(call.run(fn, *args))
+        except BaseException as exc:  # noqa: BLE001 - the test inspects it
+            outcome.append(exc)
+
+    thread = threading.Thread(target=run)
+    thread.start()
+    return thread, outcome
+
+
+def test_cancel_runs_callbacks_and_stops_reporting():
+    reports = []
+    call = CallControl(lambda *args: reports.append(args))
+    cancelled = []
+
+    def work():
+        for done in range(1, 4):
+            report_progress(done, 3, "analyzing")
+        with on_cancel(lambda: cancelled.append("first")):
+            call.cancel()
+        with on_cancel(lambda: cancelled.append("late")):  # registered after the fact: runs at once
+            pass
+        report_progress(4, 4)
+
+    with pytest.raises(Cancelled):
+        call.run(work)
+    assert reports[0] == (1, 3, "analyzing") and reports[-1] == (3, 3, "analyzing")
+    assert len(reports) == 2  # throttled, but the last step of a phase always goes out
+    assert cancelled == ["first", "late"]
+    report_progress(1, 1)  # outside a controlled call: a no-op
+
+
+def test_cancelled_stream_stops_handing_out_work():
+    started = []
+
+    def slow(n):
+        started.append(n)
+        time.sleep(0.01)
+        return n
+
+    call = CallControl()
+
+    def consume():
+        for n, _, _ in stream(slow, range(200), workers=2):
+            if n == 3:
+                call.cancel()
+
+    with pytest.raises(Cancelled):
+        call.run(consume)
+    time.sleep(0.05)
+    assert len(started) < 20
+
+
+@pytest.mark.skipif(os.name != "posix", reason="uses a shell script as a fake sourcekitten")
+def test_cancellation_kills_a_running_sourcekitten(tmp_path, monkeypatch):
+    pid_file = hung_sourcekitten(tmp_path, monkeypatch)
+    call = CallControl()
+    thread, outcome = in_thread(call, analyzer.run_sourcekitten, str(tmp_path / "Huge.swift"))
+    wait_until(lambda: analyzer._live and pid_file.exists())
+    started = time.monotonic()
+    call.cancel()
+    thread.join(5)
+    assert time.monotonic() - started < 2
+    assert isinstance(outcome[0], Cancelled)
+    assert not analyzer._live
+    time.sleep(0.1)
+    assert not alive(int(pid_file.read_text()))
+
+
+def test_cancellation_releases_a_queued_slot():
+    sched = Scheduler(limit=1, load=lambda: None)
+    call = CallControl()
+    with sched.slot():
+        ticket = sched.ticket(Priority.BACKGROUND)
+
+        def take_slot():
+            with sched.slot(ticket):
+                pass
+
+        thread, outcome = in_thread(call, take_slot)
+        wait_until(lambda: ticket.queued)
+        call.cancel()
+        thread.join(2)
+        assert isinstance(outcome[0], Cancelled)
+        assert sched.stats()["background"]["queued"] == 0
+    with sched.slot():  # the abandoned ticket never took the freed slot
+        assert sched.stats()["background"]["completed"] == 0
+
+
+def test_cancellation_after_grant_gives_the_slot_back():
+    sched = Scheduler(limit=2, load=lambda: None)
+    for _ in range(2):
+        call = CallControl()
+        call.cancel()  # cancelled before asking: the slot is granted at once, then the wait sees the cancel
+        with pytest.raises(Cancelled):
+            call.run(lambda: sched.slot().__enter__())
+    stats = sched.stats()["interactive"]
+    assert (stats["running"], stats["queued"]) == (0, 0)
+    with sched.slot(), sched.slot():  # both slots are free again
+        pass
+
+
+def test_tools_report_progress_to_the_client(tmp_path, monkeypatch):
+    monkeypatch.setattr(cache, "run_sourcekitten", lambda p: STRUCTURE)
+    files.clear_cache()
+    for i in range(5):
+        (tmp_path / f"F{i}.swift").write_text(SOURCE + f"\n// {i}\n")
+    reports = []
+
+    async def main():
+        async with create_connected_server_and_client_session(mcp_server.mcp) as client:
+            async def progress(done, total, message):
+                reports.append((done, total, message))
+
+            result = await client.call_tool("get_project_map", {"project_path": str(tmp_path)},
+                                            progress_callback=progress)
+            assert not result.isError
+
+    anyio.run(main)
+    assert reports and reports[-1] == (5, 5, "analyzing")
+
+
+@pytest.mark.skipif(os.name != "posix", reason="uses a shell script as a fake sourcekitten")
+def test_client_cancellation_stops_the_tool(tmp_path, monkeypatch):
+    monkeypatch.setattr(scheduler, "_default", Scheduler(limit=2, load=lambda: None))
+    pid_file = hung_sourcekitten(tmp_path, monkeypatch)
+    files.clear_cache()
+    project = tmp_path / "App"
+    project.mkdir()
+    (project / "A.swift").write_text(SOURCE)
+
+    async def main():
+        async with create_connected_server_and_client_session(mcp_server.mcp) as client:
+            async def call():
+                with pytest.raises(McpError, match="cancelled"):
+                    await client.call_tool("find_types", {"project_path": str(project)})
+
+            async with anyio.create_task_group() as tasks:
+                tasks.start_soon(call)
+                with anyio.fail_after(5):
+                    while not (analyzer._live and pid_file.exists()):
+                        await anyio.sleep(0.01)
+                request_id = client._request_id - 1  # the tools/call request
+                await client.send_notification(types.ClientNotification(types.CancelledNotification(
+                    params=types.CancelledNotificationParams(requestId=request_id))))
+                with anyio.fail_after(2):
+                    while analyzer._live:
+                        await anyio.sleep(0.01)
+
+    anyio.run(main)
+    wait_until(lambda: scheduler._default.stats()["interactive"]["running"] == 0)
+    time.sleep(0.1)
+    assert not alive(int(pid_file.read_text()))
+
+
+def hung_sourcekitten(tmp_path, monkeypatch):
+    """Put a sourcekitten on PATH that hangs with a child process; returns the file receiving the child's pid."""
+    pid_file = tmp_path / "child.pid"
+    fake = tmp_path / "bin" / "sourcekitten"
+    fake.parent.mkdir()
+    fake.write_text(f"#!/bin/sh\nsleep 30 &\necho $! > {pid_file}\nwait\n")
+    fake.chmod(fake.stat().st_mode | stat.S_IEXEC)
+    monkeypatch.setenv("PATH", f"{fake.parent}{os.pathsep}{os.environ['PATH']}")
+    return pid_file
+
+
+def wait_until(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out waiting"
+        time.sleep(0.005)
@@ -0,0 +1,127 @@
+"""Tests for SourceKitten timeouts, the quarantine list and tool deadlines."""
+
+import json
+import os
+import stat
+import time
+
+import pytest
+
+from swift_project_assistant import analyzer, cache, files, mcp_server
+from swift_project_assistant.analyzer import SourceKittenTimeoutError, run_sourcekitten
+from swift_project_assistant.pipeline import DeadlineExceeded, stream
+from swift_project_assistant.quarantine import QuarantinedError, configured_threshold, default_quarantine
+from tests.test_analyzer import SOURCE, STRUCTURE
+
+
+@pytest.mark.skipif(os.name != "posix", reason="uses a shell script as a fake sourcekitten")
+def test_timeout_kills_the_process_group(tmp_path, monkeypatch):
+    pid_file = tmp_path / "child.pid"
+    fake = tmp_path / "bin" / "sourcekitten"
+    fake.parent.mkdir()
+    # A hung run that has also started a helper process (like SourceKitService).
+    fake.write_text(f"#!/bin/sh\nsleep 30 &\necho $! > {pid_file}\nwait\n")
+    fake.chmod(fake.stat().st_mode | stat.S_IEXEC)
+    monkeypatch.setenv("PATH", f"{fake.parent}{os.pathsep}{os.environ['PATH']}")
+
+    started = time.monotonic()
+    with pytest.raises(SourceKittenTimeoutError, match="timed out after 0.5s"):
+        run_sourcekitten(str(tmp_path / "Huge.swift"), timeout=0.5)
+    assert time.monotonic() - started < 5
+    assert not analyzer._live
+    child = int(pid_file.read_text())
+    time.sleep(0.1)
+    assert not alive(child)
+
+
+def alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    try:  # killed but not yet reaped by init counts as gone
+        return open(f"/proc/{pid}/stat").read().split(")")[-1].split()[0] != "Z"
+    except OSError:
+        return True
+
+
+def test_file_timeout_setting(monkeypatch):
+    monkeypatch.setenv("SWIFT_ASSISTANT_FILE_TIMEOUT", "off")
+    assert analyzer.configured_sourcekitten_timeout() is None
+    monkeypatch.setenv("SWIFT_ASSISTANT_FILE_TIMEOUT", "2.5")
+    assert analyzer.configured_sourcekitten_timeout() == 2.5
+    monkeypatch.delenv("SWIFT_ASSISTANT_FILE_TIMEOUT")
+    assert analyzer.configured_sourcekitten_timeout() == analyzer.DEFAULT_SOURCEKITTEN_TIMEOUT
+
+
+def test_repeated_timeouts_quarantine_the_content(tmp_path, monkeypatch):
+    calls = []
+
+    def hang(path):
+        calls.append(path)
+        raise SourceKittenTimeoutError(f"SourceKitten timed out after 1s for {path}")
+
+    monkeypatch.setattr(cache, "run_sourcekitten", hang)
+    path = tmp_path / "Localizable.swift"
+    path.write_text(SOURCE)
+
+    for _ in range(2):
+        with pytest.raises(SourceKittenTimeoutError):
+            cache.analyze_cached(path)
+    with pytest.raises(QuarantinedError):
+        cache.analyze_cached(path)
+    assert len(calls) == 2
+    assert default_quarantine().files() == [str(path)]
+    assert (tmp_path / "cache" / "quarantine.json").exists()
+
+    # A refresh retries once and, on success, releases the content.
+    monkeypatch.setattr(cache, "run_sourcekitten", lambda p: STRUCTURE)
+    cache.cached_structure(path, path.read_bytes(), refresh=True)
+    assert default_quarantine().files() == []
+
+    monkeypatch.setenv("SWIFT_ASSISTANT_QUARANTINE_AFTER", "off")
+    assert configured_threshold() is None
+
+
+def test_stream_deadline_returns_finished_work():
+    def work(n):
+        time.sleep(0.5 if n == 2 else 0)
+        return n
+
+    started = time.monotonic()
+    out = list(stream(work, range(8), workers=2, window=2, timeout=0.2))
+    assert time.monotonic() - started < 0.45
+    assert [(item, value) for item, value, _ in out[:2]] == [(0, 0), (1, 1)]
+    assert isinstance(out[2][2], DeadlineExceeded)  # out[3] may have finished in time
+    assert all(isinstance(error, DeadlineExceeded) for _, _, error in out[4:])
+
+
+def test_tools_report_timeouts_and_partial_results(tmp_path, monkeypatch):
+    def run(path):
+        if path.endswith("Generated.swift"):
+            raise SourceKittenTimeoutError(f"SourceKitten timed out after 1s for {path}")
+        return STRUCTURE
+
+    monkeypatch.setattr(cache, "run_sourcekitten", run)
+    monkeypatch.setenv("SWIFT_ASSISTANT_QUARANTINE_AFTER", "off")
+    files.clear_cache()
+    (tmp_path / "A.swift").write_text(SOURCE)
+    (tmp_path / "Generated.swift").write_text("// huge\n")
+
+    found = json.loads(mcp_server.find_types(str(tmp_path), kind="enum"))
+    assert [m["file"] for m in found["matches"]] == ["A.swift"]
+    assert found["timed_out"] == ["Generated.swift"]
+    assert "// timed out: Generated.swift" in mcp_server.find_types(str(tmp_path), kind="enum", format="compact")
+
+    project = json.loads(mcp_server.get_project_map(str(tmp_path)))
+    assert "timed out" in project["Generated.swift"]["error"]
+
+    bundle = mcp_server.get_context_bundle(str(tmp_path), "MovieViewModel")
+    assert "// not analyzed (SourceKitten timed out): Generated.swift" in bundle
+
+    monkeypatch.setattr(mcp_server, "configured_deadline", lambda: 0)
+    monkeypatch.setattr(cache, "run_sourcekitten", lambda p: time.sleep(0.2) or STRUCTURE)
+    (tmp_path / "A.swift").write_text(SOURCE + "\n// changed\n")
+    found = json.loads(mcp_server.find_symbol(str(tmp_path), "MovieViewModel"))
+    assert found["matches"] == []
+    assert "not analyzed: the 0s deadline passed" in found["incomplete"]
@@ -0,0 +1,120 @@
+"""Tests for byte-range and line-range source reads."""
+
+import os
+import threading
+import time
+
+import pytest
+
+from swift_project_assistant import cache, files, mcp_server, ranges
+from swift_project_assistant.analyzer import analyze_structure, find_symbol_source
+from swift_project_assistant.index import file_declarations, find_declaration
+from tests.test_analyzer import SOURCE, SOURCE_BYTES, STRUCTURE
+
+
+@pytest.fixture
+def project(tmp_path, monkeypatch):
+    """A two-file project with settled mtimes, analyzed by a counting fake SourceKitten."""
+    calls = []
+    monkeypatch.setattr(cache, "run_sourcekitten", lambda p: calls.append(p) or STRUCTURE)
+    files.clear_cache()
+    ranges.clear_cache()
+    mcp_server._projects.clear()
+    mcp_server._recent_declarations.clear()
+    root = tmp_path / "App"
+    (root / "Views").mkdir(parents=True)
+    past = time.time() - 60
+    for rel in ("A.swift", "Views/B.swift"):
+        (root / rel).write_text(SOURCE)
+        os.utime(root / rel, (past, past))
+    return root, calls
+
+
+@pytest.mark.parametrize("symbol", [
+    "MovieViewModel", "MovieViewModel.fetchMovies", "fetchMovies(for:)", "Category", "MovieViewModel.nowPlaying",
+    "makeDefaultViewModel", "movies", "MovieViewModel.missing", "Missing",
+])
+def test_find_declaration_matches_find_symbol_source(symbol):
+    analysis = analyze_structure(SOURCE_BYTES, STRUCTURE)
+    d = find_declaration(file_declarations(analysis), symbol)
+    expected = find_symbol_source(analysis, symbol)
+    assert (analysis.slice(d.offset, d.length) if d else None) == expected
+
+
+def test_read_range_checks_stat(tmp_path):
+    path = tmp_path / "A.swift"
+    path.write_bytes(SOURCE_BYTES)
+    st = path.stat()
+    stat = (st.st_mtime_ns, st.st_size)
+    assert ranges.read_range(path, 7, 7, stat) == SOURCE_BYTES[7:14]
+    assert ranges.read_range(path, 7, 7, (stat[0] + 1, stat[1])) is None
+    assert ranges.read_range(path, st.st_size - 1, 10, stat) is None
+
+
+def test_read_lines_scans_only_as_far_as_needed(tmp_path):
+    path = tmp_path / "Generated.swift"
+    path.write_text("".join(f"let v{i} = {i}\n" for i in range(1, 10_001)))
+    text, last, total = ranges.read_lines(path, 10, 12)
+    assert text == "let v10 = 10\nlet v11 = 11\nlet v12 = 12"
+    assert (last, total) == (12, None)
+    assert len(ranges._tables[path].starts) == 13
+
+    text, last, total = ranges.read_lines(path, 9_999, 20_000)
+    assert text == "let v9999 = 9999\nlet v10000 = 10000"
+    assert (last, total) == (10_000, 10_000)
+    assert ranges.read_lines(path, 10_001, 10_002) == ("", 0, 10_000)
+
+    path.write_text("only\nthree\nlines")  # a new stat discards the table
+    assert ranges.read_lines(path, 3, 3) == ("lines", 3, 3)
+
+
+def test_read_lines_scans_files_independently(tmp_path):
+    a, b = tmp_path / "A.swift", tmp_path / "B.swift"
+    a.write_text("a\n" * 100)
+    b.write_text("b\n" * 100)
+    ranges.read_lines(a, 1, 1)
+    with ranges._tables[a].lock:  # a scan of A in progress
+        reader = threading.Thread(target=ranges.read_lines, args=(b, 50, 50))
+        reader.start()
+        reader.join(5)
+        assert not reader.is_alive()
+    assert ranges.read_lines(a, 60, 61) == ("a\na", 61, None)
+
+
+def test_get_source_range_tool(project):
+    root, _ = project
+    path = str(root / "A.swift")
+    assert mcp_server.get_source_range(path, 1, 2) == f"// {path}:1-2\n" + "\n".join(SOURCE.splitlines()[:2])
+    assert "has only" in mcp_server.get_source_range(path, 1000, 1001)
+    with pytest.raises(ValueError):
+        mcp_server.get_source_range(path, 5, 4)
+
+
+def test_symbol_source_reads_by_range_after_first_analysis(project, monkeypatch):
+    root, calls = project
+    path = str(root / "A.swift")
+    expected = find_symbol_source(analyze_structure(SOURCE_BYTES, STRUCTURE), "MovieViewModel.fetchMovies")
+    assert mcp_server.get_symbol_source(path, "MovieViewModel.fetchMovies") == expected
+
+    analyzed = []
+    real = mcp_server._analyze_recorded
+    monkeypatch.setattr(mcp_server, "_analyze_recorded", lambda p, key=None: analyzed.append(p) or real(p, key))
+    assert mcp_server.get_symbol_source(path, "MovieViewModel.fetchMovies") == expected
+    assert analyzed == []
+
+    # An edit invalidates the recorded ranges; the file is analyzed again.
+    (root / "A.swift").write_text(SOURCE + "\n")
+    assert mcp_server.get_symbol_source(path, "MovieViewModel.fetchMovies") == expected
+    assert analyzed == [root / "A.swift"]
+
+
+def test_get_implementation_reads_ranges_from_index(project, monkeypatch):
+    root, _ = project
+    expected = find_symbol_source(analyze_structure(SOURCE_BYTES, STRUCTURE), "Category")
+    out = mcp_server.get_implementation(str(root), "Category")
+    assert out == f"// A.swift\n{expected}\n\n// Views/B.swift\n{expected}"
+
+    monkeypatch.setattr(mcp_server, "_analyze_recorded", lambda *a: pytest.fail("re-analyzed"))
+    assert mcp_server.get_implementation(str(root), "Category") == out
+    # get_symbol_source also uses the loaded project index.
+    assert mcp_server.get_symbol_source(str(root / "A.swift"), "Category") == expected
@@ -0,0 +1,105 @@
+"""Tests for changed_files_context's declaration-level diff against a git ref."""
+
+import json
+import re
+from pathlib import Path
+
+import pytest
+
+from swift_project_assistant import cache, files, mcp_server
+from tests.test_cache import git
+
+HELPERS = "".join(f"    func helper{i}() -> Int {{ return {i} }}\n" for i in range(200))
+
+REF = f"""struct Store {{
+    func load() -> Int {{ return 1 }}
+    func save() {{ write(1) }}
+    func reset() {{ clear() }}
+{HELPERS}}}
+"""
+
+WORKING = f"""// Shifts every line down; moved declarations don't count as changes.
+struct Store {{
+    func load() -> Int {{ return 2 }}
+    func save() -> Bool {{ write(1) }}
+    func flush() {{ }}
+{HELPERS}}}
+"""
+
+
+def toy_sourcekitten(path):
+    """Enough of `sourcekitten structure` for single-line methods in top-level structs."""
+    source = Path(path).read_bytes()
+    types = []
+    for t in re.finditer(rb"^struct (\w+) \{\n.*?^\}\n", source, re.M | re.S):
+        members = []
+        for f in re.finditer(rb"    func (\w+)\(\)(?: -> (\w+))? \{[^\n]*\}", t.group(0)):
+            member = {"key.kind": "source.lang.swift.decl.function.method.instance",
+                      "key.name": f.group(1).decode() + "()", "key.offset": t.start() + f.start(),
+                      "key.length": len(f.group(0))}
+            if f.group(2):
+                member["key.typename"] = f.group(2).decode()
+            members.append(member)
+        types.append({"key.kind": "source.lang.swift.decl.struct", "key.name": t.group(1).decode(),
+                      "key.offset": t.start(), "key.length": len(t.group(0)), "key.substructure": members})
+    return {"key.substructure": types}
+
+
+@pytest.fixture
+def repo(tmp_path, monkeypatch):
+    runs = []
+    monkeypatch.setattr(cache, "run_sourcekitten", lambda p: runs.append(p) or toy_sourcekitten(p))
+    files.clear_cache()
+    mcp_server._projects.clear()
+    root = tmp_path / "repo"
+    root.mkdir()
+    (root / "Store.swift").write_text(REF)
+    (root / "Gone.swift").write_text(REF)
+    git(root, "init", "-q")
+    git(root, "add", ".")
+    git(root, "commit", "-q", "-m", "init")
+    (root / "Store.swift").write_text(WORKING)
+    (root / "Gone.swift").unlink()
+    (root / "New.swift").write_text("struct New {\n    func make() { }\n}\n")
+    git(root, "add", "New.swift")
+    return root, runs
+
+
+def test_diff_lists_only_changed_declarations(repo):
+    root, runs = repo
+    result = json.loads(mcp_server.changed_files_context(str(root), diff=True))
+    assert result["deleted"] == ["Gone.swift"]
+    store = result["changed"]["Store.swift"]
+    assert store["added"] == [{"name": "Store.flush", "kind": "method", "line": 5, "declaration": "func flush()"}]
+    assert store["removed"] == [{"name": "Store.reset", "kind": "method", "line": 4, "declaration": "func reset()"}]
+    assert store["modified"] == [
+        {"name": "Store.load", "kind": "method", "line": 3, "declaration": "func load() -> Int", "ref_line": 2,
+         "change": "body"},
+        {"name": "Store.save", "kind": "method", "line": 4, "declaration": "func save() -> Bool", "ref_line": 3,
+         "was": "func save()"},
+    ]
+    assert [d["name"] for d in result["changed"]["New.swift"]["added"]] == ["New", "New.make"]
+
+    # One file with four changed methods among 200: a tenth of its outline, or less.
+    outline = json.loads(mcp_server.changed_files_context(str(root)))["changed"]["Store.swift"]
+    assert len(json.dumps(store)) * 10 < len(json.dumps(outline))
+
+
+def test_ref_side_is_analyzed_once(repo):
+    root, runs = repo
+    mcp_server.changed_files_context(str(root), diff=True)
+    ref_runs = [p for p in runs if not p.startswith(str(root))]
+    assert len(ref_runs) == 1  # Store.swift at HEAD, from a temporary file
+    runs.clear()
+    mcp_server.changed_files_context(str(root), diff=True)
+    assert runs == []
+
+
+def test_unchanged_declarations_and_errors(repo):
+    root, _ = repo
+    (root / "Store.swift").write_text(REF + "// a trailing comment\n")
+    result = json.loads(mcp_server.changed_files_context(str(root), diff=True))
+    assert result["unchanged"] == ["Store.swift"] and "Store.swift" not in result["changed"]
+
+    assert "error" in json.loads(mcp_server.changed_files_context(str(root), diff=True, interface_only=True))
+    assert "error" in json.loads(mcp_server.changed_files_context(str(root), git_ref="nope", diff=True))
@@ -0,0 +1,108 @@
+"""Tests for get_project_map's directory rollups."""
+
+import json
+
+import pytest
+
+from swift_project_assistant import cache, files, mcp_server
+from swift_project_assistant.output import approx_tokens
+from tests.test_analyzer import SOURCE, STRUCTURE
+
+
+def decl(kind, name, *inherits, access="internal"):
+    return {"key.kind": f"source.lang.swift.decl.{kind}", "key.name": name, "key.offset": 0, "key.length": 1,
+            "key.accessibility": f"source.lang.swift.accessibility.{access}",
+            "key.inheritedtypes": [{"key.name": i} for i in inherits]}
+
+
+STRUCTURES = {
+    "MovieService.swift": [decl("protocol", "MovieService", access="public")],
+    "LiveMovieService.swift": [decl("class", "LiveMovieService", "MovieService", access="public"),
+                               decl("struct", "Helper")],
+    "MovieList.swift": [decl("struct", "MovieList", "View", access="public"),
+                        decl("extension", "MovieList", "MovieService"),
+                        decl("function.free", "makeList()")],
+    "Row.swift": [decl("struct", "Row", "View")],
+}
+
+
+@pytest.fixture
+def project(tmp_path, monkeypatch):
+    monkeypatch.setattr(cache, "run_sourcekitten", lambda p: {"key.substructure": STRUCTURES[p.rsplit("/", 1)[-1]]})
+    files.clear_cache()
+    mcp_server._projects.clear()
+    root = tmp_path / "App"
+    for i, rel in enumerate(["Services/MovieService.swift", "Services/Live/LiveMovieService.swift",
+                             "Views/MovieList.swift", "Views/Rows/Row.swift"]):
+        (root / rel).parent.mkdir(parents=True, exist_ok=True)
+        (root / rel).write_text(f"// {i}\n")  # distinct contents, so distinct cache entries
+    return root
+
+
+def test_rollup_by_directory(project):
+    top = json.loads(mcp_server.get_project_map(str(project), depth=1))
+    assert top["path"] == "." and top["files"] == 4
+    assert top["types"] == {"struct": 3, "protocol": 1, "class": 1, "extension": 1}
+    assert top["protocols"] == {"MovieService": 2}
+    assert top["conforms_to"] == {"MovieService": 2, "View": 2}
+    assert top["public"] == ["LiveMovieService", "MovieList", "MovieService"]
+    services, views = top["dirs"]
+    assert (services["path"], services["files"], services["subdirs"]) == ("Services", 2, 1)
+    assert views["functions"] == 1 and "dirs" not in views
+
+    # Drilling into one directory, fully expanded.
+    views = json.loads(mcp_server.get_project_map(str(project), path="Views", depth=5))
+    assert views["path"] == "Views"
+    assert [d["path"] for d in views["dirs"]] == ["Views/Rows"]
+    assert views["dirs"][0]["conforms_to"] == {"View": 1}
+    assert "protocols" not in views
+
+    text = mcp_server.get_project_map(str(project), path=str(project / "Services"), depth=1, format="compact")
+    assert text.splitlines()[:2] == ["Services/  2 files  class 1, protocol 1, struct 1",
+                                     "  protocols: MovieService (2)"]
+    assert "  Services/Live/  1 file  class 1, struct 1" in text
+
+    assert "error" in json.loads(mcp_server.get_project_map(str(project), path="Missing"))
+    with pytest.raises(ValueError, match="inside the project"):
+        mcp_server.get_project_map(str(project), path="/elsewhere")
+
+
+def test_rollup_follows_edits(project, monkeypatch):
+    assert json.loads(mcp_server.get_project_map(str(project), depth=0))["types"]["struct"] == 3
+    monkeypatch.setitem(STRUCTURES, "Row.swift", [decl("enum", "Row")])
+    (project / "Views" / "Rows" / "Row.swift").write_text("// edited\n")
+    rows = json.loads(mcp_server.get_project_map(str(project), path="Views/Rows", depth=0))
+    assert rows["types"] == {"enum": 1}
+    assert json.loads(mcp_server.get_project_map(str(project), depth=0))["conforms_to"] == {"MovieService": 2, "View": 1}
+
+
+def test_path_filters_the_per_file_map(project):
+    views = json.loads(mcp_server.get_project_map(str(project), path="Views"))
+    assert views == {
+        "Views/MovieList.swift": {"types": [{"kind": "struct", "name": "MovieList", "inherits": ["View"]},
+                                            {"kind": "extension", "name": "MovieList", "inherits": ["MovieService"]}],
+                                  "functions": ["makeList"]},
+        "Views/Rows/Row.swift": {"types": [{"kind": "struct", "name": "Row", "inherits": ["View"]}]},
+    }
+
+
+def test_max_tokens_picks_the_detail_that_fits(project):
+    root = str(project)
+    full = mcp_server.get_project_map(root, path="", depth=None, max_tokens=10_000)
+    assert json.loads(full) == json.loads(mcp_server.get_project_map(root, path=""))
+
+    budget = approx_tokens(full) - 1
+    fitted = mcp_server.get_project_map(root, max_tokens=budget)
+    sizes = [approx_tokens(mcp_server.get_project_map(root, depth=d)) for d in range(3)]
+    depth = max(d for d in range(3) if sizes[d] <= budget)
+    assert fitted == mcp_server.get_project_map(root, depth=depth)
+    # Nothing fits: the shallowest rollup.
+    assert "subdirs" in json.loads(mcp_server.get_project_map(root, max_tokens=1))
+
+
+def test_per_file_map_from_index_matches_scan(tmp_path, monkeypatch):
+    monkeypatch.setattr(cache, "run_sourcekitten", lambda p: STRUCTURE)
+    files.clear_cache()
+    mcp_server._projects.clear()
+    (tmp_path / "Movies.swift").write_text(SOURCE)
+    assert mcp_server.get_project_map(str(tmp_path), path=".") == mcp_server.get_project_map(str(tmp_path))
@@ -0,0 +1,77 @@
+"""Tests for the memory-mapped multi-file scanner."""
+
+from datetime import datetime, timezone
+
+from swift_project_assistant import summary
+from swift_project_assistant.scanner import files_matching, identifier_regex, scan_file, scan_files
+
+CODE = """import Foundation
+
+final class MovieViewModel {
+    let service: MovieService
+    func load() { service.load(); service.load() }
+}
+"""
+
+
+def write(tmp_path, name, text):
+    path = tmp_path / name
+    path.write_text(text, encoding="utf-8")
+    return path
+
+
+def test_scan_file_reports_lines_once_per_line(tmp_path):
+    path = write(tmp_path, "A.swift", CODE)
+    hits = scan_file(path, identifier_regex("service"))
+    assert [(h.line, h.text) for h in hits] == [
+        (4, "let service: MovieService"),
+        (5, "func load() { service.load(); service.load() }"),
+    ]
+
+
+def test_scan_file_whole_word_only(tmp_path):
+    path = write(tmp_path, "A.swift", CODE)
+    assert [h.line for h in scan_file(path, identifier_regex("Movie"))] == []
+    assert [h.line for h in scan_file(path, identifier_regex("MovieService"))] == [4]
+
+
+def test_scan_file_whole_word_with_non_ascii_identifiers(tmp_path):
+    path = write(tmp_path, "A.swift", "let größe = 1\nlet größeMax = größe\nlet ñame = 2\nlet pañame = ñame\n")
+    assert [h.line for h in scan_file(path, identifier_regex("größe"))] == [1, 2]
+    assert [h.line for h in scan_file(path, identifier_regex("gr"))] == []
+    assert [h.line for h in scan_file(path, identifier_regex("ñame"))] == [3, 4]
+    assert [h.text for h in scan_file(path, identifier_regex("pa"))] == []
+
+
+def test_scan_file_skips_summary_block(tmp_path):
+    block = summary.build_block("# A.swift\n\nMovieService everywhere\n", datetime.now(timezone.utc))
+    path = write(tmp_path, "A.swift", block + CODE)
+    hits = scan_file(path, identifier_regex("MovieService"))
+    offset = block.count("\n")
+    assert [h.line for h in hits] == [4 + offset]
+
+
+def test_scan_file_empty(tmp_path):
+    assert scan_file(write(tmp_path, "Empty.swift", ""), identifier_regex("x")) == []
+
+
+def test_scan_files_order_and_cap(tmp_path):
+    paths = [write(tmp_path, f"F{i}.swift", "let x = 1\nlet y = x\n") for i in range(10)]
+    hits, truncated = scan_files(paths, identifier_regex("x"), workers=3)
+    assert not truncated
+    assert [(h.path.name, h.line) for h in hits[:4]] == [
+        ("F0.swift", 1), ("F0.swift", 2), ("F1.swift", 1), ("F1.swift", 2),
+    ]
+    assert len(hits) == 20
+
+    hits, truncated = scan_files(paths, identifier_regex("x"), cap=5, workers=3)
+    assert truncated
+    assert len(hits) == 5
+    assert hits[-1].path.name == "F2.swift"
+
+
+def test_files_matching_skips_missing_and_non_matching(tmp_path):
+    a = write(tmp_path, "A.swift", CODE)
+    b = write(tmp_path, "B.swift", "struct Other {}\n")
+    missing = tmp_path / "Missing.swift"
+    assert files_matching([a, b, missing], identifier_regex("MovieService")) == [a]
@@ -0,0 +1,106 @@
+"""Tests for the priority scheduler of SourceKitten runs."""
+
+import json
+import os
+import threading
+import time
+
+import pytest
+
+from swift_project_assistant import cache, mcp_server, scheduler
+from swift_project_assistant.scheduler import Priority, Scheduler, configured_limit, priority
+from tests.test_analyzer import SOURCE, STRUCTURE
+
+
+def queue_up(sched, ticket, order, label=None):
+    """Start a thread that takes a slot with `ticket` and records when it gets it; wait until it is queued."""
+    def work():
+        with sched.slot(ticket):
+            order.append(label or ticket.priority)
+
+    thread = threading.Thread(target=work)
+    thread.start()
+    deadline = time.monotonic() + 2
+    while not ticket.queued and time.monotonic() < deadline:
+        time.sleep(0.001)
+    return thread
+
+
+def test_interactive_requests_pass_queued_background_work():
+    sched = Scheduler(limit=1, load=lambda: None)
+    order = []
+    with sched.slot(sched.ticket(Priority.INTERACTIVE)):
+        threads = [queue_up(sched, sched.ticket(level), order)
+                   for level in (Priority.BACKGROUND, Priority.PREFETCH, Priority.INTERACTIVE)]
+    for t in threads:
+        t.join(2)
+    assert order == [Priority.INTERACTIVE, Priority.PREFETCH, Priority.BACKGROUND]
+    stats = sched.stats()
+    assert stats["interactive"]["completed"] == 2 and stats["interactive"]["jumped_queue"] == 1
+    assert stats["background"]["queued"] == 0 and stats["background"]["wait_ms_max"] > 0
+
+
+def test_background_work_leaves_a_slot_for_interactive_requests():
+    sched = Scheduler(limit=2, load=lambda: None)
+    release = threading.Event()
+    running = []
+
+    def background():
+        with sched.slot(sched.ticket(Priority.BACKGROUND)):
+            running.append(1)
+            release.wait(2)
+
+    threads = [threading.Thread(target=background) for _ in range(2)]
+    for t in threads:
+        t.start()
+    time.sleep(0.05)
+    assert len(running) == 1 and sched.stats()["background"]["queued"] == 1
+    with sched.slot():  # interactive, by default
+        assert sched.stats()["interactive"]["running"] == 1
+    release.set()
+    for t in threads:
+        t.join(2)
+    assert len(running) == 2
+
+
+def test_load_average_limits_low_priority_work():
+    busy = Scheduler(limit=8, load=lambda: (os.cpu_count() or 1) + 4.0)
+    assert busy.low_priority_limit() == 1
+    idle = Scheduler(limit=8, load=lambda: 0.0)
+    assert idle.low_priority_limit() == min(7, os.cpu_count() or 1)
+
+
+def test_boost_promotes_a_queued_ticket():
+    sched = Scheduler(limit=1, load=lambda: None)
+    order = []
+    with sched.slot():
+        owner = sched.ticket(Priority.BACKGROUND)
+        threads = [queue_up(sched, sched.ticket(Priority.BACKGROUND), order, "first"),
+                   queue_up(sched, owner, order, "boosted")]
+        owner.boost(Priority.INTERACTIVE)
+        assert sched.stats()["interactive"]["queued"] == 1
+    for t in threads:
+        t.join(2)
+    assert order == ["boosted", "first"]
+
+
+def test_configured_limit(monkeypatch):
+    monkeypatch.setenv("SWIFT_ASSISTANT_SOURCEKITTEN_JOBS", "3")
+    assert configured_limit() == 3
+    monkeypatch.setenv("SWIFT_ASSISTANT_SOURCEKITTEN_JOBS", "lots")
+    with pytest.raises(ValueError):
+        configured_limit()
+
+
+def test_analyses_run_in_the_callers_class(tmp_path, monkeypatch):
+    monkeypatch.setattr(scheduler, "_default", Scheduler(limit=2, load=lambda: None))
+    monkeypatch.setattr(cache, "run_sourcekitten", lambda p: STRUCTURE)
+    (tmp_path / "A.swift").write_text(SOURCE)
+    (tmp_path / "B.swift").write_text(SOURCE + "\n")
+    with priority(Priority.BACKGROUND):
+        cache.analyze_cached(tmp_path / "A.swift")
+    cache.analyze_cached(tmp_path / "B.swift")
+    cache.analyze_cached(tmp_path / "A.swift")  # a cache hit takes no slot
+    stats = json.loads(mcp_server.get_server_stats())["scheduler"]
+    assert stats["background"]["completed"] == 1
+    assert stats["interactive"]["completed"] == 1
@@ -0,0 +1,193 @@
+"""Tests for binary index snapshots and warm starts from them."""
+
+import os
+import re
+import threading
+import time
+
+import pytest
+
+from swift_project_assistant import cache, files, index as index_module
+from swift_project_assistant.index import Declaration, DeclarationCorpus, FileEntry, ProjectIndex, _index_path
+from swift_project_assistant.snapshot import Snapshot, SnapshotWriter
+from tests.test_analyzer import SOURCE, STRUCTURE
+
+
+@pytest.fixture
+def project(tmp_path, monkeypatch):
+    """A two-file project with settled mtimes, analyzed by a counting fake SourceKitten."""
+    calls = []
+    monkeypatch.setattr(cache, "run_sourcekitten", lambda p: calls.append(p) or STRUCTURE)
+    files.clear_cache()
+    root = tmp_path / "App"
+    (root / "Views").mkdir(parents=True)
+    for rel in ("A.swift", "Views/B.swift"):
+        (root / rel).write_text(SOURCE)
+        settle(root / rel)
+    return root, calls
+
+
+def settle(path):
+    """Backdate `path` so its stat is old enough to be trusted."""
+    past = time.time() - 60
+    os.utime(path, (past, past))
+
+
+def indexed(root):
+    index = ProjectIndex.load(root)
+    index.update(files.swift_files(str(root)))
+    index_module.flush_saves()
+    return index
+
+
+def test_snapshot_roundtrip(project):
+    root, _ = project
+    built = indexed(root)
+    reloaded = ProjectIndex.load(root)
+    assert reloaded.entries.snapshot is not None
+    assert set(reloaded.entries) == {"A.swift", "Views/B.swift"}
+    for rel in reloaded.entries:
+        assert reloaded.entries[rel] == built.entries[rel]
+
+    reloaded.update(files.swift_files(str(root)))
+    regex = re.compile(r"func fetch", re.MULTILINE)
+    assert [(rel, d.qualified) for rel, d in reloaded.search_declarations(regex)] == [
+        (rel, d.qualified) for rel, d in built.search_declarations(regex)
+    ]
+    assert [(m.rel, m.declaration.qualified) for m in reloaded.search_symbols("MovieVM")] == [
+        (m.rel, m.declaration.qualified) for m in built.search_symbols("MovieVM")
+    ]
+    assert reloaded.dependents("MovieService") == ["A.swift", "Views/B.swift"]
+    assert reloaded.dependents("MovieViewModel") == []
+
+
+def test_declarations_decode_lazily(project):
+    root, _ = project
+    indexed(root)
+    reloaded = ProjectIndex.load(root)
+    reloaded.update(files.swift_files(str(root)))
+    assert reloaded.entries._decoded == {}
+    assert reloaded.entries.analyzed == {}
+
+    hits = list(reloaded.search_declarations(re.compile(r"^enum", re.MULTILINE)))
+    assert [d.signature for _, d in hits] == ["enum MovieViewModel.Category: String"] * 2
+    assert reloaded.entries._decoded == {}  # a corpus hit decodes one declaration, not the file
+
+
+def test_trusted_stat_skips_hashing(project, monkeypatch):
+    root, calls = project
+    indexed(root)
+    reloaded = ProjectIndex.load(root)
+    keyed = []
+    real = index_module.content_keys
+    monkeypatch.setattr(index_module, "content_keys", lambda r, fs: keyed.extend(fs) or real(r, fs))
+    reloaded.update(files.swift_files(str(root)))
+    assert keyed == []
+
+    # A touch without a content change is re-keyed but not re-analyzed.
+    (root / "A.swift").write_text(SOURCE)
+    reloaded.update(files.swift_files(str(root)))
+    assert keyed == [root / "A.swift"]
+    assert len(calls) == 1
+    assert reloaded.entries.analyzed == {}
+
+
+def test_changed_and_deleted_files_after_load(project):
+    root, calls = project
+    indexed(root)
+    (root / "A.swift").write_text(SOURCE + "\n// edited\n")
+    (root / "Views" / "B.swift").unlink()
+    reloaded = ProjectIndex.load(root)
+    reloaded.update(files.swift_files(str(root)))
+    assert len(calls) == 2
+    assert set(reloaded.entries) == {"A.swift"}
+    assert "A.swift" in reloaded.entries.analyzed
+
+    index_module.flush_saves()
+    # The rewritten snapshot mixes copied and freshly analyzed files.
+    again = ProjectIndex.load(root)
+    assert set(again.entries) == {"A.swift"}
+    assert again.entries["A.swift"] == reloaded.entries["A.swift"]
+
+
+def test_incompatible_snapshots_are_ignored(project, tmp_path):
+    root, _ = project
+    indexed(root)
+    path = _index_path(root)
+    assert Snapshot.open(path, "/elsewhere") is None
+
+    data = bytearray(path.read_bytes())
+    data[8] += 1  # format version
+    path.write_bytes(bytes(data))
+    assert ProjectIndex.load(root).entries.snapshot is None
+
+    path.write_bytes(b"")
+    assert ProjectIndex.load(root).entries.snapshot is None
+
+
+def test_writer_copies_files_without_decoding(project, tmp_path):
+    root, _ = project
+    built = indexed(root)
+    source = Snapshot.open(_index_path(root), str(root))
+    writer = SnapshotWriter(str(root))
+    writer.copy_file(source, 1, None)
+    out = tmp_path / "copy.snap"
+    writer.write(out)
+
+    copy = Snapshot.open(out, str(root))
+    assert [(rel, key, stat) for _, rel, key, stat in copy.files()] == [
+        ("Views/B.swift", built.entries["Views/B.swift"].key, None)
+    ]
+    assert copy.entry(0) == built.entries["Views/B.swift"]
+
+
+def test_corpus_is_decoded_per_file(tmp_path):
+    def entry(path, names):
+        return FileEntry(path, "k" + path, [], [], [
+            Declaration("function", name, "", f"func {name}() -> Café", i + 1, 0, 1) for i, name in enumerate(names)
+        ])
+
+    writer = SnapshotWriter("/p")
+    writer.add_entry(entry("Ünïcode.swift", ["añadir", "größe"]), None)
+    writer.add_entry(entry("B.swift", ["load"]), None)
+    out = tmp_path / "corpus.snap"
+    writer.write(out)
+    snapshot = Snapshot.open(out, "/p")
+    assert snapshot.corpus_text(1) == "func load() -> Café"  # byte offsets past multi-byte characters
+
+    copier = SnapshotWriter("/p")
+    copier.copy_file(snapshot, 1, None)
+    copier.copy_file(snapshot, 0, None)
+    copier.write(tmp_path / "copy.snap")
+    copy = Snapshot.open(tmp_path / "copy.snap", "/p")
+    assert copy.corpus_text(0) == "func load() -> Café"
+    assert copy.corpus_text(1) == "func añadir() -> Café\nfunc größe() -> Café"
+
+    corpus = DeclarationCorpus()
+    for fid, rel in enumerate(["B.swift", "Ünïcode.swift"]):
+        corpus.set_mapped(rel, *copy.chunk(fid))
+    corpus.set_order(["Ünïcode.swift", "B.swift"])
+    hits = corpus.search(re.compile(r"^func \w+\(\) -> Café$", re.MULTILINE))
+    assert [(rel, d.name) for rel, d in hits] == [("Ünïcode.swift", "añadir"), ("Ünïcode.swift", "größe"),
+                                                  ("B.swift", "load")]
+
+
+def test_updates_save_in_the_background(project, monkeypatch):
+    root, _ = project
+    monkeypatch.setattr(index_module._saver, "delay", 0.01)
+    writing, release = threading.Event(), threading.Event()
+    real_write = SnapshotWriter.write
+
+    def slow_write(self, path):
+        writing.set()
+        release.wait(5)
+        real_write(self, path)
+
+    monkeypatch.setattr(SnapshotWriter, "write", slow_write)
+    index = ProjectIndex.load(root)
+    index.update(files.swift_files(str(root)))  # returns without waiting for the rewrite
+    assert writing.wait(5) and not _index_path(root).exists()
+    assert {m.rel for m in index.search_symbols("MovieVM")} == {"A.swift", "Views/B.swift"}  # not blocked
+    release.set()
+    with index._save_lock:  # the background save has finished
+        assert ProjectIndex.load(root).entries.snapshot is not None
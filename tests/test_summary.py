@@ -5,6 +5,7 @@ test_analyzer, so the full cache lifecycle runs without SourceKitten.
 """
 
 import os
+import sys
 from datetime import datetime, timezone
 
 from swift_project_assistant import summary
@@ -110,6 +111,19 @@ def test_llm_overview_included(tmp_path, monkeypatch):
     assert summary.get_summary(path) == md
 
 
+def test_llm_backend_imported_only_when_configured(monkeypatch):
+    monkeypatch.delitem(sys.modules, "swift_project_assistant.llm", raising=False)
+    monkeypatch.setenv("SUMMARY_LLM", "none")
+    assert summary.generate_overview("# outline", "source") is None
+    assert "swift_project_assistant.llm" not in sys.modules
+
+    from swift_project_assistant import llm
+
+    monkeypatch.setenv("SUMMARY_LLM", "ollama")
+    monkeypatch.setattr(llm, "generate_overview", lambda md, src: f"overview of {md}")
+    assert summary.generate_overview("# outline", "source") == "overview of # outline"
+
+
 def test_llm_failure_falls_back_to_structural(tmp_path, monkeypatch, capsys):
     monkeypatch.setattr(summary, "run_sourcekitten", lambda p: STRUCTURE)
 
@@ -218,6 +232,8 @@ def test_storage_standalone_writes_sidecar_and_caches(tmp_path, monkeypatch):
     assert md2 == md1
 
     # Editing the source (newer mtime) invalidates the sidecar.
+    with open(path, "a", encoding="utf-8") as f:
+        f.write("\n// edited\n")
     future = path.stat().st_mtime + 10
     os.utime(path, (future, future))
     assert summary.cached_summary(path) is None
@@ -225,6 +241,27 @@ def test_storage_standalone_writes_sidecar_and_caches(tmp_path, monkeypatch):
     assert calls["count"] == 2
 
 
+def test_regeneration_reuses_analysis_of_identical_content(tmp_path, monkeypatch):
+    calls = {"count": 0}
+
+    def fake_sourcekitten(file_path):
+        calls["count"] += 1
+        return STRUCTURE
+
+    monkeypatch.setattr(summary, "run_sourcekitten", fake_sourcekitten)
+    monkeypatch.setenv("SUMMARY_STORAGE", "standalone")
+    path = write_sample(tmp_path)
+    summary.get_summary(path)
+
+    # A touch (e.g. a branch switch) makes the sidecar stale, but the content
+    # is unchanged, so the cached analysis is reused instead of re-running.
+    future = path.stat().st_mtime + 10
+    os.utime(path, (future, future))
+    assert summary.cached_summary(path) is None
+    summary.get_summary(path)
+    assert calls["count"] == 1
+
+
 def test_storage_modes_are_independent(tmp_path, monkeypatch):
     monkeypatch.setattr(summary, "run_sourcekitten", lambda p: STRUCTURE)
     path = write_sample(tmp_path)
@@ -237,3 +274,34 @@ def test_storage_modes_are_independent(tmp_path, monkeypatch):
     monkeypatch.setenv("SUMMARY_STORAGE", "standalone")
     assert summary.get_summary(path).startswith("# MovieViewModel.swift")
     assert summary.sidecar_path(path).exists()
+
+
+# --- concurrent writers ------------------------------------------------------
+
+
+def test_concurrent_requests_generate_once(tmp_path, monkeypatch):
+    import threading
+    import time
+
+    overviews = []
+
+    def slow_overview(md, src):
+        overviews.append(md)
+        time.sleep(0.2)
+        return "Fetches movies for the UI."
+
+    monkeypatch.setattr(summary, "run_sourcekitten", lambda p: STRUCTURE)
+    monkeypatch.setattr(summary, "generate_overview", slow_overview)
+    path = write_sample(tmp_path)
+    path.chmod(0o640)
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(summary.get_summary(path))) for _ in range(3)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join(5)
+
+    assert len(overviews) == 1  # the others waited for the stored summary
+    assert len(set(results)) == 1 and "## Overview" in results[0]
+    assert path.stat().st_mode & 0o777 == 0o640  # the atomic rewrite keeps permissions
+    assert not list(tmp_path.glob(".*.tmp"))  # no temp files left behind
@@ -0,0 +1,101 @@
+"""Tests for ranked prefix / camel-hump / fuzzy symbol search."""
+
+import json
+
+from swift_project_assistant import cache, files, mcp_server
+from swift_project_assistant.index import Declaration
+from swift_project_assistant.symbols import SymbolIndex, humps
+from tests.test_analyzer import SOURCE, STRUCTURE
+
+
+def d(name, kind="method", parent="", line=1):
+    return Declaration(kind, name, parent, name, line, 0, 0)
+
+
+def make_index():
+    index = SymbolIndex()
+    index.set_file("Movies.swift", [
+        d("MovieViewModel", "class"), d("fetchMovies", parent="MovieViewModel", line=5),
+        d("MovieService", "protocol"), d("movieCount", "property", "MovieViewModel", 3),
+    ])
+    index.set_file("Other.swift", [d("URLSession", "class"), d("fetch", parent="Loader")])
+    return index
+
+
+def names(matches):
+    return [(m.declaration.name, m.match) for m in matches]
+
+
+def test_humps():
+    assert humps("fetchMovies") == ["fetch", "Movies"]
+    assert humps("MovieVM") == ["Movie", "V", "M"]
+    assert humps("URLSession") == ["U", "R", "L", "Session"]
+
+
+def test_exact_before_prefix_before_fuzzy():
+    index = make_index()
+    assert names(index.search("fetch"))[:2] == [("fetch", "exact"), ("fetchMovies", "prefix")]
+    assert names(index.search("moviecount")) == [("movieCount", "exact-ci")]
+
+
+def test_camel_humps():
+    index = make_index()
+    assert names(index.search("MovieVM"))[0] == ("MovieViewModel", "camel")
+    assert names(index.search("fetchMov"))[0] == ("fetchMovies", "prefix")
+    assert names(index.search("URLSess"))[0] == ("URLSession", "prefix")
+    assert names(index.search("urlSe"))[0] == ("URLSession", "prefix")
+
+
+def test_substring_and_typos():
+    index = make_index()
+    assert names(index.search("ViewModel"))[0] == ("MovieViewModel", "substring")
+    assert names(index.search("MoveiService"))[0] == ("MovieService", "fuzzy")
+
+
+def test_qualified_query_and_filter():
+    index = make_index()
+    assert names(index.search("Loader.fetch")) == [("fetch", "exact")]
+    only_types = index.search("Movie", accept=lambda rel, decl: decl.is_type)
+    assert {m.declaration.name for m in only_types} == {"MovieViewModel", "MovieService"}
+
+
+def test_filtered_out_matches_do_not_end_the_search():
+    index = SymbolIndex()
+    index.set_file("A.swift", [d(f"movie{n}", parent="Player") for n in ("One", "Two", "Three")]
+                   + [d("BigMovieList", "class")])
+    only_types = index.search("movie", limit=2, accept=lambda rel, decl: decl.is_type)
+    assert names(only_types) == [("BigMovieList", "substring")]
+    assert names(index.search("Shelf.movie", limit=2)) == []
+
+
+def test_ranking_decodes_only_what_it_returns():
+    decls = [d(f"item{i:04}") for i in range(1000)]
+    for accept in (None, lambda rel, decl: True):
+        decoded = []
+        index = SymbolIndex(resolve=lambda did: decoded.append(did) or decls[did])
+        for did, decl in enumerate(decls):
+            index.add_mapped("A.swift", decl.name, did)
+        assert len(index.search("item", limit=5, accept=accept)) == 5
+        assert len(decoded) == 5
+
+
+def test_remove_file_drops_names():
+    index = make_index()
+    index.remove_file("Other.swift")
+    assert names(index.search("URLSession")) == []
+    assert len(index) == 4
+
+
+def test_search_symbols_tool(tmp_path, monkeypatch):
+    monkeypatch.setattr(cache, "run_sourcekitten", lambda p: STRUCTURE)
+    files.clear_cache()
+    mcp_server._projects.clear()
+    (tmp_path / "MovieViewModel.swift").write_text(SOURCE)
+    result = json.loads(mcp_server.search_symbols(str(tmp_path), "fetchMov", limit=1))
+    assert result["matches"] == [{
+        "name": "MovieViewModel.fetchMovies", "kind": "method", "file": "MovieViewModel.swift",
+        "line": 12, "match": "prefix",
+        "declaration": "func fetchMovies(for category: Category) -> [Movie]",
+    }]
+    result = json.loads(mcp_server.search_symbols(str(tmp_path), "MovieVM", kind="class"))
+    assert [m["name"] for m in result["matches"]] == ["MovieViewModel"]